@@ -0,0 +1,158 @@
+"""
+Persistent cache of entry analyses, keyed on the content being analyzed
+
+The key is a SHA-256 of the normalized entry text (NFC, whitespace collapsed),
+the analyzer version and the reflection style, so a resubmitted entry reuses
+its summary, emotions and reflection instead of being analyzed (and, with a
+real provider, paid for) again. Rows are written in the same transaction as
+the entry itself. When the table grows past its byte budget the least
+recently used rows are evicted; an optional TTL expires old analyses.
+"""
+import hashlib
+import os
+import time
+import unicodedata
+
+# Bump when prompts, templates or the lexicon change, to orphan old analyses
+ANALYZER_VERSION = 1
+
+# Byte budget for cached analyses; 0 turns the cache off
+DEFAULT_MAX_BYTES = int(os.getenv('JOURNAL_ANALYSIS_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+
+# Seconds a cached analysis stays valid; 0 keeps it until evicted
+DEFAULT_TTL = float(os.getenv('JOURNAL_ANALYSIS_CACHE_TTL', '0'))
+
+# Rough per-row overhead (key, timestamps, b-tree cell) counted against the budget
+ROW_OVERHEAD = 64
+
+
+def create_tables(conn):
+    """Create the analysis cache table if it does not exist yet"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_cache (
+            key BLOB PRIMARY KEY,
+            summary TEXT,
+            emotions TEXT,
+            reflection TEXT,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_used ON analysis_cache (last_used)')
+
+
+def normalize(text):
+    """Text as it is hashed: NFC, with runs of whitespace collapsed"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def _size(entry):
+    return ROW_OVERHEAD + sum(
+        len((entry[column] or '').encode('utf-8')) for column in ('summary', 'emotions', 'reflection')
+    )
+
+
+class AnalysisCache:
+    """Lookups, writes and eviction for analysis_cache, with hit counters"""
+
+    def __init__(self, analyzer_version, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL):
+        self.analyzer_version = f"{ANALYZER_VERSION}/{analyzer_version}"
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._bytes = None  # cached SUM(size), loaded on first write
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def key(self, text, style=None):
+        material = '\0'.join((normalize(text), self.analyzer_version, style or ''))
+        return hashlib.sha256(material.encode('utf-8')).digest()
+
+    def lookup(self, conn, key, text):
+        """(summary, emotions, reflection) for key, or None on a miss"""
+        if not self.enabled:
+            return None
+        row = conn.execute('''
+            SELECT summary, emotions, reflection FROM analysis_cache
+            WHERE key = ? AND (? = 0 OR created_at >= ?)
+        ''', (key, self.ttl, time.time() - self.ttl)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # Entry text that skipped analysis plus the analysis it would have produced
+        self.bytes_saved += len(text.encode('utf-8')) + sum(len((value or '').encode('utf-8')) for value in row)
+        return row
+
+    def store(self, conn, keyed_entries):
+        """Record analyses used by a write (call in the insert transaction)
+
+        keyed_entries holds (key, hit, entry) tuples: misses are inserted,
+        hits only have their last_used time refreshed.
+        """
+        if not self.enabled or not keyed_entries:
+            return
+        now = time.time()
+        misses = [(key, entry) for key, hit, entry in keyed_entries if not hit]
+        conn.executemany(
+            'UPDATE analysis_cache SET last_used = ? WHERE key = ?',
+            [(now, key) for key, hit, _ in keyed_entries if hit]
+        )
+        if not misses:
+            return
+        rows = [
+            (key, entry['summary'], entry['emotions'], entry['reflection'], _size(entry), now, now)
+            for key, entry in misses
+        ]
+        conn.executemany('''
+            INSERT OR REPLACE INTO analysis_cache (key, summary, emotions, reflection, size, created_at, last_used)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        if self._bytes is None:
+            self._bytes = self._total_bytes(conn)
+        else:
+            self._bytes += sum(row[4] for row in rows)
+        if self._bytes > self.max_bytes:
+            self._evict(conn, now)
+
+    def _total_bytes(self, conn):
+        return conn.execute('SELECT COALESCE(SUM(size), 0) FROM analysis_cache').fetchone()[0]
+
+    def _evict(self, conn, now):
+        """Drop expired rows, then least recently used ones down to 90% of the budget"""
+        before = conn.execute('SELECT COUNT(*) FROM analysis_cache').fetchone()[0]
+        if self.ttl:
+            conn.execute('DELETE FROM analysis_cache WHERE created_at < ?', (now - self.ttl,))
+        excess = self._total_bytes(conn) - int(self.max_bytes * 0.9)
+        if excess > 0:
+            victims = []
+            for key, size in conn.execute('SELECT key, size FROM analysis_cache ORDER BY last_used'):
+                victims.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            conn.executemany('DELETE FROM analysis_cache WHERE key = ?', victims)
+        self.evictions += before - conn.execute('SELECT COUNT(*) FROM analysis_cache').fetchone()[0]
+        self._bytes = self._total_bytes(conn)
+
+    def stats(self, conn):
+        entries, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analysis_cache').fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+        }
@@ -1,71 +1,48 @@
-import sqlite3
+import sys
 import os
-from datetime import datetime
 import tempfile
 
+# Share the connection pool and schema migrations with the main backend
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_pool import get_pool
+from journal_store import insert_entries, fetch_entries_page
+from migrations import migrate
+from mood_scores import score_entries
+from rollups import load_range
+
+def serverless_db_path():
+    """JOURNAL_DB_PATH, or journal.db in the temp dir
+    
+    The deployed code directory is read-only on Vercel, so unlike the API
+    server the default is the one place a function can always write.
+    """
+    return os.getenv('JOURNAL_DB_PATH') or os.path.join(tempfile.gettempdir(), 'journal.db')
+
 class ServerlessDatabase:
-    def __init__(self):
-        # Use a temporary file for serverless environment
-        self.db_path = os.path.join(tempfile.gettempdir(), 'journal.db')
+    def __init__(self, db_path=None):
+        # Every function resolves the same path, so they share one database
+        # wherever they share a filesystem
+        self.db_path = db_path or serverless_db_path()
+        self.pool = get_pool(self.db_path)
         self.init_database()
     
     def init_database(self):
-        """Initialize SQLite database for journal entries"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS entries (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                original_entry TEXT NOT NULL,
-                summary TEXT,
-                emotions TEXT,
-                reflection TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        conn.commit()
-        conn.close()
+        """Initialize SQLite database for journal entries (no DDL once it is current)"""
+        migrate(self.pool)
     
     def save_entry(self, entry_data):
-        """Save processed entry to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO entries (date, original_entry, summary, emotions, reflection)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            entry_data['date'],
-            entry_data['original_entry'],
-            entry_data['summary'],
-            entry_data['emotions'],
-            entry_data['reflection']
-        ))
-        conn.commit()
-        conn.close()
+        """Save processed entry to database and return its id"""
+        score_entries([entry_data])
+        with self.pool.writer() as conn:
+            return insert_entries(conn, [entry_data])[0]
     
     def get_recent_entries(self, limit=10):
         """Get recent journal entries"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT * FROM entries 
-            ORDER BY created_at DESC 
-            LIMIT ?
-        ''', (limit,))
-        
-        entries = cursor.fetchall()
-        conn.close()
-        
-        return [
-            {
-                'id': entry[0],
-                'date': entry[1],
-                'original_entry': entry[2],
-                'summary': entry[3],
-                'emotions': entry[4],
-                'reflection': entry[5],
-                'created_at': entry[6]
-            }
-            for entry in entries
-        ]
\ No newline at end of file
+        with self.pool.reader() as conn:
+            return fetch_entries_page(conn, limit)['entries']
+
+    def get_range(self, date_from, date_to, granularity='day'):
+        """Analytics for dates in [date_from, date_to], bucketed by day, week or month"""
+        with self.pool.reader() as conn:
+            return load_range(conn, date_from, date_to, granularity)
@@ -1,81 +1,64 @@
 import sys
 import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-import sqlite3
 from datetime import datetime, timedelta
-from collections import Counter
 
-# Import our journal agent
-try:
-    from backend.journal_agent import JournalAgent
-    journal_agent = JournalAgent()
-except Exception as e:
-    print(f"Error importing journal agent: {e}")
-    journal_agent = None
+# backend/api holds the serverless helpers; importing database adds backend/ itself
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serverless import HTTPError, JsonFunction
+
+# Most buckets one response returns, as in the main API
+MAX_ANALYTICS_PERIODS = 1000
 
-app = FastAPI()
 
-# Enable CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def setup():
+    """Open the journal database (runs on the first request, not at import)"""
+    from database import ServerlessDatabase
+    return ServerlessDatabase()
 
-@app.get("/")
-async def get_analytics():
-    """Get mood analytics and insights"""
+
+def _date_param(query, name):
+    value = query.get(name)
+    if value is None:
+        return None
     try:
-        if journal_agent is None:
-            raise HTTPException(status_code=500, detail="Journal agent not initialized")
-            
-        conn = sqlite3.connect(journal_agent.db_path)
-        cursor = conn.cursor()
-        
-        # Get entries from last 7 days
-        week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-        cursor.execute('''
-            SELECT date, emotions FROM entries 
-            WHERE date >= ? 
-            ORDER BY date
-        ''', (week_ago,))
-        
-        entries = cursor.fetchall()
-        conn.close()
-        
-        # Process mood data
-        daily_moods = {}
-        all_emotions = []
-        
-        for date, emotions_str in entries:
-            if emotions_str:
-                emotions = [e.strip().lower() for e in emotions_str.split(',')]
-                daily_moods[date] = emotions
-                all_emotions.extend(emotions)
-        
-        # Count emotion frequencies
-        emotion_counts = Counter(all_emotions)
-        top_emotions = dict(emotion_counts.most_common(5))
-        
-        return {
-            "success": True,
-            "analytics": {
-                "daily_moods": daily_moods,
-                "top_emotions": top_emotions,
-                "total_entries": len(entries),
-                "week_summary": f"You've journaled {len(entries)} times this week!"
-            }
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise HTTPError(400, f"'{name}' must be a date in YYYY-MM-DD format")
+
+
+def get_analytics(db, query, body):
+    """Get mood analytics for ?from=&to= (default: the last 7 days) by day, week or month"""
+    from rollups import GRANULARITIES, count_periods
+
+    date_from, date_to = _date_param(query, 'from'), _date_param(query, 'to')
+    default_window = date_from is None and date_to is None
+    date_to = date_to or datetime.now().date()
+    date_from = date_from or date_to - timedelta(days=7)
+    granularity = query.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        raise HTTPError(422, "granularity must be one of day, week, month")
+    if date_from > date_to:
+        raise HTTPError(400, "'from' must not be after 'to'")
+    if count_periods(date_from, date_to, granularity) > MAX_ANALYTICS_PERIODS:
+        raise HTTPError(400, f"Window spans more than {MAX_ANALYTICS_PERIODS} {granularity}s; use a coarser granularity")
+
+    analytics = db.get_range(date_from, date_to, granularity)
+    total_entries = analytics['total_entries']
+    return {
+        "success": True,
+        "analytics": {
+            "from": date_from.isoformat(),
+            "to": date_to.isoformat(),
+            "granularity": granularity,
+            **analytics,
+            "week_summary": (
+                f"You've journaled {total_entries} times this week!" if default_window
+                else f"You've journaled {total_entries} times between {date_from} and {date_to}!"
+            )
         }
-        
-    except Exception as e:
-        print(f"❌ Error getting analytics: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    }
+
 
-# Vercel handler
-def handler(request, context):
-    return app
\ No newline at end of file
+# Vercel serves the module-level ASGI app
+app = JsonFunction('GET', get_analytics, setup)
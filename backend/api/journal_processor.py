@@ -1,10 +1,11 @@
 import random
 from datetime import datetime
-from .database import ServerlessDatabase
+from database import ServerlessDatabase
+from emotion_lexicon import get_matcher  # backend/ is put on sys.path by .database
 
 class ServerlessJournalProcessor:
-    def __init__(self):
-        self.db = ServerlessDatabase()
+    def __init__(self, db_path=None):
+        self.db = ServerlessDatabase(db_path)
     
     def process_journal_entry(self, entry_text):
         """Process a journal entry with mock AI"""
@@ -52,30 +53,7 @@ class ServerlessJournalProcessor:
     
     def _mock_detect_emotions(self, text):
         """Mock emotion detection"""
-        text_lower = text.lower()
-        emotions = []
-        
-        # Positive emotions
-        if any(word in text_lower for word in ['happy', 'joy', 'excited', 'great', 'amazing']):
-            emotions.append('happy')
-        if any(word in text_lower for word in ['proud', 'accomplished', 'achieved']):
-            emotions.append('proud')
-        if any(word in text_lower for word in ['grateful', 'thankful', 'blessed']):
-            emotions.append('grateful')
-            
-        # Negative emotions
-        if any(word in text_lower for word in ['sad', 'depressed', 'down', 'upset']):
-            emotions.append('sad')
-        if any(word in text_lower for word in ['stressed', 'stress', 'pressure', 'overwhelmed']):
-            emotions.append('stressed')
-        if any(word in text_lower for word in ['tired', 'exhausted', 'fatigue']):
-            emotions.append('tired')
-            
-        # Default emotions if none detected
-        if not emotions:
-            emotions = ['reflective', 'thoughtful']
-                
-        return ', '.join(emotions[:3])
+        return get_matcher().detect(text, limit=3)
     
     def _mock_generate_reflection(self, text):
         """Mock positive reflection generation"""
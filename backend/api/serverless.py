@@ -0,0 +1,158 @@
+"""
+Minimal ASGI plumbing for the serverless functions
+
+Each function serves a single JSON route, and importing FastAPI and pydantic
+for that took about 0.4s, most of a cold start. JsonFunction is a bare ASGI
+app instead: it parses the query string and JSON body, answers CORS
+preflights, and renders dicts and HTTPError as FastAPI would. The function's
+state (.env, database pool, processor) is built by its setup() on the first
+request, so importing the module does no I/O at all.
+"""
+import json
+import logging
+from urllib.parse import parse_qs
+
+log = logging.getLogger('journal.api')
+
+CORS_METHODS = b'DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT'
+
+
+class HTTPError(Exception):
+    """Error response rendered as {"detail": ...}, like FastAPI's HTTPException"""
+
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def int_param(query, name, default):
+    """Integer query parameter, or a 422 when it is not a number"""
+    value = query.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPError(422, f"{name} must be an integer")
+
+
+def str_field(body, name):
+    """Required string field of a JSON object body"""
+    value = body.get(name) if isinstance(body, dict) else None
+    if not isinstance(value, str):
+        raise HTTPError(422, f"{name} is required and must be a string")
+    return value
+
+
+def _load_dotenv():
+    # Before setup() imports the backend modules, which read their settings
+    # from the environment at import time
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+class JsonFunction:
+    """ASGI app answering one method with handler(state, query, body) -> dict
+
+    state is whatever setup() returned on the first request; if setup fails
+    the request gets a 500 and the next one tries again.
+    """
+
+    def __init__(self, method, handler, setup):
+        self.method = method
+        self.handler = handler
+        self.setup = setup
+        self._state = None
+        self._ready = False
+
+    def _get_state(self):
+        if not self._ready:
+            _load_dotenv()
+            self._state = self.setup()
+            self._ready = True
+        return self._state
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        headers = dict(scope['headers'])
+        cors = self._cors_headers(headers)
+        if scope['method'] == 'OPTIONS' and b'access-control-request-method' in headers:
+            preflight = cors + [
+                (b'access-control-allow-methods', CORS_METHODS),
+                (b'access-control-max-age', b'600'),
+            ]
+            if b'access-control-request-headers' in headers:
+                preflight.append((b'access-control-allow-headers', headers[b'access-control-request-headers']))
+            await self._respond(send, 200, {'detail': 'OK'}, preflight)
+            return
+
+        try:
+            if scope['method'] != self.method:
+                raise HTTPError(405, "Method Not Allowed")
+            query = {
+                name: values[-1]
+                for name, values in parse_qs(scope['query_string'].decode('latin-1')).items()
+            }
+            body = await self._read_json(receive) if self.method in ('POST', 'PUT') else None
+            status, payload = 200, self.handler(self._get_state(), query, body)
+        except HTTPError as e:
+            status, payload = e.status_code, {'detail': e.detail}
+        except Exception as e:
+            log.exception("Request failed")
+            status, payload = 500, {'detail': str(e)}
+        await self._respond(send, status, payload, cors)
+
+    @staticmethod
+    def _cors_headers(headers):
+        # Credentials are allowed, so the origin is echoed rather than '*'
+        origin = headers.get(b'origin')
+        if origin is None:
+            return [(b'access-control-allow-origin', b'*')]
+        return [
+            (b'access-control-allow-origin', origin),
+            (b'access-control-allow-credentials', b'true'),
+            (b'vary', b'Origin'),
+        ]
+
+    @staticmethod
+    async def _read_json(receive):
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        try:
+            return json.loads(b''.join(chunks) or b'null')
+        except ValueError:
+            raise HTTPError(422, "Request body must be valid JSON")
+
+    @staticmethod
+    async def _respond(send, status, payload, headers):
+        body = json.dumps(payload, default=str, ensure_ascii=False).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode('latin-1')),
+                *headers,
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    @staticmethod
+    async def _lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
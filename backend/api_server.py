@@ -1,13 +1,39 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import sqlite3
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime, timedelta
-from collections import Counter
+import asyncio
+import hmac
 import json
+import logging
 import os
+import weakref
 
-app = FastAPI(title="AI Journal API")
+from executors import analysis_executor, call_db, db_executor, import_executor, run_db, run_import
+from rollups import count_periods, load_range
+from journal_stats import load_goals, save_targets
+from search import search_entries
+from response_cache import ResponseCache
+from reflections import get_reflection_bank
+from journal_io import FORMATS, BodyPipe, import_entries, iter_export
+from journal_logging import RequestContextMiddleware, redact, setup_logging
+import metrics
+
+# numpy is optional; without it /api/journal/trends answers 503
+try:
+    import trends
+except ImportError:
+    trends = None
+
+setup_logging()
+log = logging.getLogger('journal.api')
+
+app = FastAPI(
+    title="AI Journal API",
+    **({"default_response_class": metrics.timed_json_response()} if metrics.ENABLED else {}),
+)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -18,163 +44,509 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize journal agent - import here to avoid circular imports
+# Request ids, per-route log sampling and the access log
+app.add_middleware(RequestContextMiddleware)
+
+# X-User-Id picks the user's shard, so it must come from an authenticating
+# proxy in front of the API, never straight from a client. Only set this when
+# the proxy overwrites (or strips) X-User-Id on every request it forwards.
+TRUST_USER_HEADER = os.getenv('JOURNAL_TRUST_USER_HEADER', 'false').lower() == 'true'
+
+# Optional shared secret the proxy also sends as X-Proxy-Secret, so requests
+# that reach the API without going through the proxy are turned away
+PROXY_SECRET = os.getenv('JOURNAL_PROXY_SECRET') or None
+
+# Initialize journal agent - import here to avoid circular imports.
+# With JOURNAL_SHARD_DIR set, each user gets a shard opened through the router.
+journal_agent = None
+shard_router = None
 try:
     from journal_agent import JournalAgent
-    journal_agent = JournalAgent()
-    print("✅ Journal agent initialized successfully")
-except Exception as e:
-    print(f"❌ Failed to initialize journal agent: {e}")
-    journal_agent = None
+    from shards import SHARD_DIR, ShardRouter
+    if SHARD_DIR:
+        shard_router = ShardRouter(SHARD_DIR)
+        log.info("Shard router initialized", extra=shard_router.stats())
+        if not TRUST_USER_HEADER:
+            log.error("Sharding needs JOURNAL_TRUST_USER_HEADER=true behind an authenticating proxy; "
+                      "every journal request will be rejected")
+    else:
+        journal_agent = JournalAgent()
+        log.info("Journal agent initialized")
+except Exception:
+    log.exception("Failed to initialize journal agent")
+
+def _open_agents():
+    """Every agent currently serving requests"""
+    if shard_router is not None:
+        return shard_router.open_agents()
+    return [journal_agent] if journal_agent is not None else []
+
+# Cached read responses, keyed on the agents' data_version so any commit
+# (from this process or another) invalidates them
+response_cache = ResponseCache()
+
+if metrics.ENABLED:
+    # Added last, so it wraps CORS and sees every request
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.Callback(
+        'journal_executor_queue_depth', "Calls waiting for a worker thread",
+        # ThreadPoolExecutor has no public queue size
+        lambda: {
+            ('db',): db_executor._work_queue.qsize(),
+            ('analysis',): analysis_executor._work_queue.qsize(),
+            ('import',): import_executor._work_queue.qsize(),
+        },
+        labels=['pool'],
+    )
+    metrics.Callback(
+        'journal_group_commit_queue_depth', "Save requests waiting for the group-commit writers",
+        lambda: sum(agent.group_writer.depth for agent in _open_agents() if agent.group_writer),
+    )
+    metrics.Callback(
+        'journal_response_cache_lookups_total', "Read-endpoint response cache lookups by result",
+        lambda: {
+            ('hit',): response_cache.hits,
+            ('miss',): response_cache.misses,
+            ('coalesced',): response_cache.coalesced,
+        },
+        kind='counter', labels=['result'],
+    )
+    metrics.Callback(
+        'journal_response_cache_entries', "Responses currently cached", lambda: response_cache.stats()['entries'],
+    )
+    metrics.Callback(
+        'journal_analysis_cache_lookups_total', "Analysis cache lookups by result",
+        lambda: {
+            ('hit',): sum(agent.analysis_cache.hits for agent in _open_agents()),
+            ('miss',): sum(agent.analysis_cache.misses for agent in _open_agents()),
+        },
+        kind='counter', labels=['result'],
+    )
+    metrics.Callback(
+        'journal_open_shards', "User shards currently open",
+        lambda: shard_router.stats()['open'] if shard_router else 0,
+    )
+
+# Largest batch accepted by /api/journal/process/batch
+MAX_BATCH_SIZE = 1000
+
+# Largest page served by /api/journal/entries
+MAX_PAGE_SIZE = 500
+
+# Most results returned by /api/journal/search
+MAX_SEARCH_RESULTS = 100
+
+# Most buckets /api/journal/analytics returns (e.g. days in a window)
+MAX_ANALYTICS_PERIODS = 1000
 
 class JournalEntry(BaseModel):
     entry_text: str
+    style: Optional[str] = None
+
+class JournalBatch(BaseModel):
+    entries: List[str]
+    style: Optional[str] = None
+
+class GoalTargets(BaseModel):
+    daily_streak: Optional[int] = Field(None, gt=0)
+    weekly_entries: Optional[int] = Field(None, gt=0)
+    total_entries: Optional[int] = Field(None, gt=0)
+
+def check_style(style):
+    """Reject reflection styles the template bank does not know"""
+    names = get_reflection_bank().style_names
+    if style is not None and style not in names:
+        raise HTTPException(status_code=400, detail=f"Unknown reflection style '{style}' (choose from {', '.join(names)})")
+
+def get_user_id(x_user_id: Optional[str] = Header(None), x_proxy_secret: Optional[str] = Header(None)):
+    """User the request acts for
+    
+    Without sharding there is one journal, whose stats and goal targets are
+    shared, so every request acts for 'default' and X-User-Id is ignored.
+    With sharding, X-User-Id is required and only accepted from a trusted
+    proxy (JOURNAL_TRUST_USER_HEADER, plus X-Proxy-Secret when
+    JOURNAL_PROXY_SECRET is set).
+    """
+    if shard_router is None:
+        return "default"
+    if not TRUST_USER_HEADER or (
+        PROXY_SECRET is not None
+        and not hmac.compare_digest((x_proxy_secret or "").encode(), PROXY_SECRET.encode())
+    ):
+        raise HTTPException(status_code=401, detail="Requests must come through the authenticating proxy")
+    if not x_user_id:
+        raise HTTPException(status_code=401, detail="Missing X-User-Id header")
+    return x_user_id
+
+async def get_journal(user_id: str = Depends(get_user_id)):
+    """The agent holding the user's journal: their shard, or the shared journal
+    
+    A shard stays leased until the response (including a streamed body) is done.
+    """
+    if shard_router is None:
+        if journal_agent is None:
+            raise HTTPException(status_code=500, detail="Journal agent not initialized")
+        yield journal_agent
+        return
+    agent = shard_router.lease_open(user_id) or await run_db(shard_router.acquire, user_id)
+    try:
+        yield agent
+    finally:
+        retired = shard_router.release(agent)
+        if retired is not None:
+            await run_db(shard_router.close_agent, retired)
 
 @app.post("/api/journal/process")
-async def process_entry(entry: JournalEntry):
+async def process_entry(entry: JournalEntry, agent=Depends(get_journal)):
     """Process a new journal entry"""
+    check_style(entry.style)
     try:
-        if journal_agent is None:
-            print("❌ Journal agent is None")
-            raise HTTPException(status_code=500, detail="Journal agent not initialized")
-        
-        print(f"🔄 Processing entry: {entry.entry_text[:50]}...")
-        result = journal_agent.process_journal_entry(entry.entry_text)
-        print(f"✅ Successfully processed entry")
+        log.info("Processing entry", extra={'entry': redact(entry.entry_text)})
+        result = await agent.process_journal_entry_async(entry.entry_text, entry.style)
+        log.info("Processed entry", extra={'success': result['success']})
         return result
+    except HTTPException:
+        raise
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"❌ Error processing entry: {e}")
-        print(f"❌ Full traceback: {error_details}")
+        log.exception("Error processing entry")
+        raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
+
+@app.post("/api/journal/process/stream")
+async def process_entry_stream(entry: JournalEntry, agent=Depends(get_journal)):
+    """Process a journal entry, streaming each analysis stage as Server-Sent Events
+    
+    Events: emotions, summary, reflection (each as soon as it is ready), then
+    saved with the stored entry and its id, or error.
+    """
+    check_style(entry.style)
+    
+    async def events():
+        async for event, data in agent.stream_journal_entry(entry.entry_text, entry.style):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/api/journal/process/batch")
+async def process_entries(batch: JournalBatch, agent=Depends(get_journal)):
+    """Process a batch of journal entries (e.g. an offline sync) in one transaction"""
+    if len(batch.entries) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH_SIZE} entries)")
+    check_style(batch.style)
+    
+    try:
+        results = await agent.process_journal_entries_async(batch.entries, batch.style)
+        processed = sum(1 for result in results if result['success'])
+        log.info("Processed batch", extra={'processed': processed, 'failed': len(results) - processed})
+        return {
+            "success": True,
+            "processed": processed,
+            "failed": len(results) - processed,
+            "results": results
+        }
+    except Exception as e:
+        log.exception("Error processing batch")
         raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
 
 @app.get("/api/journal/entries")
-async def get_entries(limit: int = 10):
-    """Get recent journal entries"""
+async def get_entries(
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    agent=Depends(get_journal),
+):
+    """Get a page of journal entries, newest first
+    
+    Pass next_cursor as `before` for older entries and prev_cursor as `after`
+    for newer ones. `fields` (e.g. "summary,emotions") limits the columns
+    returned; id and created_at are always included.
+    """
     try:
-        if journal_agent is None:
-            raise HTTPException(status_code=500, detail="Journal agent not initialized")
-            
-        entries = journal_agent.get_recent_entries(limit)
-        print(f"✅ Retrieved {len(entries)} entries")
-        return {"success": True, "entries": entries}
+        key = ("entries", agent.data_version, limit, before, after, fields)
+        page = await response_cache.get_or_compute(
+            key, lambda: run_db(agent.get_entries_page, limit, before=before, after=after, fields=fields)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        log.exception("Error getting entries")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    log.debug("Retrieved entries", extra={'count': len(page['entries'])})
+    return {"success": True, **page}
+
+def _parse_date(value, name):
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"'{name}' must be a YYYY-MM-DD date")
+
+def _search(agent, q, date_from, date_to, limit):
+    with agent.pool.reader() as conn:
+        return search_entries(conn, q, date_from=date_from, date_to=date_to, limit=limit)
+
+@app.get("/api/journal/search")
+async def search_journal(
+    q: str,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_RESULTS),
+    agent=Depends(get_journal),
+):
+    """Full-text search over entries and summaries, best matches first"""
+    date_from = _parse_date(date_from, "from")
+    date_to = _parse_date(date_to, "to")
+    try:
+        results = await run_db(_search, agent, q, date_from, date_to, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"❌ Error getting entries: {e}")
+        log.exception("Error searching entries")
         raise HTTPException(status_code=500, detail=str(e))
+    return {"success": True, "query": q, "results": results}
+
+@app.get("/api/journal/export")
+async def export_entries(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    agent=Depends(get_journal),
+):
+    """Stream the whole journal (or a date range) as NDJSON or CSV"""
+    date_from = _parse_date(date_from, "from")
+    date_to = _parse_date(date_to, "to")
+    return StreamingResponse(
+        iter_export(agent.pool, format, date_from, date_to),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="journal.{format}"'},
+    )
+
+@app.post("/api/journal/import")
+async def import_journal(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    reanalyze: bool = False,
+    style: Optional[str] = None,
+    agent=Depends(get_journal),
+):
+    """Import an NDJSON or CSV upload (the raw request body), parsed as it streams in
+    
+    The upload is parsed on the import pool; only its chunked writes take a
+    DB worker, so a slow upload does not hold one up.
+    """
+    check_style(style)
+    
+    pipe = BodyPipe()
+    
+    def read_upload():
+        try:
+            return import_entries(
+                agent, pipe.text(), format, reanalyze=reanalyze, style=style,
+                save=lambda entries, cache_keys: call_db(agent.save_entries, entries, cache_keys)
+            )
+        finally:
+            pipe.abandon()
+    
+    importer = asyncio.ensure_future(run_import(read_upload))
+    try:
+        async for chunk in request.stream():
+            if chunk and not await asyncio.to_thread(pipe.push, chunk):
+                break
+        await asyncio.to_thread(pipe.push, None)
+        report = await importer
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Upload is not valid UTF-8: {e}")
+    except Exception as e:
+        pipe.interrupt()
+        log.exception("Error importing entries")
+        raise HTTPException(status_code=500, detail=f"Import error: {str(e)}")
+    log.info("Imported entries", extra={'imported': report['imported'], 'failed': report['failed']})
+    return {"success": True, **report}
+
+def _load_analytics(agent, date_from, date_to, granularity):
+    with agent.pool.reader() as conn:
+        return load_range(conn, date_from, date_to, granularity)
 
 @app.get("/api/journal/analytics")
-async def get_analytics():
-    """Get mood analytics and insights"""
+async def get_analytics(
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    granularity: str = Query("day", pattern="^(day|week|month)$"),
+    agent=Depends(get_journal),
+):
+    """Get mood analytics and insights
+    
+    Defaults to the last 7 days by day. `from`/`to` (YYYY-MM-DD, inclusive)
+    pick any window and `granularity` buckets it by day, week or month.
+    """
+    today = datetime.now().date()
+    default_window = date_from is None and date_to is None
+    date_to = datetime.strptime(_parse_date(date_to, "to"), '%Y-%m-%d').date() if date_to else today
+    date_from = (
+        datetime.strptime(_parse_date(date_from, "from"), '%Y-%m-%d').date() if date_from
+        else date_to - timedelta(days=7)
+    )
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if count_periods(date_from, date_to, granularity) > MAX_ANALYTICS_PERIODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Window spans more than {MAX_ANALYTICS_PERIODS} {granularity}s; use a coarser granularity"
+        )
     try:
-        if journal_agent is None:
-            raise HTTPException(status_code=500, detail="Journal agent not initialized")
-            
-        conn = sqlite3.connect(journal_agent.db_path)
-        cursor = conn.cursor()
-        
-        # Get entries from last 7 days
-        week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-        cursor.execute('''
-            SELECT date, emotions FROM entries 
-            WHERE date >= ? 
-            ORDER BY date
-        ''', (week_ago,))
-        
-        entries = cursor.fetchall()
-        conn.close()
-        
-        # Process mood data
-        daily_moods = {}
-        all_emotions = []
-        
-        for date, emotions_str in entries:
-            if emotions_str:
-                emotions = [e.strip().lower() for e in emotions_str.split(',')]
-                daily_moods[date] = emotions
-                all_emotions.extend(emotions)
-        
-        # Count emotion frequencies
-        emotion_counts = Counter(all_emotions)
-        top_emotions = dict(emotion_counts.most_common(5))
-        
-        return {
-            "success": True,
-            "analytics": {
-                "daily_moods": daily_moods,
-                "top_emotions": top_emotions,
-                "total_entries": len(entries),
-                "week_summary": f"You've journaled {len(entries)} times this week!"
-            }
+        key = ("analytics", agent.data_version, date_from, date_to, granularity)
+        analytics = await response_cache.get_or_compute(
+            key, lambda: run_db(_load_analytics, agent, date_from, date_to, granularity)
+        )
+    except Exception as e:
+        log.exception("Error getting analytics")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    total_entries = analytics['total_entries']
+    return {
+        "success": True,
+        "analytics": {
+            "from": date_from.isoformat(),
+            "to": date_to.isoformat(),
+            "granularity": granularity,
+            **analytics,
+            "week_summary": (
+                f"You've journaled {total_entries} times this week!" if default_window
+                else f"You've journaled {total_entries} times between {date_from} and {date_to}!"
+            )
         }
-        
+    }
+
+# Each journal's entries as NumPy columns, topped up with new entries on use
+_trend_engines = weakref.WeakKeyDictionary()
+
+def _load_trends(agent, date_from, date_to, window):
+    engine = _trend_engines.get(agent)
+    if engine is None:
+        engine = _trend_engines.setdefault(agent, trends.TrendEngine())
+    with agent.pool.reader() as conn:
+        engine.refresh(conn)
+    return engine.analyze(date_from, date_to, window)
+
+@app.get("/api/journal/trends")
+async def get_trends(
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    window: int = Query(7, ge=1, le=365),
+    agent=Depends(get_journal),
+):
+    """Mood trend, emotion co-occurrence and day-of-week / time-of-day patterns
+    
+    Covers the whole journal unless `from`/`to` narrow it; `window` is the
+    number of days in the mood moving average.
+    """
+    if trends is None:
+        raise HTTPException(status_code=503, detail="Trend analytics need numpy (pip install numpy)")
+    date_from = _parse_date(date_from, "from")
+    date_to = _parse_date(date_to, "to")
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    try:
+        key = ("trends", agent.data_version, date_from, date_to, window)
+        result = await response_cache.get_or_compute(key, lambda: run_db(
+            _load_trends, agent,
+            date_from and datetime.strptime(date_from, '%Y-%m-%d').date(),
+            date_to and datetime.strptime(date_to, '%Y-%m-%d').date(),
+            window,
+        ))
     except Exception as e:
+        log.exception("Error computing trends")
         raise HTTPException(status_code=500, detail=str(e))
+    return {"success": True, "trends": {"from": date_from, "to": date_to, **result}}
+
+def _load_goals(agent, user_id):
+    with agent.pool.reader() as conn:
+        return load_goals(conn, user_id)
+
+def _save_targets(agent, user_id, targets):
+    with agent.pool.writer() as conn:
+        return save_targets(conn, user_id, targets)
+
+def _progress(current, target):
+    return {
+        "current": current,
+        "target": target,
+        "progress": min(current / target * 100, 100)
+    }
 
 @app.get("/api/journal/goals")
-async def get_goals():
+async def get_goals(user_id: str = Depends(get_user_id), agent=Depends(get_journal)):
     """Get journaling goals and progress"""
     try:
-        if journal_agent is None:
-            raise HTTPException(status_code=500, detail="Journal agent not initialized")
-            
-        conn = sqlite3.connect(journal_agent.db_path)
-        cursor = conn.cursor()
-        
-        # Get total entries
-        cursor.execute('SELECT COUNT(*) FROM entries')
-        total_entries = cursor.fetchone()[0]
-        
-        # Get entries this week
-        week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-        cursor.execute('SELECT COUNT(*) FROM entries WHERE date >= ?', (week_ago,))
-        week_entries = cursor.fetchone()[0]
-        
-        # Get streak (consecutive days with entries)
-        cursor.execute('''
-            SELECT date FROM entries 
-            ORDER BY date DESC
-        ''')
-        dates = [row[0] for row in cursor.fetchall()]
-        
-        streak = 0
-        current_date = datetime.now().date()
-        for date_str in dates:
-            entry_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            if entry_date == current_date or entry_date == current_date - timedelta(days=streak):
-                if entry_date == current_date - timedelta(days=streak):
-                    streak += 1
-                current_date = entry_date
-            else:
-                break
-        
-        conn.close()
+        # Streaks depend on today's date as well as on the data
+        key = ("goals", agent.data_version, datetime.now().strftime('%Y-%m-%d'), user_id)
+        stats = await response_cache.get_or_compute(key, lambda: run_db(_load_goals, agent, user_id))
+        targets = stats['targets']
         
         # Calculate goals
         goals = {
-            "daily_streak": {
-                "current": streak,
-                "target": 7,
-                "progress": min(streak / 7 * 100, 100)
-            },
-            "weekly_entries": {
-                "current": week_entries,
-                "target": 5,
-                "progress": min(week_entries / 5 * 100, 100)
-            },
-            "total_entries": {
-                "current": total_entries,
-                "target": 30,
-                "progress": min(total_entries / 30 * 100, 100)
-            }
+            "daily_streak": dict(
+                _progress(stats['streak'], targets['daily_streak']),
+                longest=stats['longest_streak']
+            ),
+            "weekly_entries": _progress(stats['week_entries'], targets['weekly_entries']),
+            "total_entries": _progress(stats['total_entries'], targets['total_entries'])
         }
+        mood = {"week_average": stats['week_mood'], "week_arousal": stats['week_arousal']}
         
-        return {"success": True, "goals": goals}
+        return {"success": True, "goals": goals, "mood": mood}
         
     except Exception as e:
-        print(f"❌ Error getting goals: {e}")
+        log.exception("Error getting goals")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.put("/api/journal/goals/targets")
+async def update_goal_targets(
+    targets: GoalTargets, user_id: str = Depends(get_user_id), agent=Depends(get_journal)
+):
+    """Set the user's goal targets (omitted fields keep their current value)"""
+    try:
+        saved = await run_db(_save_targets, agent, user_id, targets.model_dump())
+        return {"success": True, "targets": saved}
+    except Exception as e:
+        log.exception("Error saving goal targets")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _analysis_cache_stats(agent):
+    with agent.pool.reader() as conn:
+        return agent.analysis_cache.stats(conn)
+
+@app.get("/api/journal/cache/stats")
+async def get_cache_stats(agent=Depends(get_journal)):
+    """Response cache and analysis cache hit/miss counters (the analysis cache is the user's shard's)"""
+    stats = {"success": True, "cache": response_cache.stats()}
+    stats["analysis_cache"] = await run_db(_analysis_cache_stats, agent)
+    if shard_router is not None:
+        stats["shards"] = shard_router.stats()
+    return stats
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus scrape endpoint (only when JOURNAL_METRICS is set)"""
+    if not metrics.ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (set JOURNAL_METRICS=1)")
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close pooled LLM provider connections"""
+    if shard_router is not None:
+        await shard_router.aclose()
+    elif journal_agent is not None:
+        await journal_agent.aclose()
+
 @app.get("/")
 async def root():
     return {"message": "AI Journal API is running! 🚀"}
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+API benchmark suite: every main endpoint at realistic journal sizes
+
+Drives api_server.app in-process over httpx's ASGI transport against corpus
+snapshots of 1k, 100k and 1M entries (built by corpus.py on first use, copied
+in afterwards), and reports p50/p95/p99 latency and throughput per endpoint.
+Read endpoints are measured with the response cache disabled (pass
+--with-cache to keep it) so the numbers reflect the database work behind them.
+
+Results are written as JSON; pass a previous results file as --baseline to
+print the change against it:
+
+    python backend/benchmarks/bench_api.py --sizes 1000,100000 --output before.json
+    python backend/benchmarks/bench_api.py --sizes 1000,100000 --baseline before.json
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(BENCH_DIR, '..')
+sys.path.append(BACKEND_DIR)
+
+# The server logs every request; keep the report readable
+os.environ.setdefault('JOURNAL_LOG_LEVEL', 'WARNING')
+
+import httpx
+
+from corpus import load_snapshot
+
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results', 'bench_api.json')
+
+ENTRY = "Worked on the project all day and felt tired, but grateful for my team. Tomorrow is another day."
+
+# name -> (method, path, request kwargs)
+SCENARIOS = {
+    'process': ('POST', '/api/journal/process', {'json': {'entry_text': ENTRY}}),
+    'entries': ('GET', '/api/journal/entries', {'params': {'limit': 20}}),
+    'analytics': ('GET', '/api/journal/analytics', {}),
+    'goals': ('GET', '/api/journal/goals', {}),
+}
+
+
+def percentile(ordered, pct):
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_scenario(client, method, path, kwargs, requests, concurrency):
+    latencies = []
+    remaining = [requests]
+
+    async def worker():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            start = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'throughput_rps': len(latencies) / elapsed,
+    }
+
+
+async def bench_size(db_path, scenarios, requests, concurrency, with_cache):
+    os.environ['JOURNAL_DB_PATH'] = db_path
+    import api_server
+    api_server = importlib.reload(api_server)
+    if not with_cache:
+        from response_cache import ResponseCache
+        api_server.response_cache = ResponseCache(max_entries=0)
+
+    results = {}
+    transport = httpx.ASGITransport(app=api_server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for name in scenarios:
+            method, path, kwargs = SCENARIOS[name]
+            # A few untimed requests warm up statement caches and connections
+            await run_scenario(client, method, path, kwargs, min(10, requests), 1)
+            results[name] = await run_scenario(client, method, path, kwargs, requests, concurrency)
+    api_server.journal_agent.close()
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """Print each metric's change against a previous results file"""
+    print(f"\nChange vs. baseline {baseline['meta'].get('revision')} ({baseline['meta']['timestamp']}):")
+    for size, endpoints in results['sizes'].items():
+        for name, current in endpoints.items():
+            previous = baseline['sizes'].get(size, {}).get(name)
+            if previous is None:
+                continue
+            changes = '  '.join(
+                f"{metric} {(current[metric] / previous[metric] - 1) * 100:+6.1f}%"
+                for metric in ('p50_ms', 'p99_ms', 'throughput_rps') if previous[metric]
+            )
+            print(f"{size:>9} {name:<10} {changes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process API benchmark suite")
+    parser.add_argument('--sizes', default='1000,100000,1000000', help="comma-separated entry counts")
+    parser.add_argument('--endpoints', default=','.join(SCENARIOS), help="comma-separated scenario names")
+    parser.add_argument('--requests', type=int, default=200, help="timed requests per endpoint")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0, help="corpus seed")
+    parser.add_argument('--with-cache', action='store_true', help="keep the response cache enabled")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', help="previous results file to compare against")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    scenarios = args.endpoints.split(',')
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(unknown)}")
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'seed': args.seed,
+            'with_cache': args.with_cache,
+        },
+        'sizes': {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            db_path = os.path.join(tmp, f'journal-{size}.db')
+            start = time.perf_counter()
+            load_snapshot(db_path, size, args.seed)
+            print(f"Loaded {size} entry corpus in {time.perf_counter() - start:.1f}s")
+            size_results = asyncio.run(
+                bench_size(db_path, scenarios, args.requests, args.concurrency, args.with_cache)
+            )
+            results['sizes'][str(size)] = size_results
+            for name, stats in size_results.items():
+                print(f"{size:>9} {name:<10} p50={stats['p50_ms']:7.2f}ms p95={stats['p95_ms']:7.2f}ms "
+                      f"p99={stats['p99_ms']:7.2f}ms {stats['throughput_rps']:8.1f} req/s")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
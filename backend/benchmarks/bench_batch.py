@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Benchmark: syncing an offline backlog one entry at a time vs. in one batch
+
+Usage: python backend/benchmarks/bench_batch.py [entries]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from journal_agent import JournalAgent
+
+ENTRY = "Worked on the project all day and felt tired, but grateful for my team. Tomorrow is another day."
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    texts = [f"{ENTRY} ({i})" for i in range(count)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        agent = JournalAgent(os.path.join(tmp, 'single.db'))
+        start = time.perf_counter()
+        for text in texts:
+            agent.process_journal_entry(text)
+        single = time.perf_counter() - start
+
+        agent = JournalAgent(os.path.join(tmp, 'batch.db'))
+        start = time.perf_counter()
+        agent.process_journal_entries(texts)
+        batch = time.perf_counter() - start
+
+    print(f"{count} entries one by one : {single * 1000:8.1f} ms")
+    print(f"{count} entries as a batch : {batch * 1000:8.1f} ms ({single / batch:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Cold-start harness for the serverless functions under backend/api/journal
+
+Every measurement runs in a fresh interpreter, the way a new function
+instance starts: it loads the function module from its file, as the runtime
+does, then sends one request straight to its ASGI app. Reported per function
+(medians over --runs): time to import the module, time from there to the
+first complete response, and their sum. One untimed run per function first
+creates the database and byte-code caches, so the timed runs see an
+up-to-date schema.
+
+    python backend/benchmarks/bench_cold_start.py [--runs 5] [--budget-ms 150]
+
+Exits non-zero when a function's median import-to-first-response time is
+over --budget-ms.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FUNCTIONS_DIR = os.path.join(BENCH_DIR, '..', 'api', 'journal')
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results', 'bench_cold_start.json')
+
+# name -> (method, query string, JSON body)
+FUNCTIONS = {
+    'entries': ('GET', 'limit=10', None),
+    'analytics': ('GET', '', None),
+    'process': ('POST', '', {'entry_text': "Felt calm and grateful after a long walk."}),
+}
+
+# Modules a cold start should not pay for
+HEAVY_MODULES = ('fastapi', 'starlette', 'pydantic', 'httpx', 'journal_agent', 'backend.journal_agent')
+
+# Modules that belong on the first request, not at import
+DEFERRED_MODULES = ('db_pool', 'dotenv')
+
+
+def probe(name):
+    """Child process: import one function and time its first response"""
+    import asyncio  # the runtime has its event loop loaded before any function
+    import importlib.util
+
+    method, query, body = FUNCTIONS[name]
+    start = time.perf_counter()
+    spec = importlib.util.spec_from_file_location(name, os.path.join(FUNCTIONS_DIR, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    imported = time.perf_counter()
+    loaded_at_import = [m for m in DEFERRED_MODULES if m in sys.modules]
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+        'scheme': 'https', 'path': f'/api/journal/{name}', 'raw_path': f'/api/journal/{name}'.encode(),
+        'query_string': query.encode(), 'root_path': '', 'server': ('cold', 443), 'client': ('bench', 1),
+        'headers': [(b'host', b'cold'), (b'content-type', b'application/json')],
+    }
+    request_body = json.dumps(body).encode() if body is not None else b''
+    response = {'body': b''}
+
+    async def receive():
+        return {'type': 'http.request', 'body': request_body, 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        else:
+            response['body'] += message.get('body', b'')
+
+    asyncio.run(module.app(scope, receive, send))
+    done = time.perf_counter()
+
+    print(json.dumps({
+        'import_ms': (imported - start) * 1000,
+        'first_response_ms': (done - imported) * 1000,
+        'total_ms': (done - start) * 1000,
+        'status': response['status'],
+        'success': json.loads(response['body']).get('success'),
+        'heavy_modules': [m for m in HEAVY_MODULES if m in sys.modules],
+        'loaded_at_import': loaded_at_import,
+    }))
+
+
+def run_probe(name, env):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--probe', name],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def measure(name, runs, workdir):
+    """Median cold start of one function over runs fresh interpreters"""
+    env = dict(os.environ, JOURNAL_DB_PATH=os.path.join(workdir, 'journal.db'))
+    run_probe(name, env)  # creates the database and .pyc files
+    samples = [run_probe(name, env) for _ in range(runs)]
+    result = {
+        metric: statistics.median(sample[metric] for sample in samples)
+        for metric in ('import_ms', 'first_response_ms', 'total_ms')
+    }
+    last = samples[-1]
+    result.update(
+        runs=runs, status=last['status'], success=last['success'],
+        heavy_modules=last['heavy_modules'], loaded_at_import=last['loaded_at_import'],
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serverless function cold-start harness")
+    parser.add_argument('--functions', default=','.join(FUNCTIONS), help="comma-separated function names")
+    parser.add_argument('--runs', type=int, default=5, help="fresh interpreters per function")
+    parser.add_argument('--budget-ms', type=float, help="fail if a median total is over this")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--probe', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.probe:
+        probe(args.probe)
+        return
+
+    names = args.functions.split(',')
+    unknown = [name for name in names if name not in FUNCTIONS]
+    if unknown:
+        parser.error(f"unknown functions: {', '.join(unknown)}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in names:
+            result = results[name] = measure(name, args.runs, workdir)
+            print(f"{name:<10} import={result['import_ms']:7.1f}ms "
+                  f"first response={result['first_response_ms']:7.1f}ms "
+                  f"total={result['total_ms']:7.1f}ms  HTTP {result['status']}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.budget_ms is not None:
+        over = [name for name, result in results.items() if result['total_ms'] > args.budget_ms]
+        if over:
+            sys.exit(f"Over the {args.budget_ms:g}ms budget: {', '.join(over)}")
+
+
+if __name__ == "__main__":
+    main()
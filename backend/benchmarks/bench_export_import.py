@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak memory of streaming export and import at growing journal sizes
+
+Exports the journal through GET /api/journal/export and uploads the result to
+POST /api/journal/import (in-process, over httpx's ASGI transport), tracking
+peak Python heap with tracemalloc. Bounded streaming shows up as a peak that
+stays flat while the entry count grows.
+
+Usage: python backend/benchmarks/bench_export_import.py [entries ...] [--format csv]
+"""
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(BACKEND_DIR)
+
+# The server logs every request; keep the report readable
+os.environ.setdefault('JOURNAL_LOG_LEVEL', 'WARNING')
+
+import httpx
+
+from corpus import load_snapshot
+
+UPLOAD_CHUNK = 64 * 1024
+
+
+async def stream_get(app, path, query, out):
+    """GET path from an ASGI app, writing the response body to out as it streams"""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'headers': [(b'host', b'test')], 'server': ('test', 80), 'client': ('bench', 1),
+    }
+
+    requested = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start' and message['status'] != 200:
+            raise RuntimeError(f"Export failed with HTTP {message['status']}")
+        if message['type'] == 'http.response.body':
+            out.write(message.get('body', b''))
+            if not message.get('more_body', False):
+                finished.set()
+
+    await app(scope, receive, send)
+
+
+async def run(count, fmt, tmp):
+    os.environ['JOURNAL_DB_PATH'] = load_snapshot(os.path.join(tmp, f'source-{count}.db'), count)
+    import api_server
+    api_server = importlib.reload(api_server)
+    export_path = os.path.join(tmp, f'export-{count}.{fmt}')
+
+    # httpx's ASGI transport buffers whole responses, so the export is read
+    # with a minimal ASGI call that writes each body chunk straight to disk
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open(export_path, 'wb') as out:
+        await stream_get(api_server.app, "/api/journal/export", f"format={fmt}", out)
+    export_time = time.perf_counter() - start
+    export_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # Upload into a fresh database
+    os.environ['JOURNAL_DB_PATH'] = os.path.join(tmp, f'target-{count}.db')
+    api_server = importlib.reload(api_server)
+    transport = httpx.ASGITransport(app=api_server.app)
+
+    async def body():
+        with open(export_path, 'rb') as f:
+            while chunk := f.read(UPLOAD_CHUNK):
+                yield chunk
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = await client.post("/api/journal/import", params={"format": fmt}, content=body())
+        response.raise_for_status()
+        import_time = time.perf_counter() - start
+        import_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    size_mb = os.path.getsize(export_path) / 1e6
+    print(f"{count:>9} entries ({size_mb:7.1f} MB {fmt}): "
+          f"export {export_time:6.1f}s peak {export_peak / 1e6:5.1f} MB | "
+          f"import {import_time:6.1f}s peak {import_peak / 1e6:5.1f} MB "
+          f"({response.json()['imported']} imported)")
+
+
+def main():
+    args = sys.argv[1:]
+    fmt = 'ndjson'
+    if '--format' in args:
+        index = args.index('--format')
+        fmt = args[index + 1]
+        del args[index:index + 2]
+    counts = [int(arg) for arg in args] or [1_000, 10_000, 100_000]
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in counts:
+            asyncio.run(run(count, fmt, tmp))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark: entries/sec with synchronous commits vs. group commit
+
+Many threads save one analyzed entry at a time, as concurrent API requests
+do. In sync mode each save is its own transaction; in group mode the
+background writer folds concurrent saves into shared transactions. Runs with
+synchronous=FULL by default so every commit is an fsync; pass NORMAL to
+measure the default pool settings.
+
+Group commit only saves fsyncs, so the result depends on the disk: with
+fsync at ~60us (a VM disk with a write cache) both modes run at ~4,000
+entries/s and group commit is no faster (0.9-1.1x); it only pays off on
+storage where an fsync takes milliseconds, which caps sync mode at one
+commit per fsync.
+The fsync latency of the target directory is printed first; pass a
+directory on the disk you deploy to.
+
+Usage: python backend/benchmarks/bench_group_commit.py [entries] [threads] [FULL|NORMAL] [dir]
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SYNCHRONOUS = sys.argv[3] if len(sys.argv) > 3 else 'FULL'
+os.environ['JOURNAL_DB_SYNCHRONOUS'] = SYNCHRONOUS
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from journal_agent import JournalAgent
+
+ENTRY = "Worked on the project all day and felt tired, but grateful for my team. Tomorrow is another day."
+
+
+def run(agent, entries, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda entry: agent.save_entries([entry]), entries))
+    return time.perf_counter() - start
+
+
+def fsync_latency(directory, rounds=100):
+    """Average seconds per write + fsync of a small file in directory"""
+    fd, path = tempfile.mkstemp(dir=directory)
+    try:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            os.write(fd, b'x' * 100)
+            os.fsync(fd)
+        return (time.perf_counter() - start) / rounds
+    finally:
+        os.close(fd)
+        os.remove(path)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    directory = sys.argv[4] if len(sys.argv) > 4 else None
+
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        print(f"fsync: {fsync_latency(tmp) * 1e6:.0f} us")
+        entries = [
+            JournalAgent(os.path.join(tmp, 'analysis.db'))._analyze_entry(f"{ENTRY} ({i})")
+            for i in range(count)
+        ]
+        print(f"{count} entries from {threads} threads, synchronous={SYNCHRONOUS}")
+        results = {}
+        for mode in ('sync', 'group'):
+            agent = JournalAgent(os.path.join(tmp, f'{mode}.db'), write_mode=mode)
+            results[mode] = run(agent, entries, threads)
+            groups = f", {agent.group_writer.groups} transactions" if agent.group_writer else ""
+            agent.close()
+            print(f"{mode:>6}: {count / results[mode]:8.0f} entries/s{groups}")
+        print(f"group/sync throughput: {results['sync'] / results['group']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sequential vs. concurrent summary/emotion/reflection provider calls
+
+Runs entry analysis against the stub LLM server (in-process, over httpx's ASGI
+transport) with a fixed per-call latency, first awaiting the three calls one
+after another and then fanning them out as JournalAgent does.
+
+Usage: python backend/benchmarks/bench_llm_fanout.py [entries] [latency_ms]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import httpx
+
+from journal_agent import JournalAgent
+from llm_providers import HTTPProvider
+from stub_llm_server import create_app
+
+ENTRY = "Worked on the project all day and felt tired, but grateful for my team. Tomorrow is another day."
+CONCURRENT_ENTRIES = 10
+
+
+async def sequential(agent, text):
+    for prompt in agent._build_prompts(text, 'motivational'):
+        await agent.provider.complete(prompt)
+
+
+async def fanned_out(agent, text):
+    await agent._analyze_entry_async(text)
+
+
+async def run(agent, analyze, count):
+    """Per-entry latencies with CONCURRENT_ENTRIES entries in flight"""
+    latencies = []
+    semaphore = asyncio.Semaphore(CONCURRENT_ENTRIES)
+
+    async def one(text):
+        async with semaphore:
+            start = time.perf_counter()
+            await analyze(agent, text)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(f"{ENTRY} ({i})") for i in range(count)))
+    return latencies, time.perf_counter() - start
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 100.0
+
+    provider = HTTPProvider(
+        base_url="http://stub",
+        transport=httpx.ASGITransport(app=create_app(latency_ms)),
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        agent = JournalAgent(os.path.join(tmp, 'journal.db'), provider=provider)
+        print(f"{count} entries, {latency_ms:.0f} ms per provider call, {CONCURRENT_ENTRIES} entries in flight")
+        for label, analyze in (("sequential", sequential), ("fanned out", fanned_out)):
+            latencies, elapsed = await run(agent, analyze, count)
+            print(f"{label:>11}: mean {statistics.mean(latencies) * 1000:7.1f} ms/entry, "
+                  f"{count / elapsed:6.1f} entries/s")
+        await agent.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
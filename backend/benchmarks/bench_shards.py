@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: write throughput as users are spread over more shards
+
+Writer processes (like several API workers) save entries one transaction at
+a time for users spread over 1, 2, 4, ... shard files, each through its own
+ShardRouter. With one shard every writer contends for the same database
+lock; with more, commits to different files proceed side by side. Commits
+fsync (synchronous=FULL) by default, as durable one-entry writes do; the gain
+needs free cores and disk queue depth to show, so it is flat on one CPU.
+
+    python backend/benchmarks/bench_shards.py [--shards 1,2,4,8] [--writers 8] [--seconds 3]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+ENTRY = {
+    'date': '2024-01-15', 'original_entry': "Long walk, then a quiet evening.",
+    'summary': "Long walk.", 'emotions': 'calm', 'reflection': "Nice.",
+}
+
+
+def writer(shard_dir, user, start_at, until, results):
+    from shards import ShardRouter
+
+    router = ShardRouter(shard_dir)
+    count = 0
+    with router.journal(user) as agent:
+        time.sleep(max(0, start_at - time.time()))
+        while time.time() < until:
+            agent.save_entry(dict(ENTRY))
+            count += 1
+    router.close()
+    results.put(count)
+
+
+def run(shard_count, writers, seconds):
+    from shards import ShardRouter
+
+    with tempfile.TemporaryDirectory() as tmp:
+        shard_dir = os.path.join(tmp, 'shards')
+        users = [f'user-{n}' for n in range(shard_count)]
+        router = ShardRouter(shard_dir, max_open=shard_count)
+        for user in users:
+            with router.journal(user):
+                pass  # create and migrate every shard before timing
+        router.close()
+
+        results = multiprocessing.Queue()
+        start_at = time.time() + 1  # time for every process to import and open its shard
+        processes = [
+            multiprocessing.Process(
+                target=writer, args=(shard_dir, users[i % shard_count], start_at, start_at + seconds, results)
+            )
+            for i in range(writers)
+        ]
+        for process in processes:
+            process.start()
+        total = sum(results.get() for _ in processes)
+        for process in processes:
+            process.join()
+    return total / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write throughput by shard count")
+    parser.add_argument('--shards', default='1,2,4,8', help="comma-separated shard counts")
+    parser.add_argument('--writers', type=int, default=8, help="writer processes")
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--synchronous', default='FULL', choices=['NORMAL', 'FULL'])
+    args = parser.parse_args()
+
+    # One transaction per save, as in the API's default write mode; both are
+    # read at import, which happens in the writer processes after this
+    os.environ['JOURNAL_WRITE_MODE'] = 'sync'
+    os.environ['JOURNAL_DB_SYNCHRONOUS'] = args.synchronous
+    os.environ.setdefault('JOURNAL_LOG_LEVEL', 'WARNING')
+
+    print(f"{args.writers} writer processes, synchronous={args.synchronous}")
+    baseline = None
+    for shard_count in (int(n) for n in args.shards.split(',')):
+        rate = run(shard_count, args.writers, args.seconds)
+        baseline = baseline or rate
+        print(f"{shard_count:>4} shards: {rate:9.0f} writes/s  ({rate / baseline:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
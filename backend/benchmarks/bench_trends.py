@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: NumPy trend engine over a generated corpus
+
+Loads a corpus snapshot (built on first use, see corpus.py) into a
+TrendEngine, then times a full analysis, a one-year window and the
+incremental refresh after one more entry is saved.
+
+    python backend/benchmarks/bench_trends.py [--entries 1000000] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('JOURNAL_LOG_LEVEL', 'WARNING')
+
+import corpus
+from db_pool import close_all
+from journal_agent import JournalAgent
+from trends import TrendEngine
+
+
+def timed(call, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trend engine timings")
+    parser.add_argument('--entries', type=int, default=1_000_000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    end = date.today()
+    with tempfile.TemporaryDirectory() as tmp:
+        agent = JournalAgent(corpus.load_snapshot(os.path.join(tmp, 'journal.db'), args.entries, end=end))
+        engine = TrendEngine()
+        with agent.pool.reader() as conn:
+            start = time.perf_counter()
+            engine.refresh(conn)
+            load_ms = (time.perf_counter() - start) * 1000
+
+        year_start = end.replace(year=end.year - 1)
+        full_ms = timed(engine.analyze, args.runs)
+        year_ms = timed(lambda: engine.analyze(year_start, end), args.runs)
+
+        agent.save_entry({
+            'date': end.isoformat(), 'original_entry': "One more.", 'summary': "One more.",
+            'emotions': 'calm', 'reflection': "Nice.",
+        })
+        with agent.pool.reader() as conn:
+            start = time.perf_counter()
+            engine.refresh(conn)
+            refresh_ms = (time.perf_counter() - start) * 1000
+        close_all()
+
+    print(f"{args.entries} entries, {len(engine.emotions)} emotions")
+    print(f"  initial load      {load_ms:8.1f}ms")
+    print(f"  analyze (all)     {full_ms:8.1f}ms")
+    print(f"  analyze (1 year)  {year_ms:8.1f}ms")
+    print(f"  refresh (+1)      {refresh_ms:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
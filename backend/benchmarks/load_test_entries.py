@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Load test: GET /api/journal/entries latency with and without a concurrent
+stream of POST /api/journal/process calls.
+
+The app is driven in-process through httpx's ASGI transport, so every request
+shares one event loop - exactly the situation where a blocking handler would
+stall everything else.
+
+Reads go to the database: the response cache is disabled for the two main
+phases, and a last phase reports cached reads separately.
+
+Usage: python backend/benchmarks/load_test_entries.py [seconds]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(BACKEND_DIR)
+
+# The server logs every request; keep the report readable
+os.environ.setdefault('JOURNAL_LOG_LEVEL', 'WARNING')
+
+import httpx
+
+from corpus import load_snapshot
+
+ENTRY = "Long day at work on the project. Felt stressed but proud of what we shipped. " * 20
+READERS = 4
+WRITERS = 4
+WRITES_PER_SECOND = 100  # total rate of the background POST stream
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def read_loop(client, until, latencies):
+    while time.perf_counter() < until:
+        start = time.perf_counter()
+        response = await client.get("/api/journal/entries", params={"limit": 20})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        # A cached response completes without suspending, so yield like a
+        # network client would or this loop starves the other tasks
+        await asyncio.sleep(0)
+
+
+async def write_loop(client, until, counter):
+    interval = WRITERS / WRITES_PER_SECOND
+    while time.perf_counter() < until:
+        start = time.perf_counter()
+        response = await client.post("/api/journal/process", json={"entry_text": ENTRY})
+        response.raise_for_status()
+        counter[0] += 1
+        await asyncio.sleep(max(0.0, interval - (time.perf_counter() - start)))
+
+
+async def run_phase(app, seconds, with_writes):
+    latencies = []
+    writes = [0]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        until = time.perf_counter() + seconds
+        tasks = [read_loop(client, until, latencies) for _ in range(READERS)]
+        if with_writes:
+            tasks += [write_loop(client, until, writes) for _ in range(WRITERS)]
+        await asyncio.gather(*tasks)
+    return latencies, writes[0]
+
+
+def report(label, latencies, writes, seconds):
+    print(f"{label:<22} reads={len(latencies):>6} "
+          f"p50={statistics.median(latencies) * 1000:7.2f}ms "
+          f"p99={percentile(latencies, 99) * 1000:7.2f}ms "
+          f"writes/s={writes / seconds:8.1f}")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    with tempfile.TemporaryDirectory() as tmp:
+        # Seed some history so the read path does real work
+        os.environ['JOURNAL_DB_PATH'] = load_snapshot(os.path.join(tmp, 'journal.db'), 1000)
+        import api_server
+        from response_cache import ResponseCache
+
+        cache = api_server.response_cache
+        api_server.response_cache = ResponseCache(max_entries=0)
+        idle, _ = asyncio.run(run_phase(api_server.app, seconds, with_writes=False))
+        busy, writes = asyncio.run(run_phase(api_server.app, seconds, with_writes=True))
+        api_server.response_cache = cache
+        cached, _ = asyncio.run(run_phase(api_server.app, seconds, with_writes=False))
+
+    report("reads only", idle, 0, seconds)
+    report("reads + POST stream", busy, writes, seconds)
+    report("cached reads only", cached, 0, seconds)
+
+
+if __name__ == "__main__":
+    main()
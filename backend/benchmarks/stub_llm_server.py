@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Stub LLM server for offline benchmarks and development
+
+Speaks the subset of /v1/chat/completions that HTTPProvider uses and answers
+every prompt with canned text after a configurable delay, so provider
+latency can be simulated without a real model:
+
+    python backend/benchmarks/stub_llm_server.py --latency-ms 300 --port 8100
+    JOURNAL_LLM_PROVIDER=http JOURNAL_LLM_BASE_URL=http://127.0.0.1:8100 python backend/api_server.py
+"""
+import argparse
+import asyncio
+import random
+
+from fastapi import FastAPI
+
+
+def create_app(latency_ms=300.0, jitter_ms=0.0):
+    """Stub app; each completion takes latency_ms +/- jitter_ms"""
+    app = FastAPI(title="Stub LLM")
+    app.state.calls = 0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(body: dict):
+        app.state.calls += 1
+        delay = latency_ms + random.uniform(-jitter_ms, jitter_ms)
+        await asyncio.sleep(max(0.0, delay) / 1000)
+
+        prompt = body['messages'][-1]['content']
+        if 'Summarize' in prompt:
+            content = "A full day with some highs and lows."
+        elif 'emotions' in prompt:
+            content = "tired, grateful"
+        else:
+            content = "You showed up for yourself today. Rest well and build on it tomorrow."
+        return {
+            "object": "chat.completion",
+            "model": body.get('model', 'stub'),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        }
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--latency-ms', type=float, default=300.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    print(f"🤖 Stub LLM on http://{args.host}:{args.port} ({args.latency_ms:.0f} ms per call)")
+    uvicorn.run(create_app(args.latency_ms, args.jitter_ms), host=args.host, port=args.port)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Deterministic large-corpus generator and snapshot fixtures
+
+Writes years of realistic-looking journal history straight into the entries
+schema: one to four entries on most days, the odd skipped day, lengths from a
+line to a few paragraphs and an emotion mix that drifts over time. History
+never reaches back more than `years` (default 10); a corpus too large for
+that at one to four a day gets proportionally more entries per day instead,
+as a journal shared by many users would. The same entry count, seed, end
+date and span always produce the same rows.
+
+Rows are bulk-inserted into a bare entries table; the remaining migrations
+then build the rollups, stats, indexes and search index over them in one go,
+which is far faster than maintaining all of that row by row. Snapshots are
+generated once into JOURNAL_SNAPSHOT_DIR and copied in from then on:
+
+    python backend/corpus.py journal.db --entries 1000000 [--seed 0] [--end 2024-12-31] [--years 10]
+    python backend/corpus.py --entries 1000000   # build (or reuse) a snapshot
+
+A million entries take about 25 seconds, mostly in the migrations that
+score moods (~12s) and build the search index (~6s), which is why
+snapshots are kept.
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from migrations import MIGRATIONS, run_migrations
+from reflections import get_reflection_bank
+
+SNAPSHOT_DIR = os.getenv(
+    'JOURNAL_SNAPSHOT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots')
+)
+
+# Entries written on a day: skipped days, quick notes, busy days
+ENTRIES_PER_DAY = (0, 1, 2, 3, 4)
+ENTRIES_PER_DAY_WEIGHTS = (10, 40, 30, 15, 5)
+
+# Longest history generated, in years
+YEARS = 10
+
+POSITIVE = {
+    'happy': ("Today was a happy day.", "I felt real joy this afternoon.", "Everything just felt great."),
+    'proud': ("I feel proud of what I accomplished.", "We finally achieved the milestone.", "Small success, but it counts."),
+    'grateful': ("I'm grateful for my friends.", "Feeling thankful for a quiet evening.", "I really appreciate my family."),
+    'calm': ("The evening was calm and peaceful.", "I felt relaxed after the walk.", "A slow, serene morning."),
+    'motivated': ("I'm motivated to keep going.", "Felt inspired after the talk.", "Focused and determined all day."),
+    'excited': ("I'm excited about the trip.", "Thrilled with how the plan came together.", "Felt enthusiastic about next week."),
+}
+NEGATIVE = {
+    'sad': ("Feeling a bit sad tonight.", "I was down most of the day.", "There was a sadness I couldn't shake."),
+    'stressed': ("I'm stressed about the deadline.", "So much pressure this week.", "A stressful day from start to finish."),
+    'anxious': ("I feel anxious about tomorrow.", "Worried about how the meeting will go.", "Nervous energy all evening."),
+    'tired': ("I'm so tired.", "Exhausted after a long day.", "The fatigue caught up with me."),
+    'frustrated': ("Frustrated that nothing worked.", "Annoyed at how the day went.", "Irritated by the constant interruptions."),
+    'overwhelmed': ("I feel overwhelmed.", "It's all too much right now.", "Overwhelmed by everything on my list."),
+}
+EMOTION_PHRASES = {**POSITIVE, **NEGATIVE}
+POSITIVE_EMOTIONS = tuple(POSITIVE)
+NEGATIVE_EMOTIONS = tuple(NEGATIVE)
+
+WORK_FILLER = (
+    "Spent the morning working on the project.",
+    "Had three meetings about the new release.",
+    "Studied for the exam after lunch.",
+    "Reviewed a colleague's work and left notes.",
+    "The project demo went better than expected.",
+)
+LIFE_FILLER = (
+    "Went for a run before breakfast.",
+    "Cooked dinner with my partner.",
+    "Called my mom and caught up on family news.",
+    "Read a few chapters of my book.",
+    "The weather was grey and rainy.",
+    "Took the dog to the park.",
+    "Cleaned the apartment and did laundry.",
+    "Met an old friend for coffee.",
+    "Watched a movie and went to bed early.",
+    "Tried a new recipe that mostly worked.",
+)
+
+
+# Distinct entries generated per mood; rows are drawn from these pools
+VARIANT_POOL = 20_000
+
+
+def _daily_counts(rng, count, years=YEARS):
+    """Entries per day, oldest day first, summing to exactly count
+
+    At most `years` of days; if count does not fit at the usual rate, every
+    day's draw is scaled up so the busy and skipped days keep their shape.
+    """
+    max_days = max(1, round(years * 365.25))
+    mean = sum(n * w for n, w in zip(ENTRIES_PER_DAY, ENTRIES_PER_DAY_WEIGHTS)) / sum(ENTRIES_PER_DAY_WEIGHTS)
+    if count > max_days * mean * 0.95:
+        draws = rng.choices(ENTRIES_PER_DAY, ENTRIES_PER_DAY_WEIGHTS, k=max_days)
+        draws[-1] = draws[-1] or 1  # the end date always has entries
+        scale = count / sum(draws)
+        days = [int(n * scale) for n in draws]
+        # The rounding remainder goes to random days that have entries
+        for i in rng.sample([i for i, n in enumerate(draws) if n], count - sum(days)):
+            days[i] += 1
+        return days
+
+    days = []
+    total = 0
+    while total < count:
+        for n in rng.choices(ENTRIES_PER_DAY, ENTRIES_PER_DAY_WEIGHTS, k=max(16, (count - total) // 2)):
+            n = min(n, count - total)
+            days.append(n)
+            total += n
+            if total == count:
+                break
+    return days
+
+
+def _variant(rng, bank, positive):
+    """One (text, summary, emotions, reflection) with a mostly positive or negative mix"""
+    emotions = []
+    for _ in range(rng.choice((1, 1, 2, 2, 3))):
+        pool = POSITIVE_EMOTIONS if (rng.random() < 0.85) == positive else NEGATIVE_EMOTIONS
+        emotion = rng.choice(pool)
+        if emotion not in emotions:
+            emotions.append(emotion)
+
+    # Mostly a few sentences, now and then a long entry
+    at_work = rng.random() < 0.5
+    filler = rng.choices(
+        WORK_FILLER if at_work else LIFE_FILLER,
+        k=rng.randint(15, 30) if rng.random() < 0.05 else rng.randint(0, 6),
+    )
+    sentences = filler + [rng.choice(EMOTION_PHRASES[emotion]) for emotion in emotions]
+    rng.shuffle(sentences)
+    text = ' '.join(sentences)
+    summary = text if len(sentences) <= 2 else f"{sentences[0]} {sentences[-1]}"
+
+    reflections = bank.styles[bank.default_style]
+    category = bank.category_for(SimpleNamespace(emotions=emotions, topics=('work',) if at_work else ()))
+    reflection = rng.choice(reflections.get(category) or reflections[bank.default_category])
+    return text, summary, ', '.join(emotions), reflection
+
+
+def generate_entries(count, seed=0, end=None, years=YEARS):
+    """Yield (date, original_entry, summary, emotions, reflection, created_at) rows
+
+    Rows come oldest first, the newest falls on end (default today) and the
+    oldest at most `years` before it, so
+    ids and created_at agree on order. Each day's mood drifts from the last
+    and decides how likely its entries are to come from the positive pool.
+    """
+    rng = random.Random(seed)
+    bank = get_reflection_bank()
+    size = max(1, min(VARIANT_POOL, count))
+    positive = [_variant(rng, bank, True) for _ in range(size)]
+    negative = [_variant(rng, bank, False) for _ in range(size)]
+    end = end or date.today()
+    days = _daily_counts(rng, count, years)
+    day = end - timedelta(days=len(days) - 1)
+    one_day = timedelta(days=1)
+    random_ = rng.random
+    mood = 0.6  # chance an entry comes from the positive pool
+
+    for n in days:
+        if n:
+            mood = min(0.9, max(0.1, mood + random_() * 0.16 - 0.08))
+            day_str = day.isoformat()
+            for minute in sorted(420 + int(random_() * 1020) for _ in range(n)):
+                pool = positive if random_() < mood else negative
+                text, summary, emotions, reflection = pool[int(random_() * size)]
+                yield (
+                    day_str, text, summary, emotions, reflection,
+                    f"{day_str} {minute // 60:02d}:{minute % 60:02d}:00",
+                )
+        day += one_day
+
+
+def build_corpus(path, count, seed=0, end=None, years=YEARS):
+    """Create a fully migrated journal database at path holding count generated entries"""
+    if os.path.exists(path):
+        raise FileExistsError(f"{path} already exists")
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        # A half-built file is thrown away anyway, so skip the journal
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.execute('BEGIN')
+        version, _, create_entries = MIGRATIONS[0]
+        create_entries(conn)
+        conn.execute(f'PRAGMA user_version = {version}')
+        conn.executemany('''
+            INSERT INTO entries (date, original_entry, summary, emotions, reflection, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', generate_entries(count, seed, end, years))
+        run_migrations(conn)
+        conn.execute('COMMIT')
+    finally:
+        conn.close()
+    return path
+
+
+def snapshot_path(count, seed=0, end=None, years=YEARS):
+    end = end or date.today()
+    return os.path.join(SNAPSHOT_DIR, f'corpus-{count}-seed{seed}-{end.isoformat()}-{years}y.db')
+
+
+def ensure_snapshot(count, seed=0, end=None, years=YEARS):
+    """Path of the snapshot for these parameters, generating it if needed"""
+    path = snapshot_path(count, seed, end, years)
+    if not os.path.exists(path):
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        partial = f'{path}.{os.getpid()}.tmp'
+        if os.path.exists(partial):
+            os.remove(partial)
+        try:
+            build_corpus(partial, count, seed, end, years)
+            os.replace(partial, path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+    return path
+
+
+def load_snapshot(dest, count, seed=0, end=None, years=YEARS):
+    """Copy a corpus snapshot to dest (a fresh path), generating it first if needed"""
+    shutil.copyfile(ensure_snapshot(count, seed, end, years), dest)
+    return dest
+
+
+if __name__ == "__main__":
+    import time
+
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description="Generate a deterministic journal corpus")
+    parser.add_argument('path', nargs='?', help="database to create (default: build or reuse a snapshot)")
+    parser.add_argument('--entries', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--end', type=date.fromisoformat, help="date of the newest entry (default today)")
+    parser.add_argument('--years', type=int, default=YEARS, help="longest history to generate")
+    parser.add_argument('--force', action='store_true', help="replace path if it exists")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.path is None:
+        path = snapshot_path(args.entries, args.seed, args.end, args.years)
+        existed = os.path.exists(path)
+        ensure_snapshot(args.entries, args.seed, args.end, args.years)
+        verb = "Reused" if existed else "Generated"
+        print(f"✅ {verb} snapshot {path} in {time.perf_counter() - start:.1f}s")
+    else:
+        if args.force:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(args.path + suffix):
+                    os.remove(args.path + suffix)
+        build_corpus(args.path, args.entries, args.seed, args.end, args.years)
+        print(f"✅ Generated {args.entries} entries in {args.path} in {time.perf_counter() - start:.1f}s")
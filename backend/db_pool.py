@@ -0,0 +1,179 @@
+import itertools
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import metrics
+
+# NORMAL only fsyncs the WAL at checkpoints, so a committed write survives a
+# process crash but not a power loss or OS crash; FULL fsyncs every commit,
+# which makes each commit durable on its own (JOURNAL_WRITE_MODE=group can
+# share those fsyncs when they are slow).
+SYNCHRONOUS = os.getenv('JOURNAL_DB_SYNCHRONOUS', 'NORMAL').upper()
+
+# Tuned pragmas applied to every connection we hand out.
+# WAL lets readers keep going while the writer commits.
+PRAGMAS = (
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA journal_mode = WAL",
+    f"PRAGMA synchronous = {SYNCHRONOUS}",
+    "PRAGMA cache_size = -16000",  # ~16 MB page cache per connection
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Size of sqlite3's per-connection prepared statement cache
+STATEMENT_CACHE_SIZE = 256
+
+# Pools are numbered so data versions from different pools (or from a pool
+# reopened after a close) never compare equal
+_pool_ids = itertools.count(1)
+
+
+class ConnectionPool:
+    """Per-thread reader connections plus a single shared writer connection"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._writer = None
+        self._writer_lock = threading.RLock()
+        self._version_conn = None
+        self._version_lock = threading.Lock()
+        self.id = next(_pool_ids)
+        self._closed = False
+
+    def _connect(self):
+        # Connections are confined to one thread (readers) or guarded by
+        # _writer_lock (writer); check_same_thread=False only lets close()
+        # run from whichever thread shuts the pool down.
+        conn = sqlite3.connect(
+            self.db_path,
+            isolation_level=None,  # we manage transactions explicitly
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            factory=metrics.TimedConnection if metrics.ENABLED else sqlite3.Connection,
+        )
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _reader_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+            conn = self._connect()
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    @contextmanager
+    def reader(self):
+        """Yield this thread's read connection"""
+        yield self._reader_connection()
+
+    def data_version(self):
+        """Token that changes whenever anyone commits to the database
+
+        PRAGMA data_version on a connection that never writes moves on every
+        commit made by another connection: this pool's writer, other server
+        workers, the import CLI or the serverless functions. It only reads the
+        WAL index in shared memory (~2us), so it is cheap enough to call on
+        the event loop.
+        """
+        with self._version_lock:
+            if self._version_conn is None:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed")
+                self._version_conn = self._connect()
+            return self.id, self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    @contextmanager
+    def snapshot(self):
+        """Yield a private read connection inside one read transaction
+
+        For long streaming reads such as exports: every chunk sees the same
+        snapshot, and the per-thread readers stay free for requests.
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def writer(self):
+        """Yield the writer connection inside an IMMEDIATE transaction"""
+        with self._writer_lock:
+            if self._writer is None:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed")
+                self._writer = self._connect()
+            conn = self._writer
+            if conn.in_transaction:
+                # Nested use from the same thread joins the outer transaction
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            else:
+                conn.execute("COMMIT")
+
+    def close(self):
+        """Close every connection opened by this pool"""
+        self._closed = True
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._version_lock:
+            if self._version_conn is not None:
+                self._version_conn.close()
+                self._version_conn = None
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers = []
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def default_db_path():
+    """JOURNAL_DB_PATH, or journal.db next to the backend directory"""
+    db_path = os.getenv('JOURNAL_DB_PATH')
+    if db_path is None:
+        db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'journal.db')
+    return os.path.abspath(db_path)
+
+
+def get_pool(db_path):
+    """Return the shared pool for a database file, creating it on first use"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(key)
+            _pools[key] = pool
+        return pool
+
+
+def close_all():
+    """Close every pool (used on shutdown and in tests)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,137 @@
+import json
+import os
+import re
+from functools import lru_cache
+
+LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'emotion_lexicon.json')
+
+# ASCII text is tokenized with a byte translation table: letters and digits
+# are kept (lowercased) and everything else becomes a space. Other text is
+# split on Unicode word boundaries, so punctuation such as "…", "—" or curly
+# quotes separates words instead of sticking to them. Both give the same
+# tokens: runs of letters and digits.
+_TOKEN_TABLE = bytes(
+    c if c < 128 and chr(c).isalnum() else 32
+    for c in range(256)
+).lower()
+_WORD = re.compile(r'[^\W_]+')
+
+
+def _tokens(text):
+    """Lowercased word tokens of a string"""
+    if text.isascii():
+        return text.encode('ascii').translate(_TOKEN_TABLE).decode('ascii').split()
+    return _WORD.findall(text.lower())
+
+
+class EmotionMatch:
+    """Emotions and topics found in a single scan of an entry"""
+
+    __slots__ = ('emotions', 'topics')
+
+    def __init__(self, emotions, topics):
+        self.emotions = emotions  # tuple, in lexicon order
+        self.topics = topics      # frozenset of topic names
+
+
+class EmotionMatcher:
+    """Whole-word emotion lexicon compiled into hashed token lookups
+
+    An entry is tokenized once (a single C-level translate/split pass, or a
+    regex scan for non-ASCII text) and the token set is intersected with the
+    lexicon. Multi-word terms such as "too much" are confirmed with a small word-boundary regex, which only
+    runs when all of their words occur in the entry.
+    """
+
+    def __init__(self, lexicon):
+        self.emotion_order = [item['emotion'] for item in lexicon['emotions']]
+        # emotion -> (valence in [-1, 1], arousal in [0, 1]); unrated emotions are neutral
+        self.affect = {
+            item['emotion']: (item.get('valence', 0.0), item.get('arousal', 0.5)) for item in lexicon['emotions']
+        }
+        self.fallbacks = {topic: list(emotions) for topic, emotions in lexicon.get('fallbacks', {}).items()}
+        self.default = list(lexicon.get('default', []))
+
+        # term -> (emotions, topics) it contributes
+        labels = {}
+        for item in lexicon['emotions']:
+            for term in item['terms']:
+                labels.setdefault(term.lower(), (set(), set()))[0].add(item['emotion'])
+        for topic, terms in lexicon.get('topics', {}).items():
+            for term in terms:
+                labels.setdefault(term.lower(), (set(), set()))[1].add(topic)
+        labels = {term: (frozenset(e), frozenset(t)) for term, (e, t) in labels.items()}
+
+        self._words = {}
+        self._phrases = {}
+        for term, label in labels.items():
+            tokens = _tokens(term)
+            if len(tokens) == 1 and tokens[0] == term:
+                self._words[tokens[0]] = label
+            else:
+                self._phrases[term] = (frozenset(tokens), label)
+        self._word_keys = self._words.keys()
+
+        # Longest phrases first so they win over their prefixes
+        phrases = sorted(self._phrases, key=len, reverse=True)
+        self._phrase_pattern = re.compile(
+            r'\b(?:%s)\b' % '|'.join(re.escape(p) for p in phrases),
+            re.IGNORECASE,
+        ) if phrases else None
+
+    @classmethod
+    def from_file(cls, path=LEXICON_PATH):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def match(self, text):
+        """Return every emotion and topic hit in one linear scan of the text"""
+        tokens = set(_tokens(text))
+        emotions = set()
+        topics = set()
+        for word in tokens & self._word_keys:
+            word_emotions, word_topics = self._words[word]
+            emotions |= word_emotions
+            topics |= word_topics
+
+        if self._phrase_pattern is not None and any(
+            parts <= tokens for parts, _ in self._phrases.values()
+        ):
+            for phrase in set(m.group(0).lower() for m in self._phrase_pattern.finditer(text)):
+                phrase_emotions, phrase_topics = self._phrases[phrase][1]
+                emotions |= phrase_emotions
+                topics |= phrase_topics
+
+        return EmotionMatch(
+            tuple(e for e in self.emotion_order if e in emotions),
+            frozenset(topics),
+        )
+
+    def emotions_for(self, match, limit=3):
+        """Pick the emotions to report, falling back on topics or the default"""
+        if match.emotions:
+            return list(match.emotions[:limit])
+        for topic, emotions in self.fallbacks.items():
+            if topic in match.topics:
+                return emotions[:limit]
+        return self.default[:limit]
+
+    def affect_of(self, match):
+        """(valence, arousal) averaged over every matched emotion, or (None, None) if none matched"""
+        if not match.emotions:
+            return None, None
+        scores = [self.affect[emotion] for emotion in match.emotions]
+        return (
+            round(sum(v for v, _ in scores) / len(scores), 4),
+            round(sum(a for _, a in scores) / len(scores), 4),
+        )
+
+    def detect(self, text, limit=3):
+        """Comma-separated emotions for an entry, as stored in the entries table"""
+        return ', '.join(self.emotions_for(self.match(text), limit))
+
+
+@lru_cache(maxsize=None)
+def get_matcher():
+    """Shared matcher, compiled once per process"""
+    return EmotionMatcher.from_file()
@@ -0,0 +1,53 @@
+"""Bounded thread pools that keep blocking work off the asyncio event loop
+
+Calls run inside a copy of the caller's context, so context variables such as
+the request id used for logging carry over into the worker thread.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# SQLite reads/writes. Each worker thread keeps its own pooled read connection,
+# so this also caps the number of open reader connections.
+DB_WORKERS = int(os.getenv('JOURNAL_DB_WORKERS', '8'))
+
+# CPU-bound entry analysis (and the write that follows it)
+ANALYSIS_WORKERS = int(os.getenv('JOURNAL_ANALYSIS_WORKERS', '4'))
+
+# Long-running uploads (parsing and analysis); their writes still go to the DB
+# pool one chunk at a time, so an import never holds a DB worker for long
+IMPORT_WORKERS = int(os.getenv('JOURNAL_IMPORT_WORKERS', '1'))
+
+db_executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix='journal-db')
+analysis_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix='journal-analysis')
+import_executor = ThreadPoolExecutor(max_workers=IMPORT_WORKERS, thread_name_prefix='journal-import')
+
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking database call on the DB pool"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(db_executor, functools.partial(context.run, func, *args, **kwargs))
+
+
+def call_db(func, *args, **kwargs):
+    """Run a blocking database call on the DB pool from a worker thread and wait for it"""
+    context = contextvars.copy_context()
+    return db_executor.submit(context.run, func, *args, **kwargs).result()
+
+
+async def run_import(func, *args, **kwargs):
+    """Run a long import on the import pool"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(import_executor, functools.partial(context.run, func, *args, **kwargs))
+
+
+async def run_analysis(func, *args, **kwargs):
+    """Run CPU-bound analysis on the analysis pool"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(analysis_executor, functools.partial(context.run, func, *args, **kwargs))
+
@@ -0,0 +1,123 @@
+"""
+Group commit: one background thread persists queued entries in batches
+
+With JOURNAL_WRITE_MODE=group, save requests are queued instead of each
+taking the write lock and committing on its own. The writer thread waits up
+to JOURNAL_GROUP_COMMIT_DELAY_MS for more requests (or until
+JOURNAL_GROUP_COMMIT_MAX_ROWS rows are queued) and commits them in one
+transaction, so a burst pays for one commit instead of one per entry. Every
+caller gets a Future that resolves to its ids once that transaction has
+committed. Pending writes are flushed when the writer is closed, including at
+interpreter exit.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+WRITE_MODE = os.getenv('JOURNAL_WRITE_MODE', 'sync')
+
+# Longest a queued write waits for company before it is committed
+GROUP_COMMIT_DELAY_MS = float(os.getenv('JOURNAL_GROUP_COMMIT_DELAY_MS', '2'))
+
+# Most rows committed in one transaction
+GROUP_COMMIT_MAX_ROWS = int(os.getenv('JOURNAL_GROUP_COMMIT_MAX_ROWS', '256'))
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """Drains a queue of save requests into grouped transactions
+
+    commit(entries, cache_keys) must store the entries in one transaction
+    and return their ids; it is only ever called from the writer thread.
+    """
+
+    def __init__(self, commit, delay_ms=GROUP_COMMIT_DELAY_MS, max_rows=GROUP_COMMIT_MAX_ROWS):
+        self._commit = commit
+        self.delay = delay_ms / 1000
+        self.max_rows = max_rows
+        self._queue = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self.groups = 0
+        self.rows = 0
+        self._thread = threading.Thread(target=self._run, name='journal-group-commit', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def depth(self):
+        """Save requests waiting for the writer"""
+        return self._queue.qsize()
+
+    def submit(self, entries, cache_keys=None):
+        """Queue entries for the next group; the Future resolves to their ids"""
+        future = Future()
+        with self._close_lock:
+            # Checked under the lock so nothing is queued behind the stop marker
+            if self._closed:
+                future.set_exception(RuntimeError("Group commit writer is closed"))
+            else:
+                self._queue.put((list(entries), cache_keys, future))
+        return future
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            group = [item]
+            rows = len(item[0])
+            deadline = time.monotonic() + self.delay
+            stop = False
+            while rows < self.max_rows:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                group.append(item)
+                rows += len(item[0])
+            self._commit_group(group)
+            if stop:
+                return
+
+    def _commit_group(self, group):
+        entries = []
+        cache_keys = []
+        for group_entries, group_keys, _ in group:
+            entries.extend(group_entries)
+            cache_keys.extend(group_keys if group_keys else [None] * len(group_entries))
+        try:
+            ids = self._commit(entries, cache_keys)
+        except Exception as e:
+            if len(group) == 1:
+                group[0][2].set_exception(e)
+            else:
+                # One bad request must not fail the others: retry them one by one
+                for request in group:
+                    self._commit_group([request])
+            return
+
+        self.groups += 1
+        self.rows += len(entries)
+        offset = 0
+        for group_entries, _, future in group:
+            future.set_result(ids[offset:offset + len(group_entries)])
+            offset += len(group_entries)
+
+    def close(self):
+        """Commit everything already queued, then stop the writer thread"""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        atexit.unregister(self.close)
+
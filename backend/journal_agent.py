@@ -1,44 +1,313 @@
+import asyncio
+import logging
 import os
+import random
+import sys
+import time
 from datetime import datetime
 from dotenv import load_dotenv
-import sqlite3
 import json
-import re
 
+# Shared backend modules live next to this file
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Before the local imports, which read their settings from the environment
 load_dotenv()
 
+from analysis_cache import AnalysisCache
+from db_pool import default_db_path, get_pool
+from emotion_lexicon import get_matcher
+from executors import run_analysis, run_db
+from group_commit import WRITE_MODE, GroupCommitWriter
+from journal_store import insert_entries, fetch_entries_page
+from llm_providers import LLM_TIMEOUT, get_provider
+import metrics
+from migrations import migrate
+from mood_scores import score_entries
+from reflections import get_reflection_bank
+
+log = logging.getLogger('journal.agent')
+
+# Emotions a provider may answer with
+EMOTION_CHOICES = (
+    'happy', 'sad', 'stressed', 'excited', 'tired', 'anxious',
+    'grateful', 'frustrated', 'proud', 'overwhelmed', 'calm', 'motivated',
+)
+
+# Order analysis stages are reported in when several are ready at once
+STAGE_ORDER = ('emotions', 'summary', 'reflection')
+
 class JournalAgent:
-    def __init__(self):
-        # For hackathon demo - using mock AI responses
-        # Replace with actual Maestro client when ready
-        self.use_mock = True
-        self.init_database()
+    def __init__(self, db_path=None, seed=None, provider=None, write_mode=None):
+        # Mock AI responses unless JOURNAL_LLM_PROVIDER names a real provider
+        self.provider = provider if provider is not None else get_provider()
+        self.use_mock = self.provider is None
+        # Analyses reused for resubmitted text; keyed on the analyzer in use
+        self.analysis_cache = AnalysisCache(self.provider.version if self.provider else 'mock')
+        # Pass a seed to make mock reflections reproducible (e.g. in tests)
+        self.rng = random.Random(seed)
+        self.init_database(db_path)
+        # 'group' hands writes to a background thread that commits them in batches
+        self.write_mode = write_mode or WRITE_MODE
+        if self.write_mode not in ('sync', 'group'):
+            raise ValueError(f"Unknown write mode '{self.write_mode}' (choose from sync, group)")
+        self.group_writer = GroupCommitWriter(self._commit_entries) if self.write_mode == 'group' else None
     
-    def init_database(self):
+    def init_database(self, db_path=None):
         """Initialize SQLite database for journal entries"""
         # Use absolute path to ensure database is created in the right location
-        db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'journal.db')
-        self.db_path = os.path.abspath(db_path)
+        self.db_path = os.path.abspath(db_path) if db_path is not None else default_db_path()
+        self.pool = get_pool(self.db_path)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS entries (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                original_entry TEXT NOT NULL,
-                summary TEXT,
-                emotions TEXT,
-                reflection TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        conn.commit()
-        conn.close()
-        print(f"✅ Database initialized at: {self.db_path}")
+        migrate(self.pool)
+        log.info("Database initialized", extra={'db_path': self.db_path})
     
-    def process_journal_entry(self, entry_text: str):
+    def process_journal_entry(self, entry_text: str, style=None):
         """Process a journal entry through AI analysis"""
+        try:
+            entry_data, cache_key = self._analyze_cached(entry_text, style)
+            entry_data['id'] = self.save_entries([entry_data], [cache_key])[0]
+            
+            return {
+                'success': True,
+                'data': entry_data
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def process_journal_entries(self, entry_texts, style=None):
+        """Process a batch of journal entries and store them in one transaction
+        
+        Returns one result per input, in order. An entry that fails analysis
+        only fails itself; the rest of the batch is still saved.
+        """
+        results = [None] * len(entry_texts)
+        analyzed = []
+        for index, entry_text in enumerate(entry_texts):
+            try:
+                if not entry_text or not entry_text.strip():
+                    raise ValueError("Entry text is empty")
+                analyzed.append((index, *self._analyze_cached(entry_text, style)))
+            except Exception as e:
+                results[index] = {'success': False, 'error': str(e)}
+        return self._save_batch(results, analyzed)
+    
+    async def process_journal_entry_async(self, entry_text: str, style=None):
+        """Event-loop entry point used by the API
+        
+        Mock analysis is CPU work and runs on the analysis pool; provider
+        calls are I/O and fan out on the event loop.
+        """
+        try:
+            if self.provider is None:
+                entry_data, cache_key = await run_analysis(self._analyze_cached, entry_text, style)
+            else:
+                entry_data, cache_key = await self._analyze_cached_async(entry_text, style)
+            entry_data['id'] = (await self.save_entries_async([entry_data], [cache_key]))[0]
+            return {
+                'success': True,
+                'data': entry_data
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    async def process_journal_entries_async(self, entry_texts, style=None):
+        """Event-loop variant of process_journal_entries"""
+        if self.provider is None:
+            return await run_analysis(self.process_journal_entries, entry_texts, style)
+        results = [None] * len(entry_texts)
+        pending = []
+        for index, entry_text in enumerate(entry_texts):
+            if not entry_text or not entry_text.strip():
+                results[index] = {'success': False, 'error': "Entry text is empty"}
+            else:
+                pending.append(index)
+        analyses = await asyncio.gather(
+            *(self._analyze_cached_async(entry_texts[index], style) for index in pending),
+            return_exceptions=True
+        )
+        analyzed = []
+        for index, analysis in zip(pending, analyses):
+            if isinstance(analysis, Exception):
+                results[index] = {'success': False, 'error': str(analysis)}
+            else:
+                analyzed.append((index, *analysis))
+        return await run_db(self._save_batch, results, analyzed)
+    
+    def _save_batch(self, results, analyzed):
+        """Store analyzed (index, entry, cache key) triples in one transaction and fill in results"""
+        try:
+            ids = self.save_entries(
+                [entry_data for _, entry_data, _ in analyzed],
+                [cache_key for _, _, cache_key in analyzed]
+            )
+        except Exception as e:
+            # The whole write is one transaction, so nothing was stored
+            for index, _, _ in analyzed:
+                results[index] = {'success': False, 'error': str(e)}
+            return results
+        
+        for (index, entry_data, _), entry_id in zip(analyzed, ids):
+            entry_data['id'] = entry_id
+            results[index] = {'success': True, 'data': entry_data}
+        return results
+    
+    def _analyze_cached(self, entry_text, style=None):
+        """Analysis for an entry plus its (key, hit) cache marker, reusing a cached analysis
+        
+        With a provider configured the cache holds provider analyses, so a
+        mock analysis made here gets a None marker and is not cached.
+        """
+        key = self._cache_key(entry_text, style)
+        cached = self._lookup_analysis(key, entry_text)
+        if cached is not None:
+            return self._entry_data(entry_text, *cached), (key, True)
+        return self._analyze_entry(entry_text, style), ((key, False) if self.provider is None else None)
+    
+    def analyze_for_import(self, entry_text, style=None):
+        """Analyze an imported entry, reusing cached analyses
+        
+        Returns the entry data and the cache marker to pass to save_entries
+        with it. Runs the mock analysis even when a provider is configured,
+        since imports are synchronous; such analyses are not cached.
+        """
+        return self._analyze_cached(entry_text, style)
+    
+    async def _analyze_cached_async(self, entry_text, style=None):
+        """Provider variant of _analyze_cached; mock fallbacks are not cached"""
+        key = self._cache_key(entry_text, style)
+        cached = await run_db(self._lookup_analysis, key, entry_text)
+        if cached is not None:
+            return await run_analysis(self._entry_data, entry_text, *cached), (key, True)
+        entry_data, complete = await self._analyze_entry_async(entry_text, style)
+        return entry_data, ((key, False) if complete else None)
+    
+    def _cache_key(self, entry_text, style):
+        return self.analysis_cache.key(entry_text, style or get_reflection_bank().default_style)
+    
+    def _lookup_analysis(self, key, entry_text):
+        with metrics.stage('cache_lookup'), self.pool.reader() as conn:
+            return self.analysis_cache.lookup(conn, key, entry_text)
+    
+    def _analyze_entry(self, entry_text, style=None):
+        """Run summary, emotion and reflection analysis for one entry (mock AI)"""
+        with metrics.stage('analyze'):
+            # One lexicon scan feeds both emotions and the reflection category
+            match = get_matcher().match(entry_text)
+            return self._entry_data(
+                entry_text,
+                self._mock_summarize(entry_text),
+                self._mock_detect_emotions(match),
+                self._mock_generate_reflection(match, style),
+                match
+            )
+    
+    async def _analyze_entry_async(self, entry_text, style=None):
+        """Ask the provider for summary, emotions and reflection concurrently
+        
+        Returns the entry data and whether every field came from the provider.
+        """
+        results = {}
+        complete = True
+        async for field, value, from_provider in self._provider_stages(entry_text, style):
+            results[field] = value
+            complete = complete and from_provider
+        entry_data = await run_analysis(
+            self._entry_data, entry_text, results['summary'], results['emotions'], results['reflection']
+        )
+        return entry_data, complete
+    
+    async def _provider_stages(self, entry_text, style=None):
+        """Yield (field, value, from_provider) as each provider call finishes
+        
+        The three calls run concurrently, each under its own timeout; a call
+        that times out or fails yields the mock analysis for that field.
+        """
+        bank = get_reflection_bank()
+        style = style or bank.default_style
+        if style not in bank.style_names:
+            raise ValueError(f"Unknown reflection style '{style}' (choose from {', '.join(bank.style_names)})")
+        
+        tasks = {
+            asyncio.ensure_future(asyncio.wait_for(self.provider.complete(prompt), LLM_TIMEOUT)): field
+            for field, prompt in zip(('summary', 'emotions', 'reflection'), self._build_prompts(entry_text, style))
+        }
+        pending = set(tasks)
+        fallback = None
+        started = time.perf_counter()
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                elapsed = time.perf_counter() - started
+                for task in sorted(done, key=lambda task: STAGE_ORDER.index(tasks[task])):
+                    field = tasks[task]
+                    metrics.observe_stage(f'provider_{field}', elapsed)
+                    try:
+                        value = task.result()
+                        if field == 'emotions':
+                            value = self._parse_emotions(value)
+                        yield field, value, True
+                    except Exception as e:
+                        log.warning("LLM call failed; using mock analysis", extra={'field': field, 'error': repr(e)})
+                        if fallback is None:
+                            fallback = await run_analysis(self._analyze_entry, entry_text, style)
+                        yield field, fallback[field], False
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def stream_journal_entry(self, entry_text: str, style=None):
+        """Yield (event, data) pairs as each analysis stage is ready, then the saved entry
+        
+        The mock emits emotions first (they are the cheapest), then summary
+        and reflection; provider stages arrive in the order their calls finish.
+        The last event is 'saved' with the stored entry, or 'error'. Mock
+        stages run on the analysis pool, like process_journal_entry_async.
+        """
+        try:
+            key = self._cache_key(entry_text, style)
+            cached = await run_db(self._lookup_analysis, key, entry_text)
+            results = {}
+            match = None
+            if cached is not None:
+                results = dict(zip(('summary', 'emotions', 'reflection'), cached))
+                for field in STAGE_ORDER:
+                    yield field, {field: results[field]}
+                cache_key = (key, True)
+            elif self.provider is None:
+                match = await run_analysis(get_matcher().match, entry_text)
+                results['emotions'] = await run_analysis(self._mock_detect_emotions, match)
+                yield 'emotions', {'emotions': results['emotions']}
+                results['summary'] = await run_analysis(self._mock_summarize, entry_text)
+                yield 'summary', {'summary': results['summary']}
+                results['reflection'] = await run_analysis(self._mock_generate_reflection, match, style)
+                yield 'reflection', {'reflection': results['reflection']}
+                cache_key = (key, False)
+            else:
+                complete = True
+                async for field, value, from_provider in self._provider_stages(entry_text, style):
+                    results[field] = value
+                    complete = complete and from_provider
+                    yield field, {field: value}
+                cache_key = (key, False) if complete else None
+            
+            entry_data = await run_analysis(
+                self._entry_data, entry_text, results['summary'], results['emotions'], results['reflection'], match
+            )
+            entry_data['id'] = (await self.save_entries_async([entry_data], [cache_key]))[0]
+            yield 'saved', entry_data
+        except Exception as e:
+            yield 'error', {'error': str(e)}
+    
+    def _build_prompts(self, entry_text, style):
+        """Summary, emotion and reflection prompts for the provider"""
         
         # Summarization prompt
         summary_prompt = f"""
@@ -51,7 +320,7 @@ class JournalAgent:
         # Emotion detection prompt
         emotion_prompt = f"""
         Analyze the emotions in this journal entry. List 2-3 main emotions from this list:
-        [happy, sad, stressed, excited, tired, anxious, grateful, frustrated, proud, overwhelmed, calm, motivated]
+        [{', '.join(EMOTION_CHOICES)}]
         
         Journal entry: "{entry_text}"
         
@@ -60,62 +329,93 @@ class JournalAgent:
         # Positive reflection prompt
         reflection_prompt = f"""
         Based on this journal entry, provide a short, encouraging reflection or advice (2-3 sentences).
-        Be supportive and focus on growth, resilience, or positivity.
+        Be supportive and focus on growth, resilience, or positivity. Write in a {style} style.
         
         Journal entry: "{entry_text}"
         
         Positive reflection:"""
         
-        try:
-            if self.use_mock:
-                # Mock AI responses for hackathon demo
-                summary = self._mock_summarize(entry_text)
-                emotions = self._mock_detect_emotions(entry_text)
-                reflection = self._mock_generate_reflection(entry_text)
-            else:
-                # TODO: Replace with actual Maestro client calls
-                # summary_response = self.client.chat(summary_prompt)
-                # summary = summary_response.get('content', '').strip()
-                pass
-            
-            # Store in database
-            entry_data = {
-                'date': datetime.now().strftime('%Y-%m-%d'),
-                'original_entry': entry_text,
-                'summary': summary,
-                'emotions': emotions,
-                'reflection': reflection
-            }
-            
-            self.save_entry(entry_data)
-            
-            return {
-                'success': True,
-                'data': entry_data
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        return summary_prompt, emotion_prompt, reflection_prompt
+    
+    def _parse_emotions(self, text):
+        """Keep up to 3 known emotions from a model's comma-separated answer"""
+        words = (word.strip(' .\n').lower() for word in text.split(','))
+        emotions = [word for word in words if word in EMOTION_CHOICES]
+        if not emotions:
+            raise ValueError(f"No known emotions in model output: {text[:80]!r}")
+        return ', '.join(emotions[:3])
+    
+    def _entry_data(self, entry_text, summary, emotions, reflection, match=None):
+        """Entry dict for saving, with its mood scored from the lexicon match
+        
+        Scoring happens here, with the analysis, so the writer transaction
+        only has to INSERT. Pass the match when the analysis already made one.
+        """
+        matcher = get_matcher()
+        mood_score, arousal = matcher.affect_of(match if match is not None else matcher.match(entry_text))
+        return {
+            'date': datetime.now().strftime('%Y-%m-%d'),
+            'original_entry': entry_text,
+            'summary': summary,
+            'emotions': emotions,
+            'reflection': reflection,
+            'mood_score': mood_score,
+            'arousal': arousal
+        }
+    
+    def close(self):
+        """Flush queued group-commit writes"""
+        if self.group_writer is not None:
+            self.group_writer.close()
+    
+    async def aclose(self):
+        """Flush queued writes and release the provider's pooled connections"""
+        await run_db(self.close)
+        if self.provider is not None:
+            await self.provider.aclose()
     
     def save_entry(self, entry_data):
-        """Save processed entry to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO entries (date, original_entry, summary, emotions, reflection)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            entry_data['date'],
-            entry_data['original_entry'],
-            entry_data['summary'],
-            entry_data['emotions'],
-            entry_data['reflection']
-        ))
-        conn.commit()
-        conn.close()
+        """Save processed entry to database and return its id"""
+        return self.save_entries([entry_data])[0]
+    
+    def save_entries(self, entries, cache_keys=None):
+        """Save processed entries in a single transaction and return their ids
+        
+        cache_keys, aligned with entries, holds the (key, hit) marker from
+        _analyze_cached (or None) so the analysis cache is updated in the same
+        transaction. Entries without a mood_score are scored first, outside the
+        write lock. In group write mode this blocks until the group holding
+        these entries has committed.
+        """
+        score_entries(entries)
+        if self.group_writer is not None:
+            return self.group_writer.submit(entries, cache_keys).result()
+        return self._commit_entries(entries, cache_keys)
+    
+    async def save_entries_async(self, entries, cache_keys=None):
+        """save_entries for the event loop; group mode awaits the commit without holding a thread
+        
+        Entries come from the analysis, which has already scored their mood.
+        """
+        if self.group_writer is not None:
+            return await asyncio.wrap_future(self.group_writer.submit(entries, cache_keys))
+        return await run_db(self._commit_entries, entries, cache_keys)
+    
+    def _commit_entries(self, entries, cache_keys=None):
+        # Includes the COMMIT, so fsync cost shows up here
+        with metrics.stage('save'), self.pool.writer() as conn:
+            ids = insert_entries(conn, entries)
+            if cache_keys:
+                self.analysis_cache.store(conn, [
+                    (cache_key[0], cache_key[1], entry)
+                    for cache_key, entry in zip(cache_keys, entries) if cache_key is not None
+                ])
+        return ids
+    
+    @property
+    def data_version(self):
+        """Changes after any commit to this journal's database, from this process or another; read caches key on it"""
+        return self.pool.data_version()
     
     def _mock_summarize(self, text):
         """Mock summarization for demo purposes"""
@@ -128,184 +428,22 @@ class JournalAgent:
             return text
         return f"{sentences[0]}. {sentences[-1]}."
     
-    def _mock_detect_emotions(self, text):
+    def _mock_detect_emotions(self, match):
         """Mock emotion detection based on keywords"""
-        text_lower = text.lower()
-        emotions = []
-        
-        # Positive emotions
-        if any(word in text_lower for word in ['happy', 'joy', 'excited', 'great', 'amazing', 'wonderful']):
-            emotions.append('happy')
-        if any(word in text_lower for word in ['proud', 'accomplished', 'achieved', 'success']):
-            emotions.append('proud')
-        if any(word in text_lower for word in ['grateful', 'thankful', 'blessed', 'appreciate']):
-            emotions.append('grateful')
-        if any(word in text_lower for word in ['calm', 'peaceful', 'relaxed', 'serene']):
-            emotions.append('calm')
-        if any(word in text_lower for word in ['motivated', 'inspired', 'determined', 'focused']):
-            emotions.append('motivated')
-        if any(word in text_lower for word in ['excited', 'thrilled', 'enthusiastic']):
-            emotions.append('excited')
-            
-        # Negative emotions
-        if any(word in text_lower for word in ['sad', 'depressed', 'down', 'upset', 'disappointed']):
-            emotions.append('sad')
-        if any(word in text_lower for word in ['stressed', 'stress', 'pressure', 'overwhelmed', 'busy']):
-            emotions.append('stressed')
-        if any(word in text_lower for word in ['anxious', 'worried', 'nervous', 'anxiety']):
-            emotions.append('anxious')
-        if any(word in text_lower for word in ['tired', 'exhausted', 'fatigue', 'sleepy']):
-            emotions.append('tired')
-        if any(word in text_lower for word in ['frustrated', 'annoyed', 'irritated', 'angry']):
-            emotions.append('frustrated')
-        if any(word in text_lower for word in ['overwhelmed', 'too much', 'can\'t handle']):
-            emotions.append('overwhelmed')
-            
-        # Default emotions if none detected
-        if not emotions:
-            if any(word in text_lower for word in ['work', 'study', 'exam', 'project']):
-                emotions = ['focused', 'determined']
-            else:
-                emotions = ['reflective', 'thoughtful']
-                
-        return ', '.join(emotions[:3])  # Limit to 3 emotions
+        return ', '.join(get_matcher().emotions_for(match, limit=3))  # Limit to 3 emotions
     
-    def _mock_generate_reflection(self, text, style='motivational'):
+    def _mock_generate_reflection(self, match, style=None):
         """Mock positive reflection generation with different styles"""
-        text_lower = text.lower()
-        
-        # Determine reflection style (could be passed from frontend settings)
-        reflection_styles = {
-            'motivational': {
-                'stressed': [
-                    "🚀 Stress is your mind's way of saying you care deeply! Channel that energy into small, powerful actions.",
-                    "💪 Every challenge you face is building your resilience muscle. You're stronger than you know!",
-                    "⚡ Transform that stress into fuel for growth. You've overcome challenges before - you'll do it again!"
-                ],
-                'work': [
-                    "🎯 Your dedication to excellence is inspiring! Every effort you make is an investment in your future self.",
-                    "🌟 Success is built one focused day at a time. You're laying the foundation for something amazing!",
-                    "🔥 Your work ethic is your superpower. Keep pushing boundaries and creating your own opportunities!"
-                ],
-                'tired': [
-                    "🌙 Rest is not giving up - it's recharging for your next breakthrough. Honor your body's wisdom.",
-                    "⚡ Even champions need recovery time. Tomorrow you'll return stronger and more focused!",
-                    "🔋 Your energy is precious - invest it wisely. Rest today, conquer tomorrow!"
-                ],
-                'happy': [
-                    "🎉 Your joy is magnetic! This positive energy will attract even more amazing experiences.",
-                    "✨ Happiness is your natural state - you're remembering who you truly are. Keep shining!",
-                    "🌈 These beautiful moments are proof that life is working in your favor. Celebrate every win!"
-                ]
-            },
-            'gentle': {
-                'stressed': [
-                    "🌸 It's okay to feel overwhelmed sometimes. Take a gentle breath and remember - this too shall pass.",
-                    "🤗 You're carrying a lot right now, and that takes courage. Be gentle with yourself today.",
-                    "🌿 Like a tree bending in the wind, your flexibility in tough times shows your inner strength."
-                ],
-                'work': [
-                    "🌱 Your efforts are like seeds planted in rich soil - growth takes time, but it's happening.",
-                    "🕊️ There's beauty in your dedication. Remember to pause and appreciate how far you've come.",
-                    "🌺 Your hard work is a form of self-care - you're nurturing your future with love."
-                ],
-                'tired': [
-                    "🌙 Your body is whispering wisdom - listen with compassion. Rest is a gift you give yourself.",
-                    "🤲 Tiredness is not weakness; it's your body asking for the care it deserves.",
-                    "🌸 Like flowers that close at night, sometimes we need to turn inward and restore."
-                ],
-                'happy': [
-                    "🌻 Your happiness is like sunshine - it warms not just you, but everyone around you.",
-                    "🦋 These moments of joy are precious gifts. Hold them gently in your heart.",
-                    "🌈 Your smile today is a reminder that beauty exists in simple moments."
-                ]
-            },
-            'analytical': {
-                'stressed': [
-                    "🧠 Stress often indicates high engagement with meaningful goals. Consider breaking large tasks into smaller, manageable components.",
-                    "📊 Your stress response shows you're pushing your comfort zone - a key indicator of personal growth.",
-                    "🔍 This tension suggests you're at a learning edge. What specific skills is this situation developing?"
-                ],
-                'work': [
-                    "📈 Your consistent effort is creating compound returns on your investment in yourself.",
-                    "🎯 Each focused work session is building neural pathways that enhance your future performance.",
-                    "⚙️ Your work patterns reveal a commitment to mastery - a trait shared by high achievers."
-                ],
-                'tired': [
-                    "🔋 Fatigue is data - your system is signaling the need for recovery to optimize performance.",
-                    "⚖️ Balancing effort with rest is a skill that separates sustainable achievers from burnout cases.",
-                    "🧪 Your body's feedback loop is functioning perfectly - listen to this valuable information."
-                ],
-                'happy': [
-                    "📊 Positive emotions broaden your cognitive capacity and enhance creative problem-solving abilities.",
-                    "🔬 This happiness is evidence of alignment between your actions and values - a key predictor of life satisfaction.",
-                    "📈 Joy creates an upward spiral effect, improving your resilience and decision-making quality."
-                ]
-            },
-            'wise': {
-                'stressed': [
-                    "🦉 In the depths of winter, I finally learned that within me there lay an invincible summer. Your strength runs deeper than your stress.",
-                    "🌊 Like a river that finds its way around rocks, you too will navigate through this challenge with grace.",
-                    "🏔️ Mountains are not moved by worry, but by persistent, patient effort. Trust your journey."
-                ],
-                'work': [
-                    "🌱 The bamboo that bends is stronger than the oak that resists. Your adaptability in work is wisdom in action.",
-                    "⭐ Every master was once a beginner. Every pro was once an amateur. Honor where you are in your journey.",
-                    "🎨 Work becomes art when you bring your whole self to it. You're crafting something meaningful."
-                ],
-                'tired': [
-                    "🌙 Even the moon takes time to wax and wane. Your rhythms are part of a larger, beautiful cycle.",
-                    "🍃 The tree that would grow tall must sink its roots deep. Rest is how you deepen your foundation.",
-                    "🌊 The ocean is powerful not because it never rests, but because it knows when to be still."
-                ],
-                'happy': [
-                    "☀️ Happiness is not a destination, but a way of traveling. You're walking the path with wisdom.",
-                    "🌸 Joy shared is joy doubled. Your happiness ripples out into the world in ways you may never know.",
-                    "💎 These moments of contentment are diamonds in the rough of daily life. Treasure them."
-                ]
-            }
-        }
-        
-        # Determine category
-        if any(word in text_lower for word in ['stressed', 'anxiety', 'worried', 'overwhelmed']):
-            category = 'stressed'
-        elif any(word in text_lower for word in ['study', 'exam', 'work', 'project']):
-            category = 'work'
-        elif any(word in text_lower for word in ['tired', 'exhausted', 'sleepy']):
-            category = 'tired'
-        elif any(word in text_lower for word in ['happy', 'great', 'amazing', 'good', 'excited', 'grateful']):
-            category = 'happy'
-        else:
-            category = 'happy'  # Default to positive
-            
-        import random
-        return random.choice(reflection_styles.get(style, reflection_styles['motivational']).get(category, reflection_styles['motivational']['happy']))
+        return get_reflection_bank().choose(match, style, self.rng)
 
     def get_recent_entries(self, limit=10):
         """Get recent journal entries"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT * FROM entries 
-            ORDER BY created_at DESC 
-            LIMIT ?
-        ''', (limit,))
-        
-        entries = cursor.fetchall()
-        conn.close()
-        
-        return [
-            {
-                'id': entry[0],
-                'date': entry[1],
-                'original_entry': entry[2],
-                'summary': entry[3],
-                'emotions': entry[4],
-                'reflection': entry[5],
-                'created_at': entry[6]
-            }
-            for entry in entries
-        ]
+        return self.get_entries_page(limit)['entries']
+    
+    def get_entries_page(self, limit=10, before=None, after=None, fields=None):
+        """Get a page of entries with cursors for the pages around it"""
+        with self.pool.reader() as conn:
+            return fetch_entries_page(conn, limit, before=before, after=after, fields=fields)
 
 # Test the agent
 if __name__ == "__main__":
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Streaming export and import of journal entries (NDJSON or CSV)
+
+Exports read a consistent snapshot in fetchmany() chunks and yield text as
+they go; imports parse their input incrementally and insert it in chunked
+transactions. Neither ever holds more than one chunk of entries, so memory
+stays flat however large the journal or the file is.
+
+    python backend/journal_io.py export journal.ndjson [--format csv] [--db path]
+    python backend/journal_io.py import journal.ndjson [--format csv] [--reanalyze] [--db path]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import queue
+import sys
+from datetime import date, datetime, timezone
+
+from journal_store import ENTRY_FIELDS
+from mood_scores import score_entries
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Rows per fetchmany() call while exporting
+EXPORT_CHUNK_SIZE = int(os.getenv('JOURNAL_EXPORT_CHUNK_SIZE', '500'))
+
+# Entries per transaction while importing
+IMPORT_CHUNK_SIZE = int(os.getenv('JOURNAL_IMPORT_CHUNK_SIZE', '500'))
+
+# Per-line errors included in an import report
+MAX_REPORTED_ERRORS = 20
+
+
+def _check_format(fmt):
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}' (choose from {', '.join(FORMATS)})")
+
+
+def iter_export(pool, fmt='ndjson', date_from=None, date_to=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the journal as NDJSON lines or CSV text, oldest entry first"""
+    _check_format(fmt)
+    columns = ', '.join(ENTRY_FIELDS)
+    if date_from or date_to:
+        # Walks idx_entries_date, which already orders by (date, id)
+        sql = f'''
+            SELECT {columns} FROM entries
+            WHERE date >= COALESCE(?, '') AND date <= COALESCE(?, '9999-12-31')
+            ORDER BY date, id
+        '''
+        params = (date_from, date_to)
+    else:
+        sql = f'SELECT {columns} FROM entries ORDER BY id'
+        params = ()
+
+    with pool.snapshot() as conn:
+        cursor = conn.execute(sql, params)
+        if fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(ENTRY_FIELDS)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            if fmt == 'ndjson':
+                yield ''.join(
+                    json.dumps(dict(zip(ENTRY_FIELDS, row)), ensure_ascii=False) + '\n' for row in rows
+                )
+            else:
+                writer.writerows(rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if fmt == 'csv' and buffer.tell():
+            # Header of an empty export
+            yield buffer.getvalue()
+
+
+def iter_records(stream, fmt='ndjson'):
+    """Yield (line number, record dict or parse error) from a text stream"""
+    _check_format(fmt)
+    if fmt == 'ndjson':
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("Expected a JSON object")
+                yield line_no, record
+            except ValueError as e:
+                yield line_no, e
+    else:
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+
+
+def _parse_created_at(value):
+    """created_at as stored by SQLite's CURRENT_TIMESTAMP: UTC 'YYYY-MM-DD HH:MM:SS'
+
+    Accepts ISO 8601 (naive times are taken as UTC) and Unix epoch seconds;
+    raises ValueError on anything else, since a malformed value would sort
+    wrongly for keyset paging and the trends' hour of day.
+    """
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f"Invalid created_at {value!r}")
+    try:
+        if isinstance(value, str):
+            try:
+                parsed = datetime.fromisoformat(value.strip())
+            except ValueError:
+                parsed = datetime.fromtimestamp(float(value), timezone.utc)
+        else:
+            parsed = datetime.fromtimestamp(value, timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        raise ValueError(f"Invalid created_at {value!r}") from None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _entry_from_record(agent, record, reanalyze, style):
+    """Entry dict (plus analysis cache marker) for one imported record"""
+    text = record.get('original_entry') or record.get('entry_text')
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("Missing original_entry")
+    created_at = record.get('created_at')
+    created_at = _parse_created_at(created_at) if created_at not in (None, '') else None
+    entry_date = record.get('date') or (created_at[:10] if created_at else date.today().isoformat())
+    # Stored as YYYY-MM-DD whatever ISO form it came in ('20240101', '2024-W01-1');
+    # raises ValueError on a malformed date
+    entry_date = date.fromisoformat(str(entry_date)).isoformat()
+
+    cache_key = None
+    if reanalyze or not all(record.get(field) for field in ('summary', 'emotions', 'reflection')):
+        entry, cache_key = agent.analyze_for_import(text, style)
+    else:
+        entry = {field: record[field] for field in ('summary', 'emotions', 'reflection')}
+    entry.update(date=entry_date, original_entry=text, created_at=created_at)
+    # Scored here on the import thread, so the chunk's save only runs INSERTs
+    score_entries([entry])
+    return entry, cache_key
+
+
+def import_entries(agent, stream, fmt='ndjson', reanalyze=False, style=None, chunk_size=IMPORT_CHUNK_SIZE,
+                   save=None):
+    """Import entries from a text stream in chunked transactions
+
+    Records keep their summary, emotions and reflection unless reanalyze is
+    set or one of them is missing. Ids are always newly assigned. A record
+    that cannot be parsed fails on its own; the rest are still imported.
+    Each chunk is written with save(entries, cache_keys), by default
+    agent.save_entries.
+    """
+    save = save or agent.save_entries
+    imported = failed = 0
+    errors = []
+    chunk = []
+    cache_keys = []
+    for line_no, record in iter_records(stream, fmt):
+        try:
+            if isinstance(record, Exception):
+                raise record
+            entry, cache_key = _entry_from_record(agent, record, reanalyze, style)
+        except Exception as e:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'line': line_no, 'error': str(e)})
+            continue
+        chunk.append(entry)
+        cache_keys.append(cache_key)
+        if len(chunk) >= chunk_size:
+            imported += len(save(chunk, cache_keys))
+            chunk, cache_keys = [], []
+    if chunk:
+        imported += len(save(chunk, cache_keys))
+    return {'imported': imported, 'failed': failed, 'errors': errors}
+
+
+class BodyPipe(io.RawIOBase):
+    """Bounded, blocking byte stream fed from another thread (an HTTP upload)
+
+    The event loop push()es request body chunks while an importer thread
+    reads them through a TextIOWrapper, so at most `maxsize` chunks are ever
+    buffered. If the reader stops early, push() returns False; if the upload
+    breaks off, interrupt() makes the reader fail instead of waiting forever.
+    """
+
+    def __init__(self, maxsize=16):
+        super().__init__()
+        self._queue = queue.Queue(maxsize)
+        self._pending = memoryview(b'')
+        self._eof = False
+        self._abandoned = False
+        self._interrupted = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            if self._eof:
+                return 0
+            try:
+                chunk = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                if self._interrupted:
+                    raise IOError("Upload was interrupted")
+                continue
+            if chunk is None:
+                self._eof = True
+                return 0
+            self._pending = memoryview(chunk)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def push(self, chunk):
+        """Queue a chunk (None marks the end); blocks while the pipe is full"""
+        while not self._abandoned:
+            try:
+                self._queue.put(chunk, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def abandon(self):
+        """Called by the reader when it stops, so pending push() calls return"""
+        self._abandoned = True
+
+    def interrupt(self):
+        """Called by the writer when the upload fails part way"""
+        self._interrupted = True
+
+    def text(self):
+        return io.TextIOWrapper(io.BufferedReader(self), encoding='utf-8', newline='')
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from journal_agent import JournalAgent
+
+    parser = argparse.ArgumentParser(description="Export or import journal entries")
+    parser.add_argument('command', choices=('export', 'import'))
+    parser.add_argument('path', help="file to write (export) or read (import); - for stdout/stdin")
+    parser.add_argument('--format', choices=sorted(FORMATS), help="defaults to the file extension, else ndjson")
+    parser.add_argument('--db', help="journal database (defaults to JOURNAL_DB_PATH or ../journal.db)")
+    parser.add_argument('--reanalyze', action='store_true', help="re-run analysis on imported entries")
+    args = parser.parse_args()
+
+    fmt = args.format or ('csv' if args.path.endswith('.csv') else 'ndjson')
+    agent = JournalAgent(args.db)
+    if args.command == 'export':
+        out = sys.stdout if args.path == '-' else open(args.path, 'w', encoding='utf-8', newline='')
+        with out:
+            for chunk in iter_export(agent.pool, fmt):
+                out.write(chunk)
+        print(f"✅ Exported journal as {fmt} to {args.path}", file=sys.stderr)
+    else:
+        source = sys.stdin if args.path == '-' else open(args.path, encoding='utf-8', newline='')
+        with source:
+            report = import_entries(agent, source, fmt, reanalyze=args.reanalyze)
+        agent.close()
+        print(f"✅ Imported {report['imported']} entries ({report['failed']} failed)", file=sys.stderr)
+        for error in report['errors']:
+            print(f"❌ line {error['line']}: {error['error']}", file=sys.stderr)
@@ -0,0 +1,270 @@
+"""
+Structured, non-blocking logging for the API
+
+Records from 'journal.*' loggers go onto a bounded queue and are written by a
+background thread, so a slow stdout never stalls the event loop; when the
+queue is full new records are dropped (and counted) rather than waited on.
+Each request gets an id (the incoming X-Request-ID or a fresh one) that is
+attached to every record it produces, including ones logged from the worker
+pools, and echoed back in the response headers.
+
+    JOURNAL_LOG_LEVEL=INFO                  # level for 'journal.*' loggers
+    JOURNAL_LOG_FORMAT=json                 # json or text
+    JOURNAL_LOG_SAMPLE=/api/journal/entries=0.1   # share of requests whose INFO records are kept
+    JOURNAL_LOG_ROUTE_LEVELS=/api/journal/goals=WARNING
+    JOURNAL_LOG_ENTRY_TEXT=0                # 1 logs the start of entry text instead of redacting it
+
+Warnings and errors are never sampled away.
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+LOG_LEVEL = os.getenv('JOURNAL_LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('JOURNAL_LOG_FORMAT', 'json')
+LOG_ENTRY_TEXT = os.getenv('JOURNAL_LOG_ENTRY_TEXT', '0') == '1'
+
+# Records waiting for the writer thread before new ones are dropped
+LOG_QUEUE_SIZE = int(os.getenv('JOURNAL_LOG_QUEUE_SIZE', '10000'))
+
+# Characters of entry text logged when JOURNAL_LOG_ENTRY_TEXT=1
+ENTRY_TEXT_CHARS = 50
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {'message', 'request_id', 'route'}
+
+
+def _parse_route_map(spec, convert):
+    """'/a=0.1,/b=0.5' -> {'/a': 0.1, '/b': 0.5}"""
+    routes = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        route, _, value = item.rpartition('=')
+        if not route:
+            raise ValueError(f"Expected route=value, got '{item}'")
+        routes[route] = convert(value)
+    return routes
+
+
+def _level(name):
+    level = logging.getLevelName(name.strip().upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level '{name}'")
+    return level
+
+
+ROUTE_SAMPLE_RATES = _parse_route_map(os.getenv('JOURNAL_LOG_SAMPLE', ''), float)
+ROUTE_LEVELS = _parse_route_map(os.getenv('JOURNAL_LOG_ROUTE_LEVELS', ''), _level)
+
+
+class RequestContext:
+    __slots__ = ('request_id', 'route', 'sampled', 'level')
+
+    def __init__(self, request_id, route, sampled=True, level=logging.NOTSET):
+        self.request_id = request_id
+        self.route = route
+        self.sampled = sampled
+        self.level = level
+
+
+_request = contextvars.ContextVar('journal_request', default=None)
+
+
+def current_request_id():
+    context = _request.get()
+    return context.request_id if context else None
+
+
+def redact(text):
+    """What a log record may say about private entry text"""
+    if text is None:
+        return None
+    if LOG_ENTRY_TEXT:
+        return text[:ENTRY_TEXT_CHARS]
+    return f"[redacted {len(text)} chars]"
+
+
+class ContextFilter(logging.Filter):
+    """Stamp records with the request they belong to and apply its sampling and level
+
+    Attached to the queue handler, so it runs in the thread that logged,
+    where the request's context variable is still visible.
+    """
+
+    def filter(self, record):
+        context = _request.get()
+        if context is None:
+            record.request_id = None
+            record.route = None
+            return True
+        if record.levelno < context.level:
+            return False
+        if record.levelno < logging.WARNING and not context.sampled:
+            return False
+        record.request_id = context.request_id
+        record.route = context.route
+        return True
+
+
+def _extra_fields(record):
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_FIELDS}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        if getattr(record, 'request_id', None):
+            payload['request_id'] = record.request_id
+            payload['route'] = record.route
+        payload.update(_extra_fields(record))
+        if record.exc_text:
+            payload['exc'] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable variant for local development"""
+
+    def format(self, record):
+        line = f"{self.formatTime(record)} {record.levelname:<7} {record.name}"
+        if getattr(record, 'request_id', None):
+            line += f" [{record.request_id}]"
+        line += f" {record.getMessage()}"
+        fields = _extra_fields(record)
+        if fields:
+            line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_text:
+            line += '\n' + record.exc_text
+        return line
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks and keeps records structured"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Resolve the message and traceback here, while the args and the
+        # exception are still alive; extra fields stay separate
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener = None
+_queue_handler = None
+
+
+def setup_logging(stream=None, level=LOG_LEVEL, fmt=LOG_FORMAT):
+    """Send 'journal.*' loggers through the queue to a writer thread (once per process)"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _queue_handler
+    if fmt not in ('json', 'text'):
+        raise ValueError(f"Unknown log format '{fmt}' (choose from json, text)")
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    _queue_handler = _QueueHandler(log_queue)
+    _queue_handler.addFilter(ContextFilter())
+    logger = logging.getLogger('journal')
+    logger.setLevel(level)
+    logger.addHandler(_queue_handler)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _queue_handler
+
+
+def stop_logging():
+    """Write out queued records and stop the writer thread"""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    _listener.stop()
+    logging.getLogger('journal').removeHandler(_queue_handler)
+    atexit.unregister(stop_logging)
+    _listener = None
+    _queue_handler = None
+
+
+access_log = logging.getLogger('journal.access')
+
+
+class RequestContextMiddleware:
+    """ASGI middleware giving each request an id, sampling decision and access log record"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        request_id = None
+        for name, value in scope['headers']:
+            if name == b'x-request-id':
+                # Bounded, so a client cannot make us log arbitrary payloads
+                request_id = value.decode('latin-1')[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+        route = scope['path']
+        rate = ROUTE_SAMPLE_RATES.get(route, 1.0)
+        context = RequestContext(
+            request_id, route,
+            sampled=rate >= 1.0 or random.random() < rate,
+            level=ROUTE_LEVELS.get(route, logging.NOTSET),
+        )
+        token = _request.set(context)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_request_id(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                message['headers'] = list(message.get('headers', [])) + [
+                    (b'x-request-id', request_id.encode('latin-1'))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            access_log.log(logging.ERROR if status >= 500 else logging.INFO, "request", extra={
+                'method': scope['method'],
+                'status': status,
+                'duration_ms': round((time.perf_counter() - start) * 1000, 2),
+            })
+            _request.reset(token)
@@ -0,0 +1,183 @@
+"""
+Persisted journaling stats for the goals endpoint
+
+A single journal_stats row (total entries, last entry date, current and
+longest streak) plus per-ISO-week entry counts, all updated on every insert
+so /api/journal/goals is a couple of primary-key reads.
+"""
+from datetime import date, timedelta
+
+# Targets used until a user sets their own
+DEFAULT_TARGETS = {
+    'daily_streak': 7,
+    'weekly_entries': 5,
+    'total_entries': 30,
+}
+
+
+def create_tables(conn):
+    """Create the stats tables if they do not exist yet"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS journal_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_entries INTEGER NOT NULL DEFAULT 0,
+            last_entry_date TEXT,
+            current_streak INTEGER NOT NULL DEFAULT 0,
+            longest_streak INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute('INSERT OR IGNORE INTO journal_stats (id) VALUES (1)')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS weekly_entry_counts (
+            iso_week TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS goal_targets (
+            user_id TEXT PRIMARY KEY,
+            daily_streak INTEGER NOT NULL,
+            weekly_entries INTEGER NOT NULL,
+            total_entries INTEGER NOT NULL
+        )
+    ''')
+
+
+def iso_week(day):
+    """'2024-W07' style key for a date"""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def record_entries(conn, entry_dates):
+    """Fold newly inserted entry dates into the stats (call in the insert transaction)
+
+    Dates at or after the last entry date extend or reset the streak in O(1).
+    A back-dated entry can fill a gap in the past, so it triggers a streak
+    recount from daily_entry_counts, which must already include the new rows.
+    """
+    if not entry_dates:
+        return
+    weeks = {}
+    for date_str in entry_dates:
+        week = iso_week(date.fromisoformat(date_str))
+        weeks[week] = weeks.get(week, 0) + 1
+    conn.executemany('''
+        INSERT INTO weekly_entry_counts (iso_week, count) VALUES (?, ?)
+        ON CONFLICT (iso_week) DO UPDATE SET count = count + excluded.count
+    ''', weeks.items())
+
+    last_date, current, longest = conn.execute(
+        'SELECT last_entry_date, current_streak, longest_streak FROM journal_stats WHERE id = 1'
+    ).fetchone()
+    last = date.fromisoformat(last_date) if last_date else None
+    backdated = False
+    for day in sorted(set(date.fromisoformat(d) for d in entry_dates)):
+        if last is None or day > last + timedelta(days=1):
+            current = 1
+        elif day == last + timedelta(days=1):
+            current += 1
+        elif day < last:
+            backdated = True
+            continue
+        last = day
+        longest = max(longest, current)
+
+    conn.execute('''
+        UPDATE journal_stats
+        SET total_entries = total_entries + ?, last_entry_date = ?,
+            current_streak = ?, longest_streak = ?
+        WHERE id = 1
+    ''', (len(entry_dates), last.isoformat(), current, longest))
+    if backdated:
+        _recount_streaks(conn)
+
+
+def _recount_streaks(conn):
+    """Recompute both streaks by walking the per-day rollup (one row per day)"""
+    current = longest = 0
+    previous = None
+    for (date_str,) in conn.execute('SELECT date FROM daily_entry_counts ORDER BY date'):
+        day = date.fromisoformat(date_str)
+        current = current + 1 if previous is not None and day == previous + timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    conn.execute(
+        'UPDATE journal_stats SET current_streak = ?, longest_streak = ? WHERE id = 1',
+        (current, longest)
+    )
+
+
+def rebuild(conn):
+    """Recompute every stat from the daily rollups"""
+    # Only the counts: the weekly mood sums are kept by rollups
+    conn.execute('UPDATE weekly_entry_counts SET count = 0')
+    weeks = {}
+    total = 0
+    last_date = None
+    for date_str, count in conn.execute('SELECT date, count FROM daily_entry_counts ORDER BY date'):
+        week = iso_week(date.fromisoformat(date_str))
+        weeks[week] = weeks.get(week, 0) + count
+        total += count
+        last_date = date_str
+    conn.executemany('''
+        INSERT INTO weekly_entry_counts (iso_week, count) VALUES (?, ?)
+        ON CONFLICT (iso_week) DO UPDATE SET count = excluded.count
+    ''', weeks.items())
+    conn.execute(
+        'UPDATE journal_stats SET total_entries = ?, last_entry_date = ? WHERE id = 1',
+        (total, last_date)
+    )
+    _recount_streaks(conn)
+
+
+def load_goals(conn, user_id, today=None):
+    """Current stats plus the user's targets, as served by /api/journal/goals"""
+    today = today or date.today()
+    total, last_date, current, longest = conn.execute('''
+        SELECT total_entries, last_entry_date, current_streak, longest_streak
+        FROM journal_stats WHERE id = 1
+    ''').fetchone()
+    row = conn.execute(
+        'SELECT count, mood_sum, mood_n, arousal_sum FROM weekly_entry_counts WHERE iso_week = ?',
+        (iso_week(today),)
+    ).fetchone()
+    week_entries, mood_sum, mood_n, arousal_sum = row or (0, 0.0, 0, 0.0)
+
+    # A streak only counts while it is still alive today
+    streak = current if last_date == today.isoformat() else 0
+    return {
+        'total_entries': total,
+        'week_entries': week_entries,
+        'week_mood': round(mood_sum / mood_n, 3) if mood_n else None,
+        'week_arousal': round(arousal_sum / mood_n, 3) if mood_n else None,
+        'streak': streak,
+        'longest_streak': longest,
+        'targets': load_targets(conn, user_id),
+    }
+
+
+def load_targets(conn, user_id):
+    """The user's goal targets, falling back to DEFAULT_TARGETS"""
+    row = conn.execute(
+        'SELECT daily_streak, weekly_entries, total_entries FROM goal_targets WHERE user_id = ?',
+        (user_id,)
+    ).fetchone()
+    if row is None:
+        return dict(DEFAULT_TARGETS)
+    return dict(zip(('daily_streak', 'weekly_entries', 'total_entries'), row))
+
+
+def save_targets(conn, user_id, targets):
+    """Store a user's goal targets; missing keys keep their current value"""
+    merged = load_targets(conn, user_id)
+    merged.update({key: value for key, value in targets.items() if value is not None})
+    conn.execute('''
+        INSERT INTO goal_targets (user_id, daily_streak, weekly_entries, total_entries)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (user_id) DO UPDATE SET
+            daily_streak = excluded.daily_streak,
+            weekly_entries = excluded.weekly_entries,
+            total_entries = excluded.total_entries
+    ''', (user_id, merged['daily_streak'], merged['weekly_entries'], merged['total_entries']))
+    return merged
@@ -0,0 +1,123 @@
+"""Storage helpers shared by JournalAgent and ServerlessDatabase"""
+import base64
+import json
+
+import journal_stats
+import rollups
+
+ENTRY_COLUMNS = ('date', 'original_entry', 'summary', 'emotions', 'reflection')
+
+# Scored with the analysis (see mood_scores), before the write transaction
+SCORE_COLUMNS = ('mood_score', 'arousal')
+
+# Every column a client may ask for with fields=
+ENTRY_FIELDS = (
+    'id', 'date', 'original_entry', 'summary', 'emotions', 'reflection', 'created_at', 'mood_score', 'arousal'
+)
+
+# Always returned, because page cursors are built from them
+KEY_FIELDS = ('id', 'created_at')
+
+
+def insert_entries(conn, entries):
+    """Insert analyzed entries with one executemany and return their ids
+
+    Must run inside the pool's writer transaction: holding the write lock is
+    what guarantees the AUTOINCREMENT ids of the batch are contiguous, and
+    the daily rollups and stats are updated in that same transaction.
+    Entries must already carry mood_score and arousal.
+    """
+    if not entries:
+        return []
+    scores = [tuple(entry[column] for column in SCORE_COLUMNS) for entry in entries]
+    # created_at is only supplied by imports; new entries get the current time
+    conn.executemany('''
+        INSERT INTO entries (date, original_entry, summary, emotions, reflection, created_at, mood_score, arousal)
+        VALUES (?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?, ?)
+    ''', [
+        (*(entry[column] for column in ENTRY_COLUMNS), entry.get('created_at'), *score)
+        for entry, score in zip(entries, scores)
+    ])
+    last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+    rollups.update_daily_counts(conn, entries, scores)
+    journal_stats.record_entries(conn, [entry['date'] for entry in entries])
+    first_id = last_id - len(entries) + 1
+    return list(range(first_id, last_id + 1))
+
+
+def encode_cursor(entry):
+    """Opaque cursor for an entry's (created_at, id) position"""
+    raw = json.dumps([entry['created_at'], entry['id']]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, entry_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(created_at), int(entry_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def parse_fields(fields):
+    """Validate a comma-separated fields= value and return the columns to select"""
+    if not fields:
+        return ENTRY_FIELDS
+    requested = [f.strip() for f in fields.split(',') if f.strip()]
+    unknown = [f for f in requested if f not in ENTRY_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    # Keep table order so the projection is stable
+    return tuple(f for f in ENTRY_FIELDS if f in requested or f in KEY_FIELDS)
+
+
+def fetch_entries_page(conn, limit=10, before=None, after=None, fields=None):
+    """One page of entries, newest first, using (created_at, id) keysets
+
+    `before` pages towards older entries and `after` towards newer ones. Both
+    seek straight into idx_entries_created_at, so a deep page costs the same
+    as the first one.
+    """
+    if before and after:
+        raise ValueError("Use either before or after, not both")
+    columns = parse_fields(fields)
+    select = f"SELECT {', '.join(columns)} FROM entries"
+
+    if after:
+        rows = conn.execute(f'''
+            {select}
+            WHERE (created_at, id) > (?, ?)
+            ORDER BY created_at ASC, id ASC
+            LIMIT ?
+        ''', (*decode_cursor(after), limit + 1)).fetchall()
+        has_newer = len(rows) > limit
+        rows = rows[:limit][::-1]
+        has_older = True
+    elif before:
+        rows = conn.execute(f'''
+            {select}
+            WHERE (created_at, id) < (?, ?)
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        ''', (*decode_cursor(before), limit + 1)).fetchall()
+        has_older = len(rows) > limit
+        rows = rows[:limit]
+        has_newer = True
+    else:
+        rows = conn.execute(f'''
+            {select}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        ''', (limit + 1,)).fetchall()
+        has_older = len(rows) > limit
+        rows = rows[:limit]
+        has_newer = False
+
+    entries = [dict(zip(columns, row)) for row in rows]
+    return {
+        'entries': entries,
+        'next_cursor': encode_cursor(entries[-1]) if entries and has_older else None,
+        'prev_cursor': encode_cursor(entries[0]) if entries and has_newer else None,
+    }
@@ -0,0 +1,94 @@
+"""
+Pluggable async LLM providers for entry analysis
+
+A provider turns a prompt into text. JournalAgent asks for the summary,
+emotions and reflection of an entry concurrently, each call under its own
+timeout, so analysis latency is the slowest of the three rather than their
+sum. With no provider configured (the default), the agent uses its built-in
+mock analysis and never builds a prompt.
+
+Select a provider with JOURNAL_LLM_PROVIDER:
+    mock  built-in keyword analysis (default)
+    http  OpenAI-style /v1/chat/completions endpoint at JOURNAL_LLM_BASE_URL
+"""
+import os
+
+LLM_PROVIDER = os.getenv('JOURNAL_LLM_PROVIDER', 'mock')
+LLM_BASE_URL = os.getenv('JOURNAL_LLM_BASE_URL', 'http://127.0.0.1:8100')
+LLM_MODEL = os.getenv('JOURNAL_LLM_MODEL', 'journal-default')
+LLM_API_KEY = os.getenv('JOURNAL_LLM_API_KEY')
+
+# Seconds allowed for each of the three calls before falling back to mock output
+LLM_TIMEOUT = float(os.getenv('JOURNAL_LLM_TIMEOUT', '10'))
+
+# Connections kept open to the provider, shared by every request
+LLM_MAX_CONNECTIONS = int(os.getenv('JOURNAL_LLM_MAX_CONNECTIONS', '32'))
+
+
+class LLMProvider:
+    """Interface: an async prompt -> text call plus cleanup"""
+
+    name = 'base'
+
+    @property
+    def version(self):
+        """Identifies the analyzer in analysis cache keys"""
+        return self.name
+
+    async def complete(self, prompt, max_tokens=200):
+        raise NotImplementedError
+
+    async def aclose(self):
+        pass
+
+
+class HTTPProvider(LLMProvider):
+    """Chat-completions client over one pooled httpx.AsyncClient"""
+
+    name = 'http'
+
+    def __init__(self, base_url=LLM_BASE_URL, model=LLM_MODEL, api_key=LLM_API_KEY,
+                 max_connections=LLM_MAX_CONNECTIONS, transport=None):
+        # Only needed when a real provider is configured
+        import httpx
+
+        headers = {'Authorization': f'Bearer {api_key}'} if api_key else {}
+        self.model = model
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(LLM_TIMEOUT),
+            transport=transport,
+        )
+
+    async def complete(self, prompt, max_tokens=200):
+        response = await self._client.post('/v1/chat/completions', json={
+            'model': self.model,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'max_tokens': max_tokens,
+        })
+        response.raise_for_status()
+        return response.json()['choices'][0]['message']['content'].strip()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    @property
+    def version(self):
+        return f"{self.name}:{self.model}"
+
+
+PROVIDERS = {
+    'http': HTTPProvider,
+}
+
+
+def get_provider(name=None):
+    """Provider named by JOURNAL_LLM_PROVIDER, or None for the built-in mock"""
+    name = (name or LLM_PROVIDER).lower()
+    if name == 'mock':
+        return None
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider '{name}' (choose from mock, {', '.join(PROVIDERS)})")
+    return PROVIDERS[name]()
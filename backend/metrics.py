@@ -0,0 +1,299 @@
+"""
+Hot-path metrics in Prometheus text format
+
+Set JOURNAL_METRICS=1 to collect them and serve GET /metrics. Collected:
+time per analysis stage and per entry save, every SQL statement's execution
+time, request counts and latency by route, plus queue depths and cache
+counters read at scrape time. When metrics are off nothing is installed: no
+middleware, no timed connections, and stage() hands back a shared no-op.
+"""
+import bisect
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import nullcontext
+from functools import lru_cache
+
+ENABLED = os.getenv('JOURNAL_METRICS', '').lower() in ('1', 'true', 'yes', 'on')
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Histogram upper bounds in seconds, 100µs to 10s
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# SQL strings whose histogram series are memoized
+MAX_STATEMENT_LABELS = 1024
+
+_NOOP = nullcontext()
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _register(metric):
+    # Re-registering a name (e.g. when api_server is reloaded) replaces the old metric
+    with _registry_lock:
+        _registry[metric.name] = metric
+    return metric
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _register(self)
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in values:
+            yield self.name, _format_labels(self.labels, label_values), value
+
+
+class _Series:
+    """Bucket counts and sum for one label combination of a histogram"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'lock')
+
+    def __init__(self, buckets, lock):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last bucket is +Inf
+        self.sum = 0.0
+        self.lock = lock
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram:
+    """Bucketed distribution of observed values (seconds) per label combination"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+        _register(self)
+
+    def series(self, *label_values):
+        """The series for these label values; hot paths keep it to skip the lookup"""
+        series = self._series.get(label_values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(label_values, _Series(self.buckets, self._lock))
+        return series
+
+    def observe(self, value, *label_values):
+        self.series(*label_values).observe(value)
+
+    def samples(self):
+        with self._lock:
+            series = [(labels, list(s.counts), s.sum) for labels, s in self._series.items()]
+        for label_values, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                yield f'{self.name}_bucket', _format_labels(self.labels, label_values, [('le', le)]), cumulative
+            yield f'{self.name}_sum', _format_labels(self.labels, label_values), total
+            yield f'{self.name}_count', _format_labels(self.labels, label_values), cumulative
+
+
+class Callback:
+    """Gauge or counter read from the application at scrape time
+
+    read() returns a number, or a dict mapping label-value tuples to numbers.
+    """
+
+    def __init__(self, name, help, read, kind='gauge', labels=()):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labels = tuple(labels)
+        self._read = read
+        _register(self)
+
+    def samples(self):
+        value = self._read()
+        items = value.items() if isinstance(value, dict) else [((), value)]
+        for label_values, sample in items:
+            yield self.name, _format_labels(self.labels, label_values), sample
+
+
+class _Timer:
+    __slots__ = ('series', 'start')
+
+    def __init__(self, series):
+        self.series = series
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.series.observe(time.perf_counter() - self.start)
+
+
+STAGE_SECONDS = Histogram(
+    'journal_stage_seconds', "Time spent in each step of processing an entry", ['stage']
+)
+SQL_SECONDS = Histogram(
+    'journal_sql_seconds', "SQL statement execution time (up to the first result row)", ['statement']
+)
+REQUEST_SECONDS = Histogram(
+    'journal_http_request_seconds', "HTTP request latency, including streamed bodies", ['method', 'route']
+)
+REQUESTS = Counter(
+    'journal_http_requests_total', "HTTP requests by route and status", ['method', 'route', 'status']
+)
+JSON_RENDER_SECONDS = Histogram(
+    'journal_json_render_seconds', "Time spent serializing JSON responses"
+)
+
+
+def stage(name):
+    """Time a block into journal_stage_seconds (a shared no-op when metrics are off)"""
+    return _Timer(STAGE_SECONDS.series(name)) if ENABLED else _NOOP
+
+
+def observe_stage(name, seconds):
+    if ENABLED:
+        STAGE_SECONDS.observe(seconds, name)
+
+
+def render():
+    """Every registered metric in Prometheus text exposition format"""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        lines.append(f'# HELP {metric.name} {metric.help}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for name, labels, value in metric.samples():
+            lines.append(f'{name}{labels} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+_sql_series = {}
+_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+([A-Za-z_]\w*)', re.IGNORECASE)
+_DML = frozenset(('select', 'insert', 'update', 'delete', 'replace', 'with'))
+
+
+def statement_label(sql):
+    """Low-cardinality label for a statement, e.g. 'select entries' or 'commit'"""
+    words = sql.split(None, 1)
+    verb = words[0].lower() if words else 'empty'
+    table = _TABLE.search(sql) if verb in _DML else None
+    return f'{verb} {table.group(1)}' if table else verb
+
+
+def _statement_series(sql):
+    series = _sql_series.get(sql)
+    if series is None:
+        series = SQL_SECONDS.series(statement_label(sql))
+        if len(_sql_series) < MAX_STATEMENT_LABELS:
+            _sql_series[sql] = series
+    return series
+
+
+_execute = sqlite3.Connection.execute
+_executemany = sqlite3.Connection.executemany
+_perf_counter = time.perf_counter
+
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3 connection that records every execute() in journal_sql_seconds
+
+    Statements that raise are not recorded.
+    """
+
+    def execute(self, sql, parameters=()):
+        start = _perf_counter()
+        cursor = _execute(self, sql, parameters)
+        elapsed = _perf_counter() - start
+        (_sql_series.get(sql) or _statement_series(sql)).observe(elapsed)
+        return cursor
+
+    def executemany(self, sql, parameters):
+        start = _perf_counter()
+        cursor = _executemany(self, sql, parameters)
+        elapsed = _perf_counter() - start
+        (_sql_series.get(sql) or _statement_series(sql)).observe(elapsed)
+        return cursor
+
+
+@lru_cache(maxsize=None)
+def timed_json_response():
+    """JSONResponse subclass timing render() (built lazily so CLIs never import FastAPI)"""
+    from fastapi.responses import JSONResponse
+
+    class TimedJSONResponse(JSONResponse):
+        def render(self, content):
+            start = time.perf_counter()
+            try:
+                return super().render(content)
+            finally:
+                JSON_RENDER_SECONDS.observe(time.perf_counter() - start)
+
+    return TimedJSONResponse
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and timing them by route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router records the matched route in the scope; unmatched
+            # paths share one label so scans cannot blow up the series count
+            route = getattr(scope.get('route'), 'path', 'unmatched')
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope['method'], route)
+            REQUESTS.inc(scope['method'], route, str(status))
@@ -0,0 +1,116 @@
+"""
+Versioned schema migrations
+
+The schema version lives in PRAGMA user_version. At startup every migration
+newer than that version runs, in order, inside one writer transaction, so a
+database is either fully upgraded or left untouched. To change the schema,
+append a new (version, description, function) entry to MIGRATIONS - never edit
+one that has already shipped.
+"""
+import analysis_cache
+import journal_stats
+import mood_scores
+import rollups
+import search
+
+
+def _create_entries(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            original_entry TEXT NOT NULL,
+            summary TEXT,
+            emotions TEXT,
+            reflection TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _add_daily_rollups(conn):
+    rollups.create_tables(conn)
+    rollups.backfill(conn)
+
+
+def _add_journal_stats(conn):
+    # Rebuilt from the daily rollups, so this must run after them
+    journal_stats.create_tables(conn)
+    journal_stats.rebuild(conn)
+
+
+def _add_entry_indexes(conn):
+    # Recent-entries listing walks this index instead of sorting the table
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_created_at ON entries (created_at DESC, id DESC)')
+    # Date-range filters (analytics windows, exports) become index range scans
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_date ON entries (date)')
+
+
+def _add_full_text_search(conn):
+    search.create_index(conn)
+    search.rebuild(conn)
+
+
+def _add_analysis_cache(conn):
+    analysis_cache.create_tables(conn)
+
+
+def _add_period_rollups(conn):
+    # Built from the daily rollups
+    rollups.create_period_tables(conn)
+    rollups.backfill_periods(conn)
+
+
+def _add_mood_scores(conn):
+    mood_scores.add_columns(conn)
+    mood_scores.backfill(conn)
+
+
+def _add_mood_rollups(conn):
+    rollups.add_mood_columns(conn)
+    rollups.backfill_moods(conn)
+
+
+MIGRATIONS = [
+    (1, "create entries table", _create_entries),
+    (2, "daily emotion rollups", _add_daily_rollups),
+    (3, "journal stats and goal targets", _add_journal_stats),
+    (4, "indexes on entries.created_at and entries.date", _add_entry_indexes),
+    (5, "FTS5 search index over entries", _add_full_text_search),
+    (6, "content-addressed analysis cache", _add_analysis_cache),
+    (7, "weekly and monthly emotion rollups", _add_period_rollups),
+    (8, "mood_score and arousal columns", _add_mood_scores),
+    (9, "mood sums in the entry-count rollups", _add_mood_rollups),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def run_migrations(conn):
+    """Apply pending migrations on a connection already inside a write transaction"""
+    version = current_version(conn)
+    applied = []
+    for migration_version, description, apply in MIGRATIONS:
+        if migration_version <= version:
+            continue
+        apply(conn)
+        conn.execute(f'PRAGMA user_version = {migration_version}')
+        applied.append(description)
+    return applied
+
+
+def migrate(pool):
+    """Bring a pooled database up to SCHEMA_VERSION
+
+    The version check uses a read connection, so an up-to-date database never
+    takes the write lock or runs any DDL.
+    """
+    with pool.reader() as conn:
+        if current_version(conn) >= SCHEMA_VERSION:
+            return []
+    with pool.writer() as conn:
+        return run_migrations(conn)
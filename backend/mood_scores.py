@@ -0,0 +1,57 @@
+"""
+Numeric mood per entry: entries.mood_score (valence, -1 to 1) and arousal (0 to 1)
+
+Scores come from the emotion lexicon. Every emotion the entry's text mentions
+counts, not just the three kept in the emotions column. New entries are
+scored with their analysis (JournalAgent._entry_data) or by score_entries
+before the write transaction, so insert_entries only stores the values. The
+migration that adds the columns scores the existing rows in chunks. Entries that mention no lexicon emotion are left
+NULL, so mood averages skip them instead of counting them as neutral (the
+rollups' mood_n only counts scored entries).
+"""
+from emotion_lexicon import get_matcher
+
+
+def add_columns(conn):
+    conn.execute('ALTER TABLE entries ADD COLUMN mood_score REAL')
+    conn.execute('ALTER TABLE entries ADD COLUMN arousal REAL')
+
+
+def score_texts(texts):
+    """(mood_score, arousal) for each text in a batch"""
+    matcher = get_matcher()
+    match, affect_of = matcher.match, matcher.affect_of
+    return [affect_of(match(text)) for text in texts]
+
+
+def score_entries(entries):
+    """Set mood_score and arousal on entries that do not carry them yet
+
+    Call before taking the write lock, so the lexicon scan never runs while
+    the single writer is held.
+    """
+    unscored = [entry for entry in entries if 'mood_score' not in entry]
+    if not unscored:
+        return
+    for entry, (mood, arousal) in zip(unscored, score_texts(entry['original_entry'] for entry in unscored)):
+        entry['mood_score'] = mood
+        entry['arousal'] = arousal
+
+
+def backfill(conn, chunk_size=10000):
+    """Score every entry; returns how many were scored"""
+    last_id = 0
+    scored = 0
+    while True:
+        rows = conn.execute(
+            'SELECT id, original_entry FROM entries WHERE id > ? ORDER BY id LIMIT ?', (last_id, chunk_size)
+        ).fetchall()
+        if not rows:
+            return scored
+        scores = score_texts(text for _, text in rows)
+        conn.executemany(
+            'UPDATE entries SET mood_score = ?, arousal = ? WHERE id = ?',
+            [(mood, arousal, entry_id) for (entry_id, _), (mood, arousal) in zip(rows, scores)]
+        )
+        last_id = rows[-1][0]
+        scored += len(rows)
@@ -0,0 +1,56 @@
+import json
+import os
+import random
+from functools import lru_cache
+from types import MappingProxyType
+
+TEMPLATES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'reflection_templates.json')
+
+
+class ReflectionBank:
+    """Reflection templates by style and category, frozen at load time
+
+    Categories are picked from an EmotionMatch, so the entry text is never
+    scanned again: the first rule whose emotions or topics were hit wins.
+    """
+
+    def __init__(self, templates):
+        self.default_style = templates['default_style']
+        self.default_category = templates['default_category']
+        self.rules = tuple(
+            (rule['category'], frozenset(rule.get('emotions', ())), frozenset(rule.get('topics', ())))
+            for rule in templates['category_rules']
+        )
+        self.styles = MappingProxyType({
+            style: MappingProxyType({category: tuple(texts) for category, texts in categories.items()})
+            for style, categories in templates['styles'].items()
+        })
+        self.style_names = tuple(self.styles)
+
+    @classmethod
+    def from_file(cls, path=TEMPLATES_PATH):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def category_for(self, match):
+        """Reflection category for an EmotionMatch"""
+        for category, emotions, topics in self.rules:
+            if not emotions.isdisjoint(match.emotions) or not topics.isdisjoint(match.topics):
+                return category
+        return self.default_category
+
+    def choose(self, match, style=None, rng=random):
+        """Pick a reflection for an entry; unknown styles raise ValueError"""
+        if style is None:
+            style = self.default_style
+        templates = self.styles.get(style)
+        if templates is None:
+            raise ValueError(f"Unknown reflection style '{style}' (choose from {', '.join(self.style_names)})")
+        options = templates.get(self.category_for(match)) or templates[self.default_category]
+        return rng.choice(options)
+
+
+@lru_cache(maxsize=None)
+def get_reflection_bank():
+    """Shared template bank, loaded once per process"""
+    return ReflectionBank.from_file()
@@ -0,0 +1,89 @@
+"""
+In-process cache for read endpoint responses
+
+Keys include the journal's data version, which every commit to its database
+changes (including commits from other processes), so a cached response is
+never served after the data behind it has changed; stale keys
+simply age out of the LRU. Concurrent misses for the same key are coalesced
+(single-flight): the first request computes the value and the others await it.
+"""
+import asyncio
+import json
+import os
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = int(os.getenv('JOURNAL_CACHE_MAX_ENTRIES', '512'))
+DEFAULT_MAX_BYTES = int(os.getenv('JOURNAL_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+
+
+class ResponseCache:
+    """LRU cache with an entry-count and approximate memory cap"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size in bytes)
+        self._bytes = 0
+        self._inflight = {}            # key -> Future shared by coalesced callers
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    async def get_or_compute(self, key, compute):
+        """Return the cached value for key, or await compute() exactly once"""
+        cached = self._entries.get(key)
+        if cached is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached[0]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._inflight[key]
+        future.set_result(value)
+        self._store(key, value)
+        return value
+
+    def _store(self, key, value):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Pre-aggregated per-day, per-week and per-month emotion counts for analytics
+
+save_entry keeps these tables current inside its own transaction, so
+analytics reads one row per (period, emotion) instead of every entry. The
+entry-count tables also carry mood_sum, mood_n (scored entries) and
+arousal_sum, so average mood comes from the same rows. Weeks
+are ISO weeks ('2024-W07', as journal_stats already counts entries by) and
+months are '2024-02'. A window is answered from whole months or weeks plus
+daily rows for the ragged edges, so a year costs about a dozen monthly rows
+however long the history is. The migrations that create the tables backfill
+existing databases; to rebuild by hand:
+    python backend/rollups.py [path/to/journal.db]
+"""
+import os
+import sys
+from collections import Counter
+from datetime import date, timedelta
+
+from journal_stats import iso_week
+
+GRANULARITIES = ('day', 'week', 'month')
+
+# granularity -> (table prefix, key column) of its coarser rollups. Weekly
+# entry totals are journal_stats' weekly_entry_counts, kept by record_entries.
+PERIOD_TABLES = {'week': ('weekly', 'iso_week'), 'month': ('monthly', 'month')}
+
+# granularity -> (table, key column) of its entry counts, which also hold the mood sums
+ENTRY_COUNT_TABLES = {
+    'day': ('daily_entry_counts', 'date'),
+    'week': ('weekly_entry_counts', 'iso_week'),
+    'month': ('monthly_entry_counts', 'month'),
+}
+
+
+def create_tables(conn):
+    """Create the rollup tables if they do not exist yet"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS daily_emotion_counts (
+            date TEXT NOT NULL,
+            emotion TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (date, emotion)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS daily_entry_counts (
+            date TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+
+
+def create_period_tables(conn):
+    """Create the weekly and monthly rollup tables if they do not exist yet"""
+    for prefix, key in PERIOD_TABLES.values():
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {prefix}_emotion_counts (
+                {key} TEXT NOT NULL,
+                emotion TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY ({key}, emotion)
+            ) WITHOUT ROWID
+        ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS monthly_entry_counts (
+            month TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+
+
+def add_mood_columns(conn):
+    """Add the mood sums to the entry-count tables"""
+    for table, _ in ENTRY_COUNT_TABLES.values():
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN mood_sum REAL NOT NULL DEFAULT 0')
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN mood_n INTEGER NOT NULL DEFAULT 0')
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN arousal_sum REAL NOT NULL DEFAULT 0')
+
+
+def period_key(day, granularity):
+    """Key of the day/week/month containing day (a date), as stored in the rollups"""
+    if granularity == 'week':
+        return iso_week(day)
+    if granularity == 'month':
+        return day.isoformat()[:7]
+    return day.isoformat()
+
+
+def period_start(day, granularity):
+    """First day of the day/week/month containing day"""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_period(start, granularity):
+    """First day of the period after the one starting on start"""
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    if granularity == 'month':
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def parse_emotions(emotions_str):
+    """Split a stored 'happy, tired' string into normalized emotion names"""
+    if not emotions_str:
+        return []
+    return [e.strip().lower() for e in emotions_str.split(',') if e.strip()]
+
+
+def update_daily_counts(conn, entries, scores):
+    """Add newly inserted entries to the rollups (call in the insert transaction)
+
+    scores holds each entry's (mood_score, arousal), None when unscored.
+    """
+    entry_counts = Counter()
+    emotion_counts = Counter()
+    moods = {}
+    for entry, (mood, arousal) in zip(entries, scores):
+        entry_counts[entry['date']] += 1
+        for emotion in parse_emotions(entry['emotions']):
+            emotion_counts[(entry['date'], emotion)] += 1
+        if mood is not None:
+            _add_mood(moods, entry['date'], (mood, 1, arousal))
+    _add_counts(conn, entry_counts, emotion_counts)
+
+    days = {day: date.fromisoformat(day) for day in entry_counts}
+    period_moods = {granularity: {} for granularity in GRANULARITIES}
+    for day, sums in moods.items():
+        for granularity in GRANULARITIES:
+            _add_mood(period_moods[granularity], period_key(days[day], granularity), sums)
+    for granularity, (prefix, key) in PERIOD_TABLES.items():
+        period_emotions = Counter()
+        for (day, emotion), count in emotion_counts.items():
+            period_emotions[(period_key(days[day], granularity), emotion)] += count
+        _add_emotion_counts(conn, prefix, key, period_emotions.items())
+    months = Counter()
+    for day, count in entry_counts.items():
+        months[period_key(days[day], 'month')] += count
+    conn.executemany('''
+        INSERT INTO monthly_entry_counts (month, count) VALUES (?, ?)
+        ON CONFLICT (month) DO UPDATE SET count = count + excluded.count
+    ''', months.items())
+    # Weekly counts are record_entries' job; only the sums are added here
+    for granularity, (table, key) in ENTRY_COUNT_TABLES.items():
+        _add_moods(conn, table, key, period_moods[granularity].items())
+
+
+def _add_mood(moods, key, sums):
+    mood_sum, mood_n, arousal_sum = moods.get(key, (0.0, 0, 0.0))
+    moods[key] = (mood_sum + sums[0], mood_n + sums[1], arousal_sum + sums[2])
+
+
+def _add_moods(conn, table, key, moods):
+    conn.executemany(f'''
+        INSERT INTO {table} ({key}, count, mood_sum, mood_n, arousal_sum) VALUES (?, 0, ?, ?, ?)
+        ON CONFLICT ({key}) DO UPDATE SET
+            mood_sum = mood_sum + excluded.mood_sum,
+            mood_n = mood_n + excluded.mood_n,
+            arousal_sum = arousal_sum + excluded.arousal_sum
+    ''', [(period, *sums) for period, sums in moods])
+
+
+def _add_counts(conn, entry_counts, emotion_counts):
+    conn.executemany('''
+        INSERT INTO daily_entry_counts (date, count) VALUES (?, ?)
+        ON CONFLICT (date) DO UPDATE SET count = count + excluded.count
+    ''', entry_counts.items())
+    _add_emotion_counts(conn, 'daily', 'date', emotion_counts.items())
+
+
+def _add_emotion_counts(conn, prefix, key, counts):
+    conn.executemany(f'''
+        INSERT INTO {prefix}_emotion_counts ({key}, emotion, count) VALUES (?, ?, ?)
+        ON CONFLICT ({key}, emotion) DO UPDATE SET count = count + excluded.count
+    ''', [(period, emotion, count) for (period, emotion), count in counts])
+
+
+def backfill(conn, chunk_size=10000):
+    """Rebuild the rollups from the entries table"""
+    conn.execute('DELETE FROM daily_entry_counts')
+    conn.execute('DELETE FROM daily_emotion_counts')
+    entry_counts = Counter()
+    emotion_counts = Counter()
+    cursor = conn.execute('SELECT date, emotions FROM entries')
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        for day, emotions_str in rows:
+            entry_counts[day] += 1
+            for emotion in parse_emotions(emotions_str):
+                emotion_counts[(day, emotion)] += 1
+    _add_counts(conn, entry_counts, emotion_counts)
+    return sum(entry_counts.values())
+
+
+def backfill_periods(conn):
+    """Rebuild the weekly emotion and monthly rollups from the daily ones"""
+    conn.execute('DELETE FROM weekly_emotion_counts')
+    conn.execute('DELETE FROM monthly_emotion_counts')
+    conn.execute('DELETE FROM monthly_entry_counts')
+    # Grouped by each week's Monday in SQL, then named by ISO week
+    weeks = conn.execute('''
+        SELECT date(date, 'weekday 0', '-6 days'), emotion, SUM(count)
+        FROM daily_emotion_counts GROUP BY 1, 2
+    ''')
+    _add_emotion_counts(conn, 'weekly', 'iso_week', (
+        ((iso_week(date.fromisoformat(monday)), emotion), count) for monday, emotion, count in weeks
+    ))
+    conn.execute('''
+        INSERT INTO monthly_emotion_counts (month, emotion, count)
+        SELECT substr(date, 1, 7), emotion, SUM(count) FROM daily_emotion_counts GROUP BY 1, 2
+    ''')
+    conn.execute('''
+        INSERT INTO monthly_entry_counts (month, count)
+        SELECT substr(date, 1, 7), SUM(count) FROM daily_entry_counts GROUP BY 1
+    ''')
+
+
+def backfill_moods(conn):
+    """Recompute the mood sums of every entry-count table from the entries table"""
+    for table, _ in ENTRY_COUNT_TABLES.values():
+        conn.execute(f'UPDATE {table} SET mood_sum = 0, mood_n = 0, arousal_sum = 0')
+    period_moods = {granularity: {} for granularity in GRANULARITIES}
+    for day, *sums in conn.execute('''
+        SELECT date, TOTAL(mood_score), COUNT(mood_score), TOTAL(arousal)
+        FROM entries WHERE mood_score IS NOT NULL GROUP BY date
+    ''').fetchall():
+        for granularity in GRANULARITIES:
+            _add_mood(period_moods[granularity], period_key(date.fromisoformat(day), granularity), sums)
+    for granularity, (table, key) in ENTRY_COUNT_TABLES.items():
+        _add_moods(conn, table, key, period_moods[granularity].items())
+
+
+def _cover(date_from, date_to, granularity):
+    """(table prefix, key column, first key, last key) ranges that tile [date_from, date_to]
+
+    Whole periods come from the coarser tables and the partial ones at either
+    end from daily rows; empty ranges are left out. Week and month keys sort
+    like the periods they name, so each range is one BETWEEN.
+    """
+    one_day = timedelta(days=1)
+    day_range = lambda first, last: ('daily', 'date', first.isoformat(), last.isoformat())
+    if granularity == 'day':
+        return [day_range(date_from, date_to)]
+    first_full = period_start(date_from, granularity)
+    if first_full < date_from:
+        first_full = next_period(first_full, granularity)
+    # Periods starting before end_full lie wholly inside the window
+    end_full = period_start(date_to + one_day, granularity)
+    if first_full >= end_full:
+        return [day_range(date_from, date_to)]
+    prefix, key = PERIOD_TABLES[granularity]
+    ranges = [
+        day_range(date_from, first_full - one_day),
+        (prefix, key, period_key(first_full, granularity), period_key(end_full - one_day, granularity)),
+        day_range(end_full, date_to),
+    ]
+    return [r for r in ranges if r[2] <= r[3]]
+
+
+def count_periods(date_from, date_to, granularity):
+    """Number of day/week/month buckets a window spans"""
+    if granularity == 'day':
+        return (date_to - date_from).days + 1
+    if granularity == 'week':
+        return (period_start(date_to, 'week') - period_start(date_from, 'week')).days // 7 + 1
+    return (date_to.year - date_from.year) * 12 + date_to.month - date_from.month + 1
+
+
+def _average(total, count):
+    return round(total / count, 3) if count else None
+
+
+def _top(counts, top):
+    return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:top])
+
+
+def load_range(conn, date_from, date_to, granularity='day', top=5):
+    """Analytics for dates in [date_from, date_to], bucketed by day, week or month
+
+    Returns total_entries, top_emotions and the average mood_score and
+    arousal for the whole window and a `periods` list with the same per
+    bucket (empty buckets included, and the first and last clipped to the
+    window); day buckets also feed the legacy daily_moods map of date to
+    emotions, most frequent first.
+    """
+    entries = Counter()
+    moods = {}
+    emotions = {}
+    for prefix, key, first, last in _cover(date_from, date_to, granularity):
+        # Daily rows at the edges belong to a coarser bucket
+        bucket = (
+            (lambda day: period_key(date.fromisoformat(day), granularity))
+            if prefix == 'daily' and granularity != 'day' else (lambda period: period)
+        )
+        entry_table = 'weekly_entry_counts' if prefix == 'weekly' else f'{prefix}_entry_counts'
+        for period, count, *sums in conn.execute(
+            f'SELECT {key}, count, mood_sum, mood_n, arousal_sum FROM {entry_table} WHERE {key} BETWEEN ? AND ?',
+            (first, last)
+        ):
+            entries[bucket(period)] += count
+            _add_mood(moods, bucket(period), sums)
+        for period, emotion, count in conn.execute(
+            f'SELECT {key}, emotion, count FROM {prefix}_emotion_counts WHERE {key} BETWEEN ? AND ?',
+            (first, last)
+        ):
+            emotions.setdefault(bucket(period), Counter())[emotion] += count
+
+    totals = Counter()
+    for counts in emotions.values():
+        totals.update(counts)
+    periods = []
+    start = period_start(date_from, granularity)
+    while start <= date_to:
+        end = next_period(start, granularity)
+        key = period_key(start, granularity)
+        mood_sum, mood_n, arousal_sum = moods.get(key, (0.0, 0, 0.0))
+        periods.append({
+            'period': key,
+            'start': max(start, date_from).isoformat(),
+            'end': min(end - timedelta(days=1), date_to).isoformat(),
+            'total_entries': entries[key],
+            'top_emotions': _top(emotions.get(key, {}), top),
+            'average_mood': _average(mood_sum, mood_n),
+            'average_arousal': _average(arousal_sum, mood_n),
+        })
+        start = end
+
+    mood_sum, mood_n, arousal_sum = (sum(column) for column in zip((0.0, 0, 0.0), *moods.values()))
+    result = {
+        'total_entries': sum(entries.values()),
+        'top_emotions': _top(totals, top),
+        'average_mood': _average(mood_sum, mood_n),
+        'average_arousal': _average(arousal_sum, mood_n),
+        'periods': periods,
+    }
+    if granularity == 'day':
+        result['daily_moods'] = {
+            day: [emotion for emotion, _ in sorted(counts.items(), key=lambda item: (-item[1], item[0]))]
+            for day, counts in sorted(emotions.items())
+        }
+    return result
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from db_pool import get_pool
+    from migrations import migrate
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'journal.db'
+    )
+    pool = get_pool(db_path)
+    migrate(pool)
+    with pool.writer() as conn:
+        count = backfill(conn)
+        backfill_periods(conn)
+        backfill_moods(conn)
+    print(f"✅ Rebuilt daily, weekly and monthly rollups from {count} entries in {os.path.abspath(db_path)}")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Full-text search over journal history (SQLite FTS5)
+
+entries_fts is an external-content FTS5 index over entries.original_entry and
+entries.summary, kept in sync by triggers. The migration that creates it
+indexes existing rows; to rebuild by hand:
+    python backend/search.py [path/to/journal.db]
+"""
+import os
+import sys
+
+
+def create_index(conn):
+    """Create the FTS5 table and the triggers that keep it in sync"""
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+            original_entry,
+            summary,
+            content='entries',
+            content_rowid='id',
+            tokenize='porter unicode61'
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+            INSERT INTO entries_fts (rowid, original_entry, summary)
+            VALUES (new.id, new.original_entry, new.summary);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN
+            INSERT INTO entries_fts (entries_fts, rowid, original_entry, summary)
+            VALUES ('delete', old.id, old.original_entry, old.summary);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS entries_fts_update AFTER UPDATE OF original_entry, summary ON entries BEGIN
+            INSERT INTO entries_fts (entries_fts, rowid, original_entry, summary)
+            VALUES ('delete', old.id, old.original_entry, old.summary);
+            INSERT INTO entries_fts (rowid, original_entry, summary)
+            VALUES (new.id, new.original_entry, new.summary);
+        END
+    ''')
+
+
+def rebuild(conn):
+    """Re-index every entry from the entries table"""
+    conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+
+
+def to_match_query(text):
+    """Turn free text into an FTS5 query that matches all of its words
+
+    Each word is quoted, so punctuation in user input (apostrophes, hyphens,
+    a stray AND) is searched for literally instead of being parsed as syntax.
+    """
+    words = text.split()
+    if not words:
+        raise ValueError("Search query is empty")
+    return ' '.join('"%s"' % word.replace('"', '""') for word in words)
+
+
+def search_entries(conn, query, date_from=None, date_to=None, limit=20):
+    """Best-matching entries (bm25) with highlighted snippets"""
+    rows = conn.execute('''
+        SELECT e.id, e.date, e.summary, e.emotions, e.created_at,
+               snippet(entries_fts, 0, '<mark>', '</mark>', '…', 16) AS snippet,
+               bm25(entries_fts) AS score
+        FROM entries_fts
+        JOIN entries e ON e.id = entries_fts.rowid
+        WHERE entries_fts MATCH ?
+          AND (? IS NULL OR e.date >= ?)
+          AND (? IS NULL OR e.date <= ?)
+        ORDER BY score
+        LIMIT ?
+    ''', (to_match_query(query), date_from, date_from, date_to, date_to, limit)).fetchall()
+    columns = ('id', 'date', 'summary', 'emotions', 'created_at', 'snippet', 'score')
+    return [dict(zip(columns, row)) for row in rows]
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from db_pool import get_pool
+    from migrations import migrate
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'journal.db'
+    )
+    pool = get_pool(db_path)
+    migrate(pool)
+    with pool.writer() as conn:
+        rebuild(conn)
+        count = conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+    print(f"✅ Rebuilt search index for {count} entries in {os.path.abspath(db_path)}")
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Per-user journal shards
+
+With JOURNAL_SHARD_DIR set, every user's journal is its own SQLite file, so
+writers for different users never wait on the same database lock and write
+throughput grows with the number of active users instead of topping out at
+one writer. Files are spread over hash buckets (subdirectories, which can sit
+on different volumes):
+
+    <JOURNAL_SHARD_DIR>/layout.json             {"buckets": 16}
+    <JOURNAL_SHARD_DIR>/007/<sha256(user)[:32]>.db
+
+ShardRouter maps a user id to its file and keeps a bounded LRU of open
+JournalAgents; an evicted agent is closed once the requests using it finish.
+The router trusts whatever user id it is given. The API takes it from the
+X-User-Id header, and only when JOURNAL_TRUST_USER_HEADER says an
+authenticating proxy sets that header (and, with JOURNAL_PROXY_SECRET, only
+on requests carrying the proxy's X-Proxy-Secret).
+The CLI below rebalances files onto a new bucket count and adopts existing
+single-file journals. Run it while the API is stopped:
+
+    python backend/shards.py status
+    python backend/shards.py rebalance --buckets 64
+    python backend/shards.py adopt journal.db --user default
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Loads .env before the settings below are read
+from executors import run_db
+from journal_agent import JournalAgent
+from llm_providers import get_provider
+
+SHARD_DIR = os.getenv('JOURNAL_SHARD_DIR') or None
+
+# Buckets in a new layout; an existing layout keeps its own count until rebalanced
+DEFAULT_BUCKETS = int(os.getenv('JOURNAL_SHARD_BUCKETS', '16'))
+
+# Shards kept open at once; each holds a writer and up to one reader per worker thread
+MAX_OPEN_SHARDS = int(os.getenv('JOURNAL_SHARD_MAX_OPEN', '64'))
+
+LAYOUT_FILE = 'layout.json'
+SIDECARS = ('-wal', '-shm')
+
+
+def shard_name(user_id):
+    """File name of a user's shard; hashed, so any user id is a safe name"""
+    return hashlib.sha256(user_id.encode('utf-8')).hexdigest()[:32] + '.db'
+
+
+def bucket_of(name, buckets):
+    return int(name[:8], 16) % buckets
+
+
+def _bucket_dir(shard_dir, bucket):
+    return os.path.join(shard_dir, f'{bucket:03d}')
+
+
+def read_layout(shard_dir, create=True):
+    """Bucket count of a shard directory, writing a fresh layout if it has none"""
+    path = os.path.join(shard_dir, LAYOUT_FILE)
+    try:
+        with open(path) as f:
+            return json.load(f)['buckets']
+    except FileNotFoundError:
+        if not create:
+            raise
+    write_layout(shard_dir, DEFAULT_BUCKETS)
+    return DEFAULT_BUCKETS
+
+
+def write_layout(shard_dir, buckets):
+    os.makedirs(shard_dir, exist_ok=True)
+    path = os.path.join(shard_dir, LAYOUT_FILE)
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump({'buckets': buckets}, f)
+    os.replace(f'{path}.tmp', path)
+
+
+def _bucket_dirs(shard_dir):
+    for name in sorted(os.listdir(shard_dir)):
+        path = os.path.join(shard_dir, name)
+        if name.isdigit() and os.path.isdir(path):
+            yield path
+
+
+def locate(shard_dir, buckets, user_id):
+    """Path of a user's shard: its bucket, or wherever an interrupted rebalance left it"""
+    name = shard_name(user_id)
+    path = os.path.join(_bucket_dir(shard_dir, bucket_of(name, buckets)), name)
+    if not os.path.exists(path):
+        for directory in _bucket_dirs(shard_dir):
+            misplaced = os.path.join(directory, name)
+            if os.path.exists(misplaced):
+                return misplaced
+    return path
+
+
+class ShardRouter:
+    """Opens the JournalAgent for a user's shard, keeping at most max_open of them
+
+    acquire()/release() pin an agent for the length of a request; agents
+    pushed out of the LRU are closed when their last lease is released.
+    Opening and closing shards does I/O, so acquire() and close_agent()
+    belong on a database thread; lease_open() is the I/O-free fast path for
+    shards that are already open.
+    """
+
+    def __init__(self, shard_dir=SHARD_DIR, max_open=MAX_OPEN_SHARDS, **agent_kwargs):
+        self.shard_dir = os.path.abspath(shard_dir)
+        self.buckets = read_layout(self.shard_dir)
+        self.max_open = max_open
+        # One provider (and its connection pool) serves every shard
+        agent_kwargs.setdefault('provider', get_provider())
+        self.provider = agent_kwargs['provider']
+        self._agent_kwargs = agent_kwargs
+        self._agents = OrderedDict()  # user id -> agent, least recently used first
+        self._leases = {}  # agent -> requests using it
+        self._retired = {}  # evicted agent still in use -> its user id
+        self._lock = threading.Lock()
+        # Held while shards are opened or closed. Agents for the same file
+        # share one connection pool, so a close must never overlap an open.
+        self._open_lock = threading.Lock()
+        self.opens = 0
+        self.evictions = 0
+
+    def path_for(self, user_id):
+        return locate(self.shard_dir, self.buckets, user_id)
+
+    def lease_open(self, user_id):
+        """Lease the agent for user_id if its shard is already open, else None"""
+        with self._lock:
+            agent = self._agents.get(user_id)
+            if agent is not None:
+                self._agents.move_to_end(user_id)
+                self._leases[agent] += 1
+            return agent
+
+    def acquire(self, user_id):
+        """Lease the agent for user_id, opening (and if new, creating) its shard"""
+        agent = self.lease_open(user_id)
+        if agent is not None:
+            return agent
+        with self._open_lock:
+            agent = self.lease_open(user_id)
+            if agent is not None:
+                return agent
+            with self._lock:
+                # Evicted but still finishing requests: bring it back
+                agent = next((a for a, user in self._retired.items() if user == user_id), None)
+                self._retired.pop(agent, None)
+            if agent is None:
+                path = self.path_for(user_id)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                agent = JournalAgent(db_path=path, **self._agent_kwargs)
+                self.opens += 1
+            with self._lock:
+                self._agents[user_id] = agent
+                self._leases[agent] = self._leases.get(agent, 0) + 1
+                idle = self._evict()
+            for old in idle:
+                self._close(old)
+        return agent
+
+    def _evict(self):
+        # Caller holds _lock; returns the evicted agents nobody is using
+        idle = []
+        while len(self._agents) > self.max_open:
+            user_id, agent = self._agents.popitem(last=False)
+            self.evictions += 1
+            if self._leases[agent]:
+                self._retired[agent] = user_id
+            else:
+                del self._leases[agent]
+                idle.append(agent)
+        return idle
+
+    def release(self, agent):
+        """End a lease; returns the agent if it was evicted and must now be closed"""
+        with self._lock:
+            self._leases[agent] -= 1
+            if self._leases[agent] or agent not in self._retired:
+                return None
+            del self._retired[agent]
+            del self._leases[agent]
+        return agent
+
+    def close_agent(self, agent):
+        """Close an agent handed back by release()"""
+        with self._open_lock:
+            self._close(agent)
+
+    @staticmethod
+    def _close(agent):
+        agent.close()
+        agent.pool.close()
+
+    @contextmanager
+    def journal(self, user_id):
+        """Agent for user_id for the length of a with block"""
+        agent = self.acquire(user_id)
+        try:
+            yield agent
+        finally:
+            retired = self.release(agent)
+            if retired is not None:
+                self.close_agent(retired)
+
+    def open_agents(self):
+        with self._lock:
+            return list(self._agents.values()) + list(self._retired)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'open': len(self._agents),
+                'max_open': self.max_open,
+                'buckets': self.buckets,
+                'opens': self.opens,
+                'evictions': self.evictions,
+            }
+
+    def close(self):
+        """Flush and close every open shard"""
+        with self._open_lock:
+            with self._lock:
+                agents = list(self._agents.values()) + list(self._retired)
+                self._agents.clear()
+                self._leases.clear()
+                self._retired.clear()
+            for agent in agents:
+                self._close(agent)
+
+    async def aclose(self):
+        """Close every shard and release the shared provider's connections"""
+        await run_db(self.close)
+        if self.provider is not None:
+            await self.provider.aclose()
+
+
+def _move_shard(source, target):
+    # Fold the WAL into the main file first so the move carries one file
+    conn = sqlite3.connect(source)
+    try:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    finally:
+        conn.close()
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.move(source, target)
+    for suffix in SIDECARS:
+        if os.path.exists(source + suffix):
+            os.remove(source + suffix)
+
+
+def rebalance(shard_dir, buckets):
+    """Move every shard into its bucket under a new bucket count; returns files moved
+
+    The new count is recorded first, so an interrupted run leaves shards the
+    router still finds (it falls back to searching every bucket) and can
+    simply be run again.
+    """
+    if buckets < 1:
+        raise ValueError("buckets must be at least 1")
+    write_layout(shard_dir, buckets)
+    moved = 0
+    for directory in list(_bucket_dirs(shard_dir)):
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith('.db'):
+                continue
+            target = os.path.join(_bucket_dir(shard_dir, bucket_of(name, buckets)), name)
+            source = os.path.join(directory, name)
+            if source != target:
+                if os.path.exists(target):
+                    raise FileExistsError(f"{target} already exists; not overwriting it with {source}")
+                _move_shard(source, target)
+                moved += 1
+        if not os.listdir(directory):
+            os.rmdir(directory)
+    return moved
+
+
+def adopt(shard_dir, db_path, user_id):
+    """Copy an existing journal database in as user_id's shard"""
+    buckets = read_layout(shard_dir)
+    target = locate(shard_dir, buckets, user_id)
+    if os.path.exists(target):
+        raise FileExistsError(f"{user_id} already has a shard at {target}")
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # The backup API copies a consistent snapshot, WAL included
+    source = sqlite3.connect(db_path)
+    dest = sqlite3.connect(target)
+    try:
+        source.backup(dest)
+    finally:
+        dest.close()
+        source.close()
+    return target
+
+
+def status(shard_dir):
+    """Bucket count and number of shards per bucket directory"""
+    counts = {
+        os.path.basename(directory): sum(name.endswith('.db') for name in os.listdir(directory))
+        for directory in _bucket_dirs(shard_dir)
+    }
+    return read_layout(shard_dir, create=False), counts
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description="Manage per-user journal shards (stop the API first)")
+    parser.add_argument('--dir', default=SHARD_DIR, help="shard directory (default: JOURNAL_SHARD_DIR)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('status', help="show the bucket count and shards per bucket")
+    rebalance_parser = commands.add_parser('rebalance', help="move shards onto a new bucket count")
+    rebalance_parser.add_argument('--buckets', type=int, required=True)
+    adopt_parser = commands.add_parser('adopt', help="copy an existing journal database in as a user's shard")
+    adopt_parser.add_argument('db_path')
+    adopt_parser.add_argument('--user', required=True)
+    args = parser.parse_args()
+    if args.dir is None:
+        parser.error("pass --dir or set JOURNAL_SHARD_DIR")
+
+    if args.command == 'status':
+        buckets, counts = status(args.dir)
+        print(f"{buckets} buckets, {sum(counts.values())} shards")
+        for bucket, count in counts.items():
+            print(f"  {bucket}: {count}")
+    elif args.command == 'rebalance':
+        moved = rebalance(args.dir, args.buckets)
+        print(f"✅ Moved {moved} shards onto {args.buckets} buckets")
+    else:
+        print(f"✅ Adopted {args.db_path} as {args.user}'s shard: {adopt(args.dir, args.db_path, args.user)}")
@@ -0,0 +1,64 @@
+"""Shared test fixtures: throwaway journals and in-process requests to ASGI apps"""
+import asyncio
+import functools
+import os
+import sys
+
+# The tests import backend modules as top-level modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import httpx
+import pytest
+
+from db_pool import close_all
+from journal_logging import stop_logging
+
+
+@pytest.fixture
+def make_agent(tmp_path):
+    """Build JournalAgents on database files in tmp_path; every pool is closed afterwards"""
+    from journal_agent import JournalAgent
+
+    def make(name='journal.db', **kwargs):
+        return JournalAgent(str(tmp_path / name), **kwargs)
+
+    yield make
+    close_all()
+
+
+@pytest.fixture
+def agent(make_agent):
+    return make_agent()
+
+
+async def send(app, method, path, **kwargs):
+    """One request to an ASGI app, without a server"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.request(method, path, **kwargs)
+
+
+@pytest.fixture
+def call_app():
+    """call_app(app, method, path, **httpx_kwargs) runs one request and returns the response
+
+    The queued log writer an app may start is stopped afterwards.
+    """
+    yield lambda app, method, path, **kwargs: asyncio.run(send(app, method, path, **kwargs))
+    stop_logging()
+
+
+@pytest.fixture
+def api_server(tmp_path, monkeypatch):
+    """The API module; its own journal, if it creates one now, stays out of the repo's database"""
+    monkeypatch.setenv('JOURNAL_DB_PATH', str(tmp_path / 'unused.db'))
+    import api_server
+    yield api_server
+    stop_logging()
+
+
+@pytest.fixture
+def api(api_server, agent, call_app, monkeypatch):
+    """api(method, path, **httpx_kwargs) against the API serving the agent fixture's journal"""
+    monkeypatch.setattr(api_server, 'journal_agent', agent)
+    return functools.partial(call_app, api_server.app)
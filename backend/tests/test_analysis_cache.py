@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from llm_providers import LLMProvider
+
+
+def cache_stats(agent):
+    with agent.pool.reader() as conn:
+        return agent.analysis_cache.stats(conn)
+
+
+def test_resubmitted_text_skips_analysis(agent, monkeypatch):
+    first = agent.process_journal_entry("Test entry for server check")['data']
+
+    monkeypatch.setattr(agent, '_analyze_entry', lambda *args: pytest.fail("analyzed again"))
+    # Same text after normalization: extra whitespace is not a new entry
+    second = agent.process_journal_entry("  Test entry\tfor server   check ")['data']
+
+    assert second['id'] != first['id']
+    assert (second['summary'], second['emotions'], second['reflection']) == \
+        (first['summary'], first['emotions'], first['reflection'])
+    stats = cache_stats(agent)
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+    assert stats['bytes_saved'] > 0
+
+
+def test_style_is_part_of_the_key(agent):
+    agent.process_journal_entry("Feeling tired", style='gentle')
+    agent.process_journal_entry("Feeling tired", style='wise')
+    assert cache_stats(agent)['entries'] == 2
+
+
+def test_oldest_analyses_are_evicted_over_budget(agent):
+    agent.analysis_cache.max_bytes = 2000
+    for i in range(50):
+        agent.process_journal_entry(f"Entry number {i} about my day")
+    stats = cache_stats(agent)
+    assert stats['bytes'] <= 2000
+    assert stats['evictions'] > 0
+    # The newest analysis survived
+    with agent.pool.reader() as conn:
+        key = agent.analysis_cache.key("Entry number 49 about my day", "motivational")
+        assert agent.analysis_cache.lookup(conn, key, "") is not None
+
+
+def test_mock_analyses_are_not_cached_for_a_provider(make_agent):
+    class Provider(LLMProvider):
+        def __init__(self):
+            self.calls = 0
+
+        async def complete(self, prompt, max_tokens=200):
+            self.calls += 1
+            return "calm" if 'emotions' in prompt else "From the provider."
+
+    agent = make_agent(provider=Provider())
+    # The sync path only has the mock, which must not answer later provider requests
+    agent.process_journal_entry("A quiet evening at home")
+    assert cache_stats(agent)['entries'] == 0
+    result = asyncio.run(agent.process_journal_entry_async("A quiet evening at home"))
+    assert agent.provider.calls == 3
+    assert result['data']['summary'] == "From the provider."
+    assert cache_stats(agent)['entries'] == 1
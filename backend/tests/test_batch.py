@@ -0,0 +1,44 @@
+import pytest
+
+
+@pytest.fixture
+def post(api):
+    return lambda body: api('POST', "/api/journal/process/batch", json=body)
+
+
+def test_results_keep_the_order_of_the_batch(post, agent):
+    texts = [f"Day {n}: felt calm and grateful" if n % 2 else f"Day {n}: so tired" for n in range(20)]
+    body = post({'entries': texts}).json()
+
+    assert body['processed'] == 20 and body['failed'] == 0
+    assert [result['data']['original_entry'] for result in body['results']] == texts
+    ids = [result['data']['id'] for result in body['results']]
+    assert ids == sorted(ids)
+    with agent.pool.reader() as conn:
+        stored = conn.execute('SELECT id, original_entry FROM entries ORDER BY id').fetchall()
+    assert stored == list(zip(ids, texts))
+
+
+def test_invalid_entries_only_fail_themselves(post, agent):
+    texts = ["Went for a run, felt happy", "", "Long day at work", "   ", "Slept well"]
+    body = post({'entries': texts}).json()
+
+    assert body['success'] and body['processed'] == 3 and body['failed'] == 2
+    assert [result['success'] for result in body['results']] == [True, False, True, False, True]
+    assert body['results'][1]['error'] == body['results'][3]['error'] == "Entry text is empty"
+    assert [result['data']['original_entry'] for result in body['results'] if result['success']] == \
+        [texts[0], texts[2], texts[4]]
+    with agent.pool.reader() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0] == 3
+
+
+def test_rejected_batches_store_nothing(post, agent, api_server):
+    too_large = post({'entries': ['x'] * (api_server.MAX_BATCH_SIZE + 1)})
+    bad_style = post({'entries': ['Fine day'], 'style': 'no-such-style'})
+    not_a_list = post({'entries': 'Fine day'})
+
+    assert too_large.status_code == 413
+    assert bad_style.status_code == 400
+    assert not_a_list.status_code == 422
+    with agent.pool.reader() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0] == 0
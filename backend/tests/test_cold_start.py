@@ -0,0 +1,143 @@
+import importlib.util
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(BACKEND_DIR, 'api'))
+sys.path.append(os.path.join(BACKEND_DIR, 'benchmarks'))
+
+import pytest
+
+from bench_cold_start import FUNCTIONS, FUNCTIONS_DIR, measure
+from db_pool import close_all
+from serverless import HTTPError, JsonFunction, str_field
+
+# Importing FastAPI alone used to take ~0.4s; a lazy function answers in ~20ms.
+# Wall-clock time depends on the machine, so the budget is only checked on request.
+COLD_START_BUDGET_MS = os.getenv('JOURNAL_COLD_START_BUDGET_MS')
+
+
+@pytest.mark.parametrize('name', list(FUNCTIONS))
+def test_function_cold_start_within_budget(name):
+    with tempfile.TemporaryDirectory() as workdir:
+        result = measure(name, runs=3, workdir=workdir)
+
+    assert result['status'] == 200 and result['success'] is True
+    assert result['heavy_modules'] == []
+    # Nothing touches .env or the database until the first request
+    assert result['loaded_at_import'] == []
+    if COLD_START_BUDGET_MS:
+        assert result['total_ms'] < float(COLD_START_BUDGET_MS)
+
+
+def load_function(name):
+    spec = importlib.util.spec_from_file_location(f'fn_{name}', os.path.join(FUNCTIONS_DIR, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+@pytest.fixture
+def call(call_app):
+    """call(app, method='POST', **httpx_kwargs): one request to a function's app"""
+    return lambda app, method='POST', **kwargs: call_app(app, method, "/api/fn", **kwargs)
+
+
+def test_functions_share_the_journal_database(tmp_path, monkeypatch, call):
+    monkeypatch.setenv('JOURNAL_DB_PATH', str(tmp_path / 'journal.db'))
+    monkeypatch.setenv('TMPDIR', str(tmp_path / 'elsewhere'))
+    try:
+        saved = call(load_function('process'), json={'entry_text': "Felt calm after a long walk."})
+        listed = call(load_function('entries'), method='GET', params={'limit': 5})
+        analytics = call(load_function('analytics'), method='GET')
+    finally:
+        close_all()
+    assert saved.json()['success'] is True
+    assert [entry['original_entry'] for entry in listed.json()['entries']] == ["Felt calm after a long walk."]
+    assert analytics.json()['analytics']['total_entries'] == 1
+
+
+def test_functions_default_to_the_writable_temp_dir(tmp_path, monkeypatch, call):
+    # The deployed code directory is read-only on Vercel
+    monkeypatch.delenv('JOURNAL_DB_PATH', raising=False)
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    try:
+        saved = call(load_function('process'), json={'entry_text': "Quiet morning."})
+        listed = call(load_function('entries'), method='GET')
+    finally:
+        close_all()
+    assert saved.json()['success'] is True
+    assert (tmp_path / 'journal.db').exists()
+    assert [entry['original_entry'] for entry in listed.json()['entries']] == ["Quiet morning."]
+
+
+def make_function(setup_calls, fail_first=False):
+    def setup():
+        setup_calls.append(1)
+        if fail_first and len(setup_calls) == 1:
+            raise RuntimeError("database unavailable")
+        return {'greeting': 'hello'}
+
+    def handler(state, query, body):
+        if body.get('name') == 'teapot':
+            raise HTTPError(418, "I'm a teapot")
+        return {'message': f"{state['greeting']} {str_field(body, 'name')}", 'query': query}
+
+    return JsonFunction('POST', handler, setup)
+
+
+def test_json_function_builds_state_once(call):
+    setup_calls = []
+    app = make_function(setup_calls)
+    assert setup_calls == []
+
+    first = call(app, json={'name': 'ada'}, params={'a': '1'})
+    second = call(app, json={'name': 'bob'})
+
+    assert first.status_code == 200
+    assert first.json() == {'message': 'hello ada', 'query': {'a': '1'}}
+    assert second.json()['message'] == 'hello bob'
+    assert setup_calls == [1]
+
+
+def test_json_function_retries_failed_setup(call):
+    setup_calls = []
+    app = make_function(setup_calls, fail_first=True)
+
+    failed = call(app, json={'name': 'ada'})
+    recovered = call(app, json={'name': 'ada'})
+
+    assert failed.status_code == 500 and failed.json() == {'detail': "database unavailable"}
+    assert recovered.status_code == 200
+    assert len(setup_calls) == 2
+
+
+def test_json_function_errors_match_fastapi_shape(call):
+    app = make_function([])
+
+    assert call(app, method='GET').status_code == 405
+    invalid = call(app, content=b'{not json', headers={'content-type': 'application/json'})
+    assert invalid.status_code == 422
+    missing = call(app, json={'other': 1})
+    assert missing.status_code == 422 and 'name' in missing.json()['detail']
+    teapot = call(app, json={'name': 'teapot'})
+    assert teapot.status_code == 418 and teapot.json() == {'detail': "I'm a teapot"}
+
+
+def test_json_function_answers_cors_preflight(call):
+    app = make_function([])
+
+    preflight = call(app, method='OPTIONS', headers={
+        'Origin': 'https://journal.example',
+        'Access-Control-Request-Method': 'POST',
+        'Access-Control-Request-Headers': 'content-type',
+    })
+    response = call(app, json={'name': 'ada'}, headers={'Origin': 'https://journal.example'})
+
+    assert preflight.status_code == 200
+    assert preflight.headers['access-control-allow-origin'] == 'https://journal.example'
+    assert 'POST' in preflight.headers['access-control-allow-methods']
+    assert preflight.headers['access-control-allow-headers'] == 'content-type'
+    assert response.headers['access-control-allow-origin'] == 'https://journal.example'
+    assert response.headers['access-control-allow-credentials'] == 'true'
@@ -0,0 +1,73 @@
+import os
+from collections import Counter
+from datetime import date
+
+import pytest
+
+import corpus
+from journal_stats import load_goals
+
+END = date(2024, 6, 30)
+
+
+def test_generation_is_deterministic():
+    first = list(corpus.generate_entries(500, seed=7, end=END))
+    assert first == list(corpus.generate_entries(500, seed=7, end=END))
+    assert first != list(corpus.generate_entries(500, seed=8, end=END))
+
+
+def test_rows_are_ordered_and_end_on_the_end_date():
+    rows = list(corpus.generate_entries(2000, seed=1, end=END))
+    assert len(rows) == 2000
+    assert rows[-1][0] == END.isoformat()
+    created = [row[5] for row in rows]
+    assert created == sorted(created)
+    # Several entries on some days, none on others
+    days = [row[0] for row in rows]
+    assert len(set(days)) < len(days)
+    span = END.toordinal() - date.fromisoformat(days[0]).toordinal() + 1
+    assert len(set(days)) < span
+
+
+def test_built_corpus_is_fully_migrated(tmp_path, make_agent):
+    corpus.build_corpus(str(tmp_path / 'corpus.db'), 3000, seed=2, end=END)
+    agent = make_agent('corpus.db')
+    with agent.pool.reader() as conn:
+        assert conn.execute('SELECT SUM(count) FROM daily_entry_counts').fetchone()[0] == 3000
+        assert load_goals(conn, 'default', today=END)['total_entries'] == 3000
+        assert conn.execute(
+            "SELECT COUNT(*) FROM entries_fts WHERE entries_fts MATCH 'tired'"
+        ).fetchone()[0] > 0
+    assert len(agent.get_recent_entries(5)) == 5
+
+
+def test_snapshot_is_built_once_and_copied(tmp_path, monkeypatch):
+    monkeypatch.setattr(corpus, 'SNAPSHOT_DIR', str(tmp_path / 'snapshots'))
+    first = corpus.load_snapshot(str(tmp_path / 'a.db'), 1000, end=END)
+
+    def fail(*args):
+        raise AssertionError("snapshot was rebuilt")
+
+    monkeypatch.setattr(corpus, 'build_corpus', fail)
+    second = corpus.load_snapshot(str(tmp_path / 'b.db'), 1000, end=END)
+    with open(first, 'rb') as a, open(second, 'rb') as b:
+        assert a.read() == b.read()
+    assert os.listdir(tmp_path / 'snapshots') == [os.path.basename(corpus.snapshot_path(1000, end=END))]
+
+
+def test_build_refuses_to_overwrite(tmp_path):
+    path = tmp_path / 'journal.db'
+    path.write_bytes(b'')
+    with pytest.raises(FileExistsError):
+        corpus.build_corpus(str(path), 10)
+
+
+def test_large_corpora_stay_within_the_span():
+    rows = list(corpus.generate_entries(40_000, seed=4, end=END, years=2))
+    days = Counter(row[0] for row in rows)
+    assert len(rows) == 40_000
+    assert rows[-1][0] == END.isoformat()
+    assert END.toordinal() - date.fromisoformat(rows[0][0]).toordinal() < round(2 * 365.25)
+    # More entries per day instead, with skipped days kept
+    assert max(days.values()) > 4
+    assert len(days) < round(2 * 365.25)
@@ -0,0 +1,95 @@
+import sqlite3
+import threading
+
+import pytest
+
+from db_pool import close_all, get_pool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = get_pool(str(tmp_path / 'pool.db'))
+    with pool.writer() as conn:
+        conn.execute('CREATE TABLE items (value INTEGER)')
+    yield pool
+    close_all()
+
+
+def in_thread(call):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(call()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_connections_use_wal(pool):
+    with pool.reader() as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+
+def test_one_reader_per_thread(pool):
+    def reader():
+        with pool.reader() as conn:
+            return conn
+
+    main = reader()
+    assert reader() is main
+    other = in_thread(reader)
+    assert other is not main
+    assert len(pool._readers) == 2
+
+
+def test_one_shared_writer_in_an_immediate_transaction(pool):
+    def writer():
+        with pool.writer() as conn:
+            # BEGIN IMMEDIATE takes the write lock up front
+            assert conn.in_transaction
+            conn.execute('INSERT INTO items VALUES (1)')
+            return conn
+
+    assert writer() is in_thread(writer)
+    with pool.reader() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM items').fetchone()[0] == 2
+
+    # Another connection cannot start writing while the writer holds its transaction
+    other = sqlite3.connect(pool.db_path, timeout=0)
+    try:
+        with pool.writer():
+            with pytest.raises(sqlite3.OperationalError, match='locked'):
+                other.execute('BEGIN IMMEDIATE')
+    finally:
+        other.close()
+
+
+def test_failed_write_rolls_back(pool):
+    with pytest.raises(RuntimeError):
+        with pool.writer() as conn:
+            conn.execute('INSERT INTO items VALUES (1)')
+            raise RuntimeError("boom")
+    with pool.reader() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM items').fetchone()[0] == 0
+
+
+def test_nested_writer_joins_the_outer_transaction(pool):
+    with pytest.raises(RuntimeError):
+        with pool.writer() as outer:
+            with pool.writer() as inner:
+                assert inner is outer
+                inner.execute('INSERT INTO items VALUES (1)')
+            raise RuntimeError("boom")
+    with pool.reader() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM items').fetchone()[0] == 0
+
+
+def test_readers_see_committed_writes_while_a_write_is_open(pool):
+    def count():
+        with pool.reader() as conn:
+            return conn.execute('SELECT COUNT(*) FROM items').fetchone()[0]
+
+    with pool.writer() as conn:
+        conn.execute('INSERT INTO items VALUES (1)')
+    with pool.writer() as conn:
+        conn.execute('INSERT INTO items VALUES (2)')
+        # WAL: a reader on another thread is not blocked and sees the last commit
+        assert in_thread(count) == 1
@@ -0,0 +1,40 @@
+import pytest
+
+from emotion_lexicon import _tokens, get_matcher
+
+
+@pytest.mark.parametrize('text, tokens', [
+    ("I was so tired…", ['i', 'was', 'so', 'tired']),
+    ("“Happy” day", ['happy', 'day']),
+    ("stressed—really", ['stressed', 'really']),
+    ("Café au lait, très calme", ['café', 'au', 'lait', 'très', 'calme']),
+    ("snake_case and 2 dogs", ['snake', 'case', 'and', '2', 'dogs']),
+])
+def test_tokens_split_on_unicode_punctuation(text, tokens):
+    assert _tokens(text) == tokens
+
+
+@pytest.mark.parametrize('text, emotion', [
+    ("I was so tired…", 'tired'),
+    ("“Happy” day", 'happy'),
+    ("stressed—really", 'stressed'),
+    ("Feeling down… again", 'sad'),
+])
+def test_unicode_punctuation_does_not_hide_words(text, emotion):
+    assert emotion in get_matcher().match(text).emotions
+
+
+@pytest.mark.parametrize('text, word, emotion', [
+    ("Waiting for the download to finish", 'down', 'sad'),
+    ("Reviewed the business plan", 'busy', 'stressed'),
+])
+def test_terms_only_match_whole_words(text, word, emotion):
+    matcher = get_matcher()
+    assert matcher.match(text).emotions == ()
+    assert matcher.match(f"{text}, {word}").emotions == (emotion,)
+
+
+def test_phrases_match_with_either_apostrophe():
+    matcher = get_matcher()
+    assert matcher.match("I can't handle this").emotions == ('overwhelmed',)
+    assert matcher.match("I can’t handle this").emotions == ('overwhelmed',)
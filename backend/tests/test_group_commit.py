@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+from group_commit import GroupCommitWriter
+
+
+def entry(i):
+    return {
+        'date': '2024-01-01',
+        'original_entry': f'entry {i}',
+        'summary': f'summary {i}',
+        'emotions': 'happy',
+        'reflection': 'keep going',
+        # The writer stores scores as given; scoring happens before submit
+        'mood_score': 0.8,
+        'arousal': 0.6,
+    }
+
+
+@pytest.fixture
+def agent(make_agent):
+    agent = make_agent(write_mode='group')
+    yield agent
+    agent.close()
+
+
+def test_concurrent_saves_share_transactions(agent):
+    agent.group_writer.delay = 0.05
+    ids = []
+
+    def save(i):
+        ids.extend(agent.save_entries([entry(i)]))
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(ids) == list(range(1, 21))
+    assert agent.group_writer.groups < 20
+    with agent.pool.reader() as conn:
+        assert conn.execute('SELECT total_entries FROM journal_stats').fetchone()[0] == 20
+
+
+def test_close_flushes_queued_writes(agent):
+    agent.group_writer.delay = 10
+    futures = [agent.group_writer.submit([entry(i)]) for i in range(5)]
+    agent.close()
+    assert [f.result(timeout=0) for f in futures] == [[1], [2], [3], [4], [5]]
+    with pytest.raises(RuntimeError):
+        agent.group_writer.submit([entry(6)]).result()
+
+
+def test_a_failing_request_only_fails_itself():
+    def commit(entries, cache_keys):
+        if any(e is None for e in entries):
+            raise ValueError("bad entry")
+        return list(range(len(entries)))
+
+    writer = GroupCommitWriter(commit, delay_ms=50)
+    good = writer.submit([1, 2])
+    bad = writer.submit([None])
+    also_good = writer.submit([3])
+    writer.close()
+    assert good.result() == [0, 1]
+    assert also_good.result() == [0]
+    with pytest.raises(ValueError):
+        bad.result()
@@ -0,0 +1,154 @@
+import asyncio
+import io
+import json
+import threading
+
+import pytest
+
+from journal_io import import_entries, iter_export
+from llm_providers import LLMProvider
+
+TRICKY_TEXT = 'Said "no", then laughed,\nand wrote a second line. Ünïcödé too.'
+
+
+@pytest.fixture
+def agent(make_agent):
+    agent = make_agent()
+    agent.save_entries([
+        {
+            'date': f'2024-01-{day:02d}',
+            'original_entry': TRICKY_TEXT if day == 3 else f'entry {day}',
+            'summary': f'summary {day}',
+            'emotions': 'happy, tired',
+            'reflection': 'keep going',
+        }
+        for day in range(1, 8)
+    ])
+    return agent
+
+
+@pytest.fixture
+def target(make_agent):
+    return make_agent('target.db')
+
+
+def exported_rows(agent):
+    return [
+        {k: v for k, v in entry.items() if k != 'id'}
+        for entry in reversed(agent.get_recent_entries(100))
+    ]
+
+
+@pytest.mark.parametrize('fmt', ['ndjson', 'csv'])
+def test_round_trip_preserves_entries(agent, target, fmt):
+    text = ''.join(iter_export(agent.pool, fmt, chunk_size=2))
+    report = import_entries(target, io.StringIO(text, newline=''), fmt, chunk_size=3)
+    assert report == {'imported': 7, 'failed': 0, 'errors': []}
+    assert exported_rows(target) == exported_rows(agent)
+    with target.pool.reader() as conn:
+        assert conn.execute('SELECT total_entries FROM journal_stats').fetchone()[0] == 7
+
+
+def test_export_date_range(agent):
+    lines = ''.join(iter_export(agent.pool, 'ndjson', date_from='2024-01-03', date_to='2024-01-05')).splitlines()
+    assert [json.loads(line)['date'] for line in lines] == ['2024-01-03', '2024-01-04', '2024-01-05']
+
+
+def test_import_reports_bad_lines_and_reanalyzes(target):
+    lines = [
+        json.dumps({'original_entry': 'Stressed about the exam', 'date': '2024-02-01'}),
+        '{not json',
+        json.dumps({'date': '2024-02-02'}),
+        json.dumps({'original_entry': 'x', 'date': 'yesterday'}),
+    ]
+    report = import_entries(target, io.StringIO('\n'.join(lines)), 'ndjson')
+    assert report['imported'] == 1
+    assert [error['line'] for error in report['errors']] == [2, 3, 4]
+    entry = target.get_recent_entries(1)[0]
+    assert entry['date'] == '2024-02-01'
+    assert 'stressed' in entry['emotions']
+
+
+def test_import_normalizes_iso_dates(target):
+    lines = [
+        json.dumps({'original_entry': 'a', 'date': '20240101'}),
+        json.dumps({'original_entry': 'b', 'date': '2024-W01-2'}),
+        json.dumps({'original_entry': 'c', 'created_at': '2024-01-03 08:00:00'}),
+    ]
+    assert import_entries(target, io.StringIO('\n'.join(lines)), 'ndjson')['imported'] == 3
+    assert sorted(entry['date'] for entry in target.get_recent_entries(3)) == ['2024-01-01', '2024-01-02', '2024-01-03']
+    with target.pool.reader() as conn:
+        assert [row[0] for row in conn.execute('SELECT date FROM daily_entry_counts ORDER BY date')] == \
+            ['2024-01-01', '2024-01-02', '2024-01-03']
+
+
+def test_import_normalizes_created_at_to_utc(target):
+    lines = [
+        json.dumps({'original_entry': 'iso', 'created_at': '2024-01-02T10:00:00Z'}),
+        json.dumps({'original_entry': 'offset', 'created_at': '2024-01-02T13:00:00+02:00'}),
+        json.dumps({'original_entry': 'epoch', 'created_at': 1704189600}),
+        json.dumps({'original_entry': 'garbage', 'created_at': 'garbage'}),
+    ]
+    report = import_entries(target, io.StringIO('\n'.join(lines)), 'ndjson')
+    assert report['imported'] == 3
+    assert [error['line'] for error in report['errors']] == [4]
+    with target.pool.reader() as conn:
+        rows = conn.execute(
+            'SELECT original_entry, created_at, typeof(created_at), date FROM entries ORDER BY id'
+        ).fetchall()
+    assert rows == [
+        ('iso', '2024-01-02 10:00:00', 'text', '2024-01-02'),
+        ('offset', '2024-01-02 11:00:00', 'text', '2024-01-02'),
+        ('epoch', '2024-01-02 10:00:00', 'text', '2024-01-02'),
+    ]
+
+
+def test_imported_created_at_keeps_keyset_paging_in_order(target):
+    target.save_entries([{'date': '2024-01-02', 'original_entry': 'saved', 'summary': 's', 'emotions': 'calm',
+                          'reflection': 'r', 'created_at': '2024-01-02 10:30:00'}])
+    lines = [
+        json.dumps({'original_entry': 'earlier', 'created_at': '2024-01-02T10:00:00Z'}),
+        json.dumps({'original_entry': 'later', 'created_at': 1704193200}),  # 11:00 UTC
+    ]
+    import_entries(target, io.StringIO('\n'.join(lines)), 'ndjson')
+    first = target.get_entries_page(1)
+    second = target.get_entries_page(1, before=first['next_cursor'])
+    third = target.get_entries_page(1, before=second['next_cursor'])
+    assert [page['entries'][0]['original_entry'] for page in (first, second, third)] == ['later', 'saved', 'earlier']
+
+
+def test_reanalyzed_imports_do_not_cache_mock_analyses_for_a_provider(make_agent):
+    class Provider(LLMProvider):
+        def __init__(self):
+            self.calls = 0
+
+        async def complete(self, prompt, max_tokens=200):
+            self.calls += 1
+            return "calm" if 'emotions' in prompt else "From the provider."
+
+    agent = make_agent('provider.db', provider=Provider())
+    record = {'original_entry': 'Walked by the river', 'date': '2024-01-01',
+              'summary': 's', 'emotions': 'calm', 'reflection': 'r'}
+    assert import_entries(agent, io.StringIO(json.dumps(record)), 'ndjson', reanalyze=True)['imported'] == 1
+
+    result = asyncio.run(agent.process_journal_entry_async('Walked by the river'))
+    assert agent.provider.calls == 3
+    assert result['data']['summary'] == "From the provider."
+
+
+def test_api_import_only_writes_on_the_db_pool(target, api_server, call_app, monkeypatch):
+    monkeypatch.setattr(api_server, 'journal_agent', target)
+    threads = {}
+
+    def on_thread(stage, func):
+        def call(*args):
+            threads.setdefault(stage, set()).add(threading.current_thread().name.split('_')[0])
+            return func(*args)
+        return call
+
+    monkeypatch.setattr(target, 'analyze_for_import', on_thread('analyze', target.analyze_for_import))
+    monkeypatch.setattr(target, 'save_entries', on_thread('save', target.save_entries))
+    body = '\n'.join(json.dumps({'original_entry': f'entry {n}', 'date': '2024-01-01'}) for n in range(5))
+    response = call_app(api_server.app, 'POST', "/api/journal/import", content=body.encode())
+    assert response.json()['imported'] == 5
+    assert threads == {'analyze': {'journal-import'}, 'save': {'journal-db'}}
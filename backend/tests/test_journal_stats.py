@@ -0,0 +1,88 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+import journal_stats
+
+
+def entry(day):
+    return {'date': day, 'original_entry': 'x', 'summary': '', 'emotions': 'calm', 'reflection': ''}
+
+
+def save(agent, *days):
+    agent.save_entries([entry(day) for day in days])
+
+
+def stats(agent):
+    with agent.pool.reader() as conn:
+        return conn.execute(
+            'SELECT total_entries, last_entry_date, current_streak, longest_streak FROM journal_stats'
+        ).fetchone()
+
+
+def goals(agent, today):
+    with agent.pool.reader() as conn:
+        return journal_stats.load_goals(conn, 'default', today=date.fromisoformat(today))
+
+
+def test_consecutive_days_extend_the_streak(agent):
+    for day in ('2024-03-01', '2024-03-02', '2024-03-03'):
+        save(agent, day)
+    assert stats(agent) == (3, '2024-03-03', 3, 3)
+    assert goals(agent, '2024-03-03')['streak'] == 3
+
+
+def test_a_gap_breaks_the_streak(agent):
+    save(agent, '2024-03-01', '2024-03-02', '2024-03-03')
+    save(agent, '2024-03-05')
+    assert stats(agent) == (4, '2024-03-05', 1, 3)
+    save(agent, '2024-03-06')
+    assert stats(agent)[2:] == (2, 3)
+    # A streak whose last day is not today no longer counts
+    assert goals(agent, '2024-03-06')['streak'] == 2
+    assert goals(agent, '2024-03-08')['streak'] == 0
+    assert goals(agent, '2024-03-08')['longest_streak'] == 3
+
+
+def test_several_entries_on_one_day_count_once_for_the_streak(agent):
+    save(agent, '2024-03-01', '2024-03-01')
+    save(agent, '2024-03-01')
+    save(agent, '2024-03-02', '2024-03-02')
+    assert stats(agent) == (5, '2024-03-02', 2, 2)
+    assert goals(agent, '2024-03-02')['week_entries'] == 5
+
+
+def test_backdated_entries_fill_gaps(agent):
+    save(agent, '2024-03-01', '2024-03-02', '2024-03-04', '2024-03-05')
+    assert stats(agent) == (4, '2024-03-05', 2, 2)
+    # Filling the gap joins both runs; the last entry date does not move back
+    save(agent, '2024-03-03')
+    assert stats(agent) == (5, '2024-03-05', 5, 5)
+    # A backdated entry outside any run changes neither streak
+    save(agent, '2024-02-20')
+    assert stats(agent) == (6, '2024-03-05', 5, 5)
+
+
+def test_week_counts_roll_over_on_monday(agent):
+    # 2024-03-10 is a Sunday, 2024-03-11 a Monday
+    save(agent, '2024-03-09', '2024-03-10', '2024-03-10', '2024-03-11')
+    assert goals(agent, '2024-03-10')['week_entries'] == 3
+    assert goals(agent, '2024-03-11')['week_entries'] == 1
+    assert goals(agent, '2024-03-17')['week_entries'] == 1
+    assert goals(agent, '2024-03-18')['week_entries'] == 0
+    # The streak runs across the week boundary
+    assert stats(agent)[2] == 3
+
+
+def test_incremental_stats_match_a_rebuild(agent):
+    rng = random.Random(5)
+    days = [(date(2024, 1, 1) + timedelta(days=rng.randrange(60))).isoformat() for _ in range(200)]
+    for i in range(0, len(days), 7):
+        save(agent, *days[i:i + 7])
+    incremental = stats(agent)
+    with agent.pool.writer() as conn:
+        weeks = sorted(conn.execute('SELECT * FROM weekly_entry_counts').fetchall())
+        journal_stats.rebuild(conn)
+        assert sorted(conn.execute('SELECT * FROM weekly_entry_counts').fetchall()) == weeks
+    assert stats(agent) == incremental
@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+import pytest
+
+import journal_agent
+from llm_providers import LLMProvider
+from reflections import get_reflection_bank
+
+
+class SlowProvider(LLMProvider):
+    """Answers after a delay; reflection prompts never answer"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.prompts = []
+
+    async def complete(self, prompt, max_tokens=200):
+        self.prompts.append(prompt)
+        if 'reflection' in prompt:
+            await asyncio.sleep(60)
+        await asyncio.sleep(self.delay)
+        return "Calm, PROUD, bored" if 'emotions' in prompt else "A short summary."
+
+
+@pytest.fixture
+def agent(make_agent, monkeypatch):
+    monkeypatch.setattr(journal_agent, 'LLM_TIMEOUT', 0.3)
+    return make_agent(seed=1, provider=SlowProvider(0.1))
+
+
+def test_calls_run_concurrently_and_timeouts_fall_back_to_mock(agent):
+    start = time.perf_counter()
+    result = asyncio.run(agent.process_journal_entry_async("Feeling tired after work", style='gentle'))
+    elapsed = time.perf_counter() - start
+
+    assert len(agent.provider.prompts) == 3
+    assert elapsed < 0.5  # one timeout, not the sum of three calls
+    data = result['data']
+    assert data['summary'] == "A short summary."
+    assert data['emotions'] == "calm, proud"
+    assert data['reflection'] in get_reflection_bank().styles['gentle']['work']
+    assert data['id'] == 1
+
+
+def test_mock_agent_builds_no_prompts(make_agent, monkeypatch):
+    agent = make_agent()
+    monkeypatch.setattr(agent, '_build_prompts', lambda *args: pytest.fail("prompt built"))
+    assert asyncio.run(agent.process_journal_entry_async("A calm day"))['success']
@@ -0,0 +1,94 @@
+import io
+import json
+import logging
+import queue
+
+import pytest
+from fastapi import FastAPI
+
+import journal_logging
+from executors import run_db
+
+
+@pytest.fixture
+def output():
+    """Fresh queued logging writing JSON into a buffer"""
+    journal_logging.stop_logging()
+    stream = io.StringIO()
+    journal_logging.setup_logging(stream=stream, level='DEBUG', fmt='json')
+    yield stream
+    journal_logging.stop_logging()
+
+
+def records(stream):
+    journal_logging.stop_logging()  # flushes the queue
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(journal_logging.RequestContextMiddleware)
+    log = logging.getLogger('journal.test')
+
+    @app.get("/work")
+    async def work():
+        log.info("in handler")
+        worker_id = await run_db(journal_logging.current_request_id)
+        log.warning("after pool", extra={'worker_id': worker_id})
+        return {"worker_id": worker_id}
+
+    return app
+
+
+def test_json_records_carry_extras_and_request_id(output, call_app):
+    response = call_app(make_app(), 'GET', "/work", headers={'X-Request-ID': 'abc123'})
+
+    assert response.headers['x-request-id'] == 'abc123'
+    # The id is visible inside the database pool's worker thread
+    assert response.json() == {'worker_id': 'abc123'}
+    logged = records(output)
+    assert [r['msg'] for r in logged] == ["in handler", "after pool", "request"]
+    assert all(r['request_id'] == 'abc123' and r['route'] == '/work' for r in logged)
+    assert logged[1]['worker_id'] == 'abc123'
+    assert logged[2]['logger'] == 'journal.access'
+    assert logged[2]['status'] == 200 and logged[2]['method'] == 'GET'
+
+
+def test_request_id_generated_when_missing(output, call_app):
+    response = call_app(make_app(), 'GET', "/work")
+
+    request_id = response.headers['x-request-id']
+    assert len(request_id) == 16
+    assert {r['request_id'] for r in records(output)} == {request_id}
+
+
+def test_sampling_and_route_levels_keep_warnings(output, call_app, monkeypatch):
+    monkeypatch.setattr(journal_logging, 'ROUTE_SAMPLE_RATES', {'/work': 0.0})
+    call_app(make_app(), 'GET', "/work")
+    assert [r['msg'] for r in records(output)] == ["after pool"]
+
+    stream = io.StringIO()
+    journal_logging.setup_logging(stream=stream, level='DEBUG')
+    monkeypatch.setattr(journal_logging, 'ROUTE_SAMPLE_RATES', {})
+    monkeypatch.setattr(journal_logging, 'ROUTE_LEVELS', {'/work': logging.WARNING})
+    call_app(make_app(), 'GET', "/work")
+    assert [r['msg'] for r in records(stream)] == ["after pool"]
+
+
+def test_entry_text_redacted_by_default(monkeypatch):
+    assert journal_logging.redact("dear diary, secrets") == "[redacted 19 chars]"
+    monkeypatch.setattr(journal_logging, 'LOG_ENTRY_TEXT', True)
+    assert journal_logging.redact("x" * 80) == "x" * journal_logging.ENTRY_TEXT_CHARS
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = journal_logging._QueueHandler(queue.Queue(2))
+    logger = logging.Logger('journal.full')
+    logger.addHandler(handler)
+
+    for i in range(5):
+        logger.error("record %d", i)
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+    assert handler.queue.get_nowait().msg == "record 0"
@@ -0,0 +1,85 @@
+import sqlite3
+
+import pytest
+from fastapi import FastAPI
+
+import metrics
+
+
+def observations(histogram, *label_values):
+    series = histogram._series.get(label_values)
+    return sum(series.counts) if series else 0
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(metrics, 'ENABLED', True)
+
+
+def test_render_uses_prometheus_text_format():
+    counter = metrics.Counter('test_render_total', "Things", ['kind'])
+    counter.inc('a "quoted"\nvalue')
+    counter.inc('a "quoted"\nvalue', amount=2)
+    histogram = metrics.Histogram('test_render_seconds', "Durations", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value)
+
+    text = metrics.render()
+    assert '# TYPE test_render_total counter' in text
+    assert 'test_render_total{kind="a \\"quoted\\"\\nvalue"} 3' in text
+    assert 'test_render_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_render_seconds_bucket{le="1.0"} 2' in text
+    assert 'test_render_seconds_bucket{le="+Inf"} 3' in text
+    assert 'test_render_seconds_count 3' in text
+    assert 'test_render_seconds_sum 5.55' in text
+
+
+def test_statement_labels_are_low_cardinality():
+    assert metrics.statement_label('SELECT * FROM entries WHERE id = ?') == 'select entries'
+    assert metrics.statement_label('\n  INSERT INTO daily_entry_counts (date) VALUES (?)') == 'insert daily_entry_counts'
+    assert metrics.statement_label('UPDATE journal_stats SET total_entries = 1') == 'update journal_stats'
+    assert metrics.statement_label('COMMIT') == 'commit'
+    assert metrics.statement_label('CREATE TRIGGER t AFTER UPDATE OF a ON entries BEGIN SELECT 1; END') == 'create'
+
+
+def test_processing_records_stages_and_sql(enabled, make_agent):
+    agent = make_agent()
+    saves = observations(metrics.STAGE_SECONDS, 'save')
+    inserts = observations(metrics.SQL_SECONDS, 'insert entries')
+    commits = observations(metrics.SQL_SECONDS, 'commit')
+
+    agent.process_journal_entry("Tired after work but grateful.")
+    agent.process_journal_entry("Tired after work but grateful.")
+
+    assert observations(metrics.STAGE_SECONDS, 'save') == saves + 2
+    assert observations(metrics.SQL_SECONDS, 'insert entries') == inserts + 2
+    assert observations(metrics.SQL_SECONDS, 'commit') >= commits + 2
+    assert observations(metrics.STAGE_SECONDS, 'cache_lookup') >= 2
+
+
+def test_disabled_metrics_install_nothing(make_agent, monkeypatch):
+    monkeypatch.setattr(metrics, 'ENABLED', False)
+    assert metrics.stage('save') is metrics.stage('analyze')
+    with make_agent().pool.reader() as conn:
+        assert type(conn) is sqlite3.Connection
+
+
+def test_middleware_labels_requests_by_route_template(call_app):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    def requests(route, status):
+        return metrics.REQUESTS._values.get(('GET', route, status), 0)
+
+    before = requests('/items/{item_id}', '200'), requests('unmatched', '404')
+
+    for item_id in (1, 2, 3):
+        assert call_app(app, 'GET', f"/items/{item_id}").status_code == 200
+    assert call_app(app, 'GET', "/missing").status_code == 404
+    assert requests('/items/{item_id}', '200') == before[0] + 3
+    assert requests('unmatched', '404') == before[1] + 1
@@ -0,0 +1,74 @@
+import sqlite3
+
+import pytest
+
+from db_pool import close_all, get_pool
+from migrations import SCHEMA_VERSION, current_version, migrate
+
+
+def query_plan(conn, sql, params=()):
+    return ' | '.join(row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params))
+
+
+def traced_statements(agent, call):
+    """Run call() and return the SELECT statements it issued on the reader connection"""
+    statements = []
+    with agent.pool.reader() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            conn.set_trace_callback(None)
+    return [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+
+
+def test_fresh_database_is_at_latest_version(agent):
+    with agent.pool.reader() as conn:
+        assert current_version(conn) == SCHEMA_VERSION
+
+
+def test_migrate_is_a_no_op_when_current(agent):
+    assert migrate(agent.pool) == []
+
+
+def test_legacy_database_is_upgraded_and_backfilled(tmp_path):
+    db_path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            original_entry TEXT NOT NULL,
+            summary TEXT,
+            emotions TEXT,
+            reflection TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute("INSERT INTO entries (date, original_entry, emotions) VALUES ('2024-01-01', 'x', 'happy, tired')")
+    conn.commit()
+    conn.close()
+
+    applied = migrate(get_pool(db_path))
+    assert len(applied) == SCHEMA_VERSION
+    with get_pool(db_path).reader() as conn:
+        assert current_version(conn) == SCHEMA_VERSION
+        assert conn.execute('SELECT SUM(count) FROM daily_emotion_counts').fetchone()[0] == 2
+        assert conn.execute('SELECT total_entries FROM journal_stats').fetchone()[0] == 1
+    close_all()
+
+
+def test_recent_entries_walk_the_created_at_index(agent):
+    statements = traced_statements(agent, lambda: agent.get_recent_entries(10))
+    assert statements
+    with agent.pool.reader() as conn:
+        for sql in statements:
+            plan = query_plan(conn, sql)
+            assert 'idx_entries_created_at' in plan, plan
+            assert 'TEMP B-TREE' not in plan, plan
+
+
+def test_date_filters_use_the_date_index(agent):
+    with agent.pool.reader() as conn:
+        plan = query_plan(conn, 'SELECT COUNT(*) FROM entries WHERE date >= ?', ('2024-01-01',))
+    assert plan.startswith('SEARCH entries USING COVERING INDEX idx_entries_date'), plan
@@ -0,0 +1,101 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from journal_stats import load_goals
+import mood_scores
+from mood_scores import score_texts
+from rollups import load_range
+
+TEXTS = [
+    "I felt happy and calm after the walk, and grateful for the quiet.",
+    "So stressed and anxious about the deadline, and exhausted.",
+    "Bought groceries and cleaned the kitchen.",
+    "Happy, proud, thankful and relaxed, but a little tired.",
+]
+
+
+def entry(text, day='2024-03-06'):
+    return {'date': day, 'original_entry': text, 'summary': text, 'emotions': 'calm', 'reflection': 'ok'}
+
+
+def test_scores_follow_the_lexicon():
+    positive, negative, neutral, mixed = score_texts(TEXTS)
+    assert positive[0] > 0.5 and negative[0] < -0.5
+    assert negative[1] > positive[1]  # stress and anxiety are higher arousal than calm
+    assert neutral == (None, None)
+    # All five emotions count, not just the three kept in the emotions column
+    assert mixed == (pytest.approx((0.8 + 0.7 + 0.8 + 0.6 - 0.4) / 5, abs=1e-4),
+                     pytest.approx((0.6 + 0.55 + 0.35 + 0.1 + 0.1) / 5, abs=1e-4))
+
+
+def test_saved_entries_are_scored(agent):
+    ids = agent.save_entries([entry(text) for text in TEXTS])
+    with agent.pool.reader() as conn:
+        rows = conn.execute(
+            f'SELECT mood_score, arousal FROM entries WHERE id IN ({",".join("?" * len(ids))}) ORDER BY id', ids
+        ).fetchall()
+    assert rows == score_texts(TEXTS)
+
+
+def test_analysis_scores_the_entry_before_the_write(agent, monkeypatch):
+    entry_data, cache_key = agent._analyze_cached(TEXTS[0])
+    assert (entry_data['mood_score'], entry_data['arousal']) == score_texts(TEXTS[:1])[0]
+
+    def no_scoring(texts):
+        raise AssertionError("scored again while saving")
+
+    monkeypatch.setattr(mood_scores, 'score_texts', no_scoring)
+    entry_id = agent.save_entries([entry_data], [cache_key])[0]
+    with agent.pool.reader() as conn:
+        row = conn.execute('SELECT mood_score, arousal FROM entries WHERE id = ?', (entry_id,)).fetchone()
+    assert row == (entry_data['mood_score'], entry_data['arousal'])
+
+
+def test_legacy_rows_are_backfilled(tmp_path, make_agent):
+    db_path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, original_entry TEXT NOT NULL,
+            summary TEXT, emotions TEXT, reflection TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.executemany("INSERT INTO entries (date, original_entry) VALUES ('2024-01-01', ?)", [(t,) for t in TEXTS])
+    conn.commit()
+    conn.close()
+
+    # Opening the journal runs the migrations
+    with make_agent('legacy.db').pool.reader() as conn:
+        assert conn.execute('SELECT mood_score, arousal FROM entries ORDER BY id').fetchall() == score_texts(TEXTS)
+        # ...and so are the mood sums in the rollups
+        scored = [mood for mood, _ in score_texts(TEXTS) if mood is not None]
+        for table in ('daily_entry_counts', 'weekly_entry_counts', 'monthly_entry_counts'):
+            count, mood_sum, mood_n = conn.execute(f'SELECT count, mood_sum, mood_n FROM {table}').fetchone()
+            assert (count, mood_n) == (len(TEXTS), len(scored))
+            assert mood_sum == pytest.approx(sum(scored))
+
+
+def test_analytics_and_goals_average_the_scores(agent):
+    agent.save_entries([entry(TEXTS[0], '2024-03-04'), entry(TEXTS[1], '2024-03-05'), entry(TEXTS[2], '2024-03-12')])
+    (mood_a, arousal_a), (mood_b, arousal_b), _ = score_texts(TEXTS[:3])
+    statements = []
+    with agent.pool.reader() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            result = load_range(conn, date(2024, 3, 1), date(2024, 3, 31), 'week')
+            goals = load_goals(conn, 'default', today=date(2024, 3, 10))
+        finally:
+            conn.set_trace_callback(None)
+
+    # Averages come from the rollups' mood sums, not from the entries table
+    assert statements and not [sql for sql in statements if 'FROM entries' in sql]
+
+    assert result['average_mood'] == round((mood_a + mood_b) / 2, 3)
+    assert result['average_arousal'] == round((arousal_a + arousal_b) / 2, 3)
+    weeks = {period['period']: period['average_mood'] for period in result['periods']}
+    # The week of the 12th only has an unscored entry
+    assert weeks == {'2024-W09': None, '2024-W10': round((mood_a + mood_b) / 2, 3),
+                     '2024-W11': None, '2024-W12': None, '2024-W13': None}
+    assert goals['week_mood'] == round((mood_a + mood_b) / 2, 3)
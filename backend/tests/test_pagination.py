@@ -0,0 +1,64 @@
+import pytest
+
+
+
+@pytest.fixture
+def agent(make_agent):
+    agent = make_agent()
+    # Same created_at for every row, so ordering relies on the id tie-breaker
+    agent.save_entries([
+        {
+            'date': '2024-01-01',
+            'original_entry': f'entry {i} ' * 50,
+            'summary': f'summary {i}',
+            'emotions': 'happy',
+            'reflection': 'keep going',
+        }
+        for i in range(25)
+    ])
+    return agent
+
+
+def test_before_cursor_walks_all_entries_once(agent):
+    seen = []
+    page = agent.get_entries_page(10)
+    while True:
+        seen.extend(entry['id'] for entry in page['entries'])
+        if not page['next_cursor']:
+            break
+        page = agent.get_entries_page(10, before=page['next_cursor'])
+    assert seen == list(range(25, 0, -1))
+
+
+def test_after_cursor_returns_the_newer_page(agent):
+    first = agent.get_entries_page(10)
+    second = agent.get_entries_page(10, before=first['next_cursor'])
+    back = agent.get_entries_page(10, after=second['prev_cursor'])
+    assert [e['id'] for e in back['entries']] == [e['id'] for e in first['entries']]
+    assert back['prev_cursor'] is None
+
+
+def test_fields_projection_keeps_key_columns(agent):
+    page = agent.get_entries_page(5, fields='summary,emotions')
+    assert set(page['entries'][0]) == {'id', 'created_at', 'summary', 'emotions'}
+
+
+def test_invalid_fields_and_cursors_are_rejected(agent):
+    with pytest.raises(ValueError):
+        agent.get_entries_page(5, fields='password')
+    with pytest.raises(ValueError):
+        agent.get_entries_page(5, before='not-a-cursor')
+
+
+def test_keyset_pages_seek_the_index(agent):
+    cursor = agent.get_entries_page(10)['next_cursor']
+    statements = []
+    with agent.pool.reader() as conn:
+        conn.set_trace_callback(statements.append)
+        agent.get_entries_page(10, before=cursor)
+        agent.get_entries_page(10, after=cursor)
+        conn.set_trace_callback(None)
+        for sql in statements:
+            plan = ' | '.join(row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql))
+            assert 'SEARCH entries USING INDEX idx_entries_created_at' in plan, plan
+            assert 'TEMP B-TREE' not in plan, plan
@@ -0,0 +1,32 @@
+import pytest
+
+from emotion_lexicon import get_matcher
+from reflections import get_reflection_bank
+
+
+@pytest.mark.parametrize('text, category', [
+    ("I'm worried and overwhelmed by everything", 'stressed'),
+    ("Spent the whole day on my project", 'work'),
+    ("So exhausted, going to bed early", 'tired'),
+    ("Lovely walk in the park", 'happy'),
+])
+def test_category_comes_from_the_emotion_match(text, category):
+    assert get_reflection_bank().category_for(get_matcher().match(text)) == category
+
+
+def test_seeded_agents_give_the_same_reflections(make_agent):
+    # Separate databases, so the second run is not served from the analysis cache
+    texts = ["Long day at work", "Feeling tired", "Great dinner with friends"] * 3
+    first = make_agent('first.db', seed=42).process_journal_entries(texts, style='wise')
+    second = make_agent('second.db', seed=42).process_journal_entries(texts, style='wise')
+    reflections = [r['data']['reflection'] for r in first]
+    assert reflections == [r['data']['reflection'] for r in second]
+    assert set(reflections) <= {
+        text for texts in get_reflection_bank().styles['wise'].values() for text in texts
+    }
+
+
+def test_unknown_style_fails_the_entry(agent):
+    result = agent.process_journal_entry("Hello", style='sarcastic')
+    assert not result['success']
+    assert 'sarcastic' in result['error']
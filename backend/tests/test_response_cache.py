@@ -0,0 +1,66 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from response_cache import ResponseCache
+
+
+def test_concurrent_misses_run_the_query_once():
+    cache = ResponseCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 42}
+
+    async def main():
+        return await asyncio.gather(*[cache.get_or_compute("k", compute) for _ in range(10)])
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(r == {"value": 42} for r in results)
+    assert cache.stats()["coalesced"] == 9
+
+
+def test_lru_eviction_respects_entry_and_byte_caps():
+    cache = ResponseCache(max_entries=2, max_bytes=10_000)
+
+    async def fill():
+        for key in ("a", "b", "a", "c"):
+            await cache.get_or_compute(key, lambda: asyncio.sleep(0, result=key))
+
+    asyncio.run(fill())
+    assert list(cache._entries) == ["a", "c"]  # "b" was least recently used
+    assert cache.stats()["evictions"] == 1
+
+
+def test_errors_are_not_cached():
+    cache = ResponseCache()
+
+    async def boom():
+        raise ValueError("bad cursor")
+
+    async def main():
+        with pytest.raises(ValueError):
+            await cache.get_or_compute("k", boom)
+        return await cache.get_or_compute("k", lambda: asyncio.sleep(0, result="ok"))
+
+    assert asyncio.run(main()) == "ok"
+
+
+def test_data_version_moves_on_commits_from_other_connections(make_agent):
+    agent = make_agent(seed=0)
+    before = agent.data_version
+    assert agent.data_version == before
+    agent.process_journal_entry("A calm walk by the river")
+    after_save = agent.data_version
+    assert after_save != before
+
+    # Another process (a second worker, the import CLI) writing to the same file
+    other = sqlite3.connect(agent.db_path)
+    other.execute("UPDATE entries SET summary = 'edited'")
+    other.commit()
+    other.close()
+    assert agent.data_version != after_save
@@ -0,0 +1,151 @@
+import random
+from collections import Counter
+from datetime import date, timedelta
+
+import pytest
+
+import rollups
+
+EMOTIONS = ['happy', 'calm', 'tired', 'anxious', 'grateful']
+START = date(2023, 12, 20)
+
+
+@pytest.fixture
+def agent(make_agent):
+    rng = random.Random(7)
+    entries = []
+    for n in range(600):
+        day = START + timedelta(days=rng.randrange(420))
+        emotions = rng.sample(EMOTIONS, rng.randint(0, 3))
+        entries.append({
+            'date': day.isoformat(), 'original_entry': f'entry {n}: {" and ".join(emotions)}', 'summary': '',
+            'emotions': ', '.join(emotions), 'reflection': '',
+        })
+    agent = make_agent()
+    # Several batches, so the period rows are updated incrementally
+    for i in range(0, len(entries), 50):
+        agent.save_entries(entries[i:i + 50])
+    agent.entries = entries
+    return agent
+
+
+def rows(conn, table):
+    # Mood sums are floats added up in a different order by a rebuild
+    return sorted(
+        tuple(round(value, 9) if isinstance(value, float) else value for value in row)
+        for row in conn.execute(f'SELECT * FROM {table}')
+    )
+
+
+def brute_force(entries, date_from, date_to):
+    inside = [e for e in entries if date_from.isoformat() <= e['date'] <= date_to.isoformat()]
+    emotions = Counter(e for entry in inside for e in rollups.parse_emotions(entry['emotions']))
+    return len(inside), emotions
+
+
+def average_moods(agent, date_from, date_to):
+    # Straight off the entries table; the rollups round to 3 places
+    with agent.pool.reader() as conn:
+        averages = conn.execute(
+            'SELECT AVG(mood_score), AVG(arousal) FROM entries WHERE date BETWEEN ? AND ?',
+            (str(date_from), str(date_to))
+        ).fetchone()
+    return [pytest.approx(value, abs=6e-4) if value is not None else None for value in averages]
+
+
+def test_saving_entries_updates_the_daily_rollups(make_agent):
+    # Not the seeded agent fixture: this one starts empty
+    agent = make_agent()
+    agent.save_entries([
+        {'date': '2024-03-05', 'original_entry': 'a', 'summary': '', 'emotions': 'Happy, tired', 'reflection': ''},
+        {'date': '2024-03-05', 'original_entry': 'b', 'summary': '', 'emotions': ' happy ,calm', 'reflection': ''},
+    ])
+    agent.save_entry({'date': '2024-03-06', 'original_entry': 'c', 'summary': '', 'emotions': '', 'reflection': ''})
+    agent.save_entry({'date': '2024-03-05', 'original_entry': 'd', 'summary': '', 'emotions': 'calm', 'reflection': ''})
+    with agent.pool.reader() as conn:
+        assert [row[:2] for row in rows(conn, 'daily_entry_counts')] == [('2024-03-05', 3), ('2024-03-06', 1)]
+        assert rows(conn, 'daily_emotion_counts') == [
+            ('2024-03-05', 'calm', 2), ('2024-03-05', 'happy', 2), ('2024-03-05', 'tired', 1),
+        ]
+        assert rows(conn, 'monthly_emotion_counts') == [
+            ('2024-03', 'calm', 2), ('2024-03', 'happy', 2), ('2024-03', 'tired', 1),
+        ]
+        assert [row[:2] for row in rows(conn, 'monthly_entry_counts')] == [('2024-03', 4)]
+
+
+def test_incremental_daily_rollups_match_a_rebuild(agent):
+    tables = ['daily_entry_counts', 'daily_emotion_counts']
+    with agent.pool.writer() as conn:
+        incremental = {table: rows(conn, table) for table in tables}
+        assert rollups.backfill(conn) == len(agent.entries)
+        rollups.backfill_moods(conn)
+        assert {table: rows(conn, table) for table in tables} == incremental
+
+
+def test_incremental_period_rollups_match_a_rebuild(agent):
+    tables = ['weekly_emotion_counts', 'weekly_entry_counts', 'monthly_emotion_counts', 'monthly_entry_counts']
+    with agent.pool.writer() as conn:
+        incremental = {table: rows(conn, table) for table in tables}
+        rollups.backfill_periods(conn)
+        rollups.backfill_moods(conn)
+        assert {table: rows(conn, table) for table in tables} == incremental
+    assert len(incremental['monthly_entry_counts']) == 15
+
+
+@pytest.mark.parametrize('granularity', rollups.GRANULARITIES)
+@pytest.mark.parametrize('window', [
+    (date(2024, 1, 1), date(2024, 12, 31)),
+    (date(2024, 2, 14), date(2024, 5, 3)),
+    (date(2023, 12, 29), date(2024, 1, 2)),  # ISO week 2024-W01 starts on New Year's Day
+    (date(2024, 3, 5), date(2024, 3, 5)),
+])
+def test_load_range_matches_a_brute_force_count(agent, window, granularity):
+    date_from, date_to = window
+    with agent.pool.reader() as conn:
+        result = rollups.load_range(conn, date_from, date_to, granularity, top=len(EMOTIONS))
+
+    total, emotions = brute_force(agent.entries, date_from, date_to)
+    assert result['total_entries'] == total
+    assert result['top_emotions'] == dict(emotions)
+    assert [result['average_mood'], result['average_arousal']] == average_moods(agent, date_from, date_to)
+    assert result['periods'][0]['start'] == date_from.isoformat()
+    assert result['periods'][-1]['end'] == date_to.isoformat()
+    assert len(result['periods']) == rollups.count_periods(date_from, date_to, granularity)
+    for period in result['periods']:
+        total, emotions = brute_force(
+            agent.entries, date.fromisoformat(period['start']), date.fromisoformat(period['end'])
+        )
+        assert (period['total_entries'], period['top_emotions']) == (total, dict(emotions))
+        assert [period['average_mood'], period['average_arousal']] == \
+            average_moods(agent, period['start'], period['end'])
+
+
+def test_a_year_reads_only_monthly_rows(agent):
+    statements = []
+    with agent.pool.reader() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            result = rollups.load_range(conn, date(2024, 1, 1), date(2024, 12, 31), 'month')
+        finally:
+            conn.set_trace_callback(None)
+    assert len(result['periods']) == 12
+    assert result['average_mood'] is not None
+    assert len(statements) == 2 and all('monthly_' in sql for sql in statements), statements
+
+
+def test_analytics_endpoint_takes_a_window(agent, api):
+    year, backwards, too_many_days, bad_granularity = [
+        api('GET', "/api/journal/analytics", params=params)
+        for params in (
+            {'from': '2024-01-01', 'to': '2024-12-31', 'granularity': 'month'},
+            {'from': '2024-02-01', 'to': '2024-01-01'},
+            {'from': '2000-01-01', 'to': '2024-12-31'},
+            {'granularity': 'year'},
+        )
+    ]
+    analytics = year.json()['analytics']
+    assert analytics['granularity'] == 'month' and len(analytics['periods']) == 12
+    assert analytics['total_entries'] == brute_force(agent.entries, date(2024, 1, 1), date(2024, 12, 31))[0]
+    assert backwards.status_code == 400
+    assert too_many_days.status_code == 400
+    assert bad_granularity.status_code == 422
@@ -0,0 +1,41 @@
+import pytest
+
+from search import search_entries
+
+
+@pytest.fixture
+def agent(make_agent):
+    agent = make_agent()
+    agent.save_entries([
+        {'date': '2024-01-01', 'original_entry': 'Went running in the park', 'summary': 'run',
+         'emotions': 'happy', 'reflection': ''},
+        {'date': '2024-02-01', 'original_entry': "Exam stress, can't sleep", 'summary': 'exam',
+         'emotions': 'stressed', 'reflection': ''},
+    ])
+    return agent
+
+
+def search(agent, query, **kwargs):
+    with agent.pool.reader() as conn:
+        return [row['id'] for row in search_entries(conn, query, **kwargs)]
+
+
+def test_triggers_keep_the_index_in_sync(agent):
+    assert search(agent, 'runs') == [1]  # porter stemming
+    with agent.pool.writer() as conn:
+        conn.execute("UPDATE entries SET original_entry = 'Walked by the river' WHERE id = 1")
+    assert search(agent, 'park') == []
+    assert search(agent, 'river') == [1]
+    with agent.pool.writer() as conn:
+        conn.execute('DELETE FROM entries WHERE id = 1')
+    assert search(agent, 'river') == []
+
+
+def test_user_input_is_not_parsed_as_fts_syntax(agent):
+    assert search(agent, "can't") == [2]
+    assert search(agent, 'exam AND') == []
+
+
+def test_date_filters(agent):
+    assert search(agent, 'exam', date_from='2024-01-15') == [2]
+    assert search(agent, 'exam', date_to='2024-01-15') == []
@@ -0,0 +1,169 @@
+import os
+
+import pytest
+
+import shards
+from db_pool import close_all
+from shards import ShardRouter
+
+
+@pytest.fixture
+def shard_dir(tmp_path):
+    yield str(tmp_path / 'shards')
+    close_all()
+
+
+def entry(text):
+    return {'date': '2024-01-15', 'original_entry': text, 'summary': text, 'emotions': 'calm', 'reflection': 'ok'}
+
+
+def texts(agent):
+    return [row['original_entry'] for row in agent.get_recent_entries(10)]
+
+
+def test_each_user_gets_a_hashed_shard_in_its_bucket(shard_dir):
+    router = ShardRouter(shard_dir, max_open=4)
+    with router.journal('alice') as agent:
+        agent.save_entry(entry("alice's day"))
+    with router.journal('bob/../../etc') as agent:
+        agent.save_entry(entry("bob's day"))
+
+    with router.journal('alice') as agent:
+        assert texts(agent) == ["alice's day"]
+    with router.journal('bob/../../etc') as agent:
+        assert texts(agent) == ["bob's day"]
+    name = shards.shard_name('bob/../../etc')
+    assert router.path_for('bob/../../etc') == os.path.join(
+        router.shard_dir, f'{shards.bucket_of(name, router.buckets):03d}', name
+    )
+    assert router.stats()['opens'] == 2
+    router.close()
+
+
+def test_lru_closes_evicted_shards_once_released(shard_dir):
+    router = ShardRouter(shard_dir, max_open=2)
+    held = router.acquire('alice')
+    for user in ('bob', 'carol'):
+        with router.journal(user) as agent:
+            agent.save_entry(entry(user))
+
+    # alice was evicted while leased: still usable, and reacquiring brings her back
+    stats = router.stats()
+    assert stats['open'] == 2 and stats['evictions'] == 1
+    held.save_entry(entry("still writing"))
+    assert router.acquire('alice') is held
+    assert router.release(held) is None
+    assert router.release(held) is None
+
+    # bob was evicted idle, so his shard was closed; reopening finds his data
+    with router.journal('bob') as agent:
+        assert texts(agent) == ['bob']
+    assert router.stats()['opens'] == 4
+    router.close()
+
+
+def test_rebalance_moves_shards_and_router_finds_them(shard_dir, monkeypatch):
+    monkeypatch.setattr(shards, 'DEFAULT_BUCKETS', 4)
+    router = ShardRouter(shard_dir)
+    users = [f'user-{n}' for n in range(12)]
+    for user in users:
+        with router.journal(user) as agent:
+            agent.save_entry(entry(user))
+    router.close()
+
+    moved = shards.rebalance(shard_dir, 7)
+
+    buckets, counts = shards.status(shard_dir)
+    assert buckets == 7 and sum(counts.values()) == 12 and moved > 0
+    router = ShardRouter(shard_dir)
+    for user in users:
+        name = shards.shard_name(user)
+        assert router.path_for(user).endswith(os.path.join(f'{shards.bucket_of(name, 7):03d}', name))
+        with router.journal(user) as agent:
+            assert texts(agent) == [user]
+    router.close()
+
+
+def test_router_finds_shards_an_interrupted_rebalance_left_behind(shard_dir, monkeypatch):
+    monkeypatch.setattr(shards, 'DEFAULT_BUCKETS', 4)
+    router = ShardRouter(shard_dir)
+    with router.journal('alice') as agent:
+        agent.save_entry(entry("before"))
+    router.close()
+    old_path = router.path_for('alice')
+
+    shards.write_layout(shard_dir, 1000)  # new count recorded, nothing moved yet
+
+    router = ShardRouter(shard_dir)
+    assert router.path_for('alice') == old_path
+    with router.journal('alice') as agent:
+        assert texts(agent) == ["before"]
+    router.close()
+
+
+def test_adopt_copies_an_existing_journal(shard_dir, agent):
+    legacy = agent
+    legacy.save_entry(entry("from the single-file days"))
+
+    shards.adopt(shard_dir, legacy.db_path, 'default')
+
+    router = ShardRouter(shard_dir)
+    with router.journal('default') as agent:
+        assert texts(agent) == ["from the single-file days"]
+    with pytest.raises(FileExistsError):
+        shards.adopt(shard_dir, legacy.db_path, 'default')
+    router.close()
+
+
+def test_api_routes_requests_by_user_id(shard_dir, api_server, call_app, monkeypatch):
+    router = ShardRouter(shard_dir)
+    monkeypatch.setattr(api_server, 'shard_router', router)
+    monkeypatch.setattr(api_server, 'TRUST_USER_HEADER', True)
+
+    def request(method, path, user, **kwargs):
+        return call_app(api_server.app, method, path, headers={'X-User-Id': user}, **kwargs)
+
+    for user in ('alice', 'bob'):
+        response = request('POST', "/api/journal/process/stream", user, json={'entry_text': f"{user} felt calm"})
+        assert 'event: saved' in response.text
+    alice, bob, carol = [
+        request('GET', "/api/journal/entries", user).json()['entries'] for user in ('alice', 'bob', 'carol')
+    ]
+    assert [e['original_entry'] for e in alice] == ["alice felt calm"]
+    assert [e['original_entry'] for e in bob] == ["bob felt calm"]
+    assert carol == []
+    # Streamed responses held their shard until the body was done
+    assert all(count == 0 for count in router._leases.values())
+    router.close()
+
+
+def test_user_header_is_only_trusted_from_the_proxy(shard_dir, api_server, call_app, monkeypatch):
+    router = ShardRouter(shard_dir)
+    monkeypatch.setattr(api_server, 'shard_router', router)
+    entries = lambda headers: call_app(api_server.app, 'GET', "/api/journal/entries", headers=headers).status_code
+
+    # Sharding without a trusted proxy serves nobody
+    assert entries({'X-User-Id': 'alice'}) == 401
+    monkeypatch.setattr(api_server, 'TRUST_USER_HEADER', True)
+    assert entries({'X-User-Id': 'alice'}) == 200
+    # No header is no user, not a shared 'default' journal
+    assert entries({}) == 401
+
+    monkeypatch.setattr(api_server, 'PROXY_SECRET', 's3cret')
+    assert entries({'X-User-Id': 'alice'}) == 401
+    assert entries({'X-User-Id': 'alice', 'X-Proxy-Secret': 'guess'}) == 401
+    assert entries({'X-User-Id': 'alice', 'X-Proxy-Secret': 's3cret'}) == 200
+    assert router.stats()['open'] == 1
+    router.close()
+
+
+def test_single_journal_goals_are_shared(agent, api, api_server, monkeypatch):
+    monkeypatch.setattr(api_server, 'shard_router', None)
+
+    saved = api('PUT', "/api/journal/goals/targets", headers={'X-User-Id': 'mallory'}, json={'weekly_entries': 2})
+    goals = api('GET', "/api/journal/goals", headers={'X-User-Id': 'alice'}).json()
+    assert saved.status_code == 200
+    # One journal, so one set of targets whatever X-User-Id says
+    assert goals['goals']['weekly_entries']['target'] == 2
+    with agent.pool.reader() as conn:
+        assert conn.execute('SELECT user_id FROM goal_targets').fetchall() == [('default',)]
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+import pytest
+
+from llm_providers import LLMProvider
+
+
+class StaggeredProvider(LLMProvider):
+    """Emotions answer fastest, reflections slowest"""
+
+    async def complete(self, prompt, max_tokens=200):
+        if 'emotions' in prompt:
+            return "happy"
+        if 'Summarize' in prompt:
+            await asyncio.sleep(0.05)
+            return "A summary."
+        await asyncio.sleep(0.1)
+        return "A reflection."
+
+
+def collect(agent, text, style=None):
+    async def run():
+        return [event async for event in agent.stream_journal_entry(text, style)]
+    return asyncio.run(run())
+
+
+def test_mock_stream_sends_emotions_first_then_the_saved_entry(agent):
+    events = collect(agent, "Happy and grateful today")
+    assert [name for name, _ in events] == ['emotions', 'summary', 'reflection', 'saved']
+    saved = events[-1][1]
+    assert saved['id'] == 1
+    assert agent.get_recent_entries(1)[0]['reflection'] == events[2][1]['reflection']
+
+
+def test_provider_stages_stream_as_they_finish(make_agent):
+    agent = make_agent(provider=StaggeredProvider())
+    events = collect(agent, "Went for a run")
+    assert [name for name, _ in events] == ['emotions', 'summary', 'reflection', 'saved']
+    assert events[-1][1]['summary'] == "A summary."
+
+
+def test_unknown_style_ends_with_an_error_event(agent):
+    events = collect(agent, "Hello", style='sarcastic')
+    assert events[-1][0] == 'error'
+    assert agent.get_recent_entries(5) == []
+
+
+class FailingProvider(LLMProvider):
+    async def complete(self, prompt, max_tokens=200):
+        raise RuntimeError("provider down")
+
+
+def record_threads(agent, monkeypatch, *names):
+    threads = set()
+    for name in names:
+        def call(*args, _func=getattr(agent, name)):
+            threads.add(threading.current_thread().name.split('_')[0])
+            return _func(*args)
+        monkeypatch.setattr(agent, name, call)
+    return threads
+
+
+def test_mock_stages_run_on_the_analysis_pool(agent, monkeypatch):
+    threads = record_threads(
+        agent, monkeypatch, '_mock_detect_emotions', '_mock_summarize', '_mock_generate_reflection'
+    )
+    assert collect(agent, "Tired but proud")[-1][0] == 'saved'
+    assert threads == {'journal-analysis'}
+
+
+def test_provider_fallback_runs_on_the_analysis_pool(make_agent, monkeypatch):
+    agent = make_agent(provider=FailingProvider())
+    threads = record_threads(agent, monkeypatch, '_analyze_entry')
+    events = collect(agent, "Tired but proud")
+    assert [name for name, _ in events] == ['emotions', 'summary', 'reflection', 'saved']
+    assert threads == {'journal-analysis'}
@@ -0,0 +1,128 @@
+import sqlite3
+import time
+from collections import Counter
+from datetime import date
+
+import pytest
+
+pytest.importorskip('numpy')
+
+import corpus
+import trends
+from rollups import parse_emotions
+
+END = date(2024, 6, 30)
+
+
+@pytest.fixture
+def agent(tmp_path, make_agent):
+    corpus.build_corpus(str(tmp_path / 'corpus.db'), 3000, seed=3, end=END)
+    return make_agent('corpus.db')
+
+
+def entry_rows(agent, date_from='', date_to='9999'):
+    with agent.pool.reader() as conn:
+        return conn.execute(
+            'SELECT date, created_at, emotions, mood_score FROM entries WHERE date BETWEEN ? AND ? ORDER BY id',
+            (date_from, date_to)
+        ).fetchall()
+
+
+def mean(values):
+    # Unrounded, so compare with approx(): the engine rounds to 3 places
+    values = [v for v in values if v is not None]
+    return pytest.approx(sum(values) / len(values), abs=1e-3) if values else None
+
+
+def test_statistics_match_a_row_by_row_count(agent):
+    engine = trends.TrendEngine()
+    with agent.pool.reader() as conn:
+        assert engine.refresh(conn) == 3000
+    result = engine.analyze(date(2024, 1, 1), END, window=3)
+
+    rows = entry_rows(agent, '2024-01-01', END.isoformat())
+    emotion_sets = [set(parse_emotions(emotions)) for _, _, emotions, _ in rows]
+    assert result['total_entries'] == len(rows)
+    assert result['emotions'] == dict(Counter(e for s in emotion_sets for e in s))
+    names = result['co_occurrence']['emotions']
+    for i, a in enumerate(names):
+        for j, b in enumerate(names):
+            assert result['co_occurrence']['matrix'][i][j] == sum(a in s and b in s for s in emotion_sets)
+
+    weekdays = {}
+    for day, _, _, mood in rows:
+        weekdays.setdefault(date.fromisoformat(day).weekday(), []).append(mood)
+    assert result['day_of_week']['entries'] == [len(weekdays.get(d, [])) for d in range(7)]
+    assert result['day_of_week']['mood'] == [mean(weekdays.get(d, [])) for d in range(7)]
+    hours = Counter(int(created[11:13]) for _, created, _, _ in rows)
+    assert result['time_of_day']['entries'] == [hours[h] for h in range(24)]
+
+    trend = result['mood_trend']
+    days = {}
+    for day, _, _, mood in rows:
+        days.setdefault(day, []).append(mood)
+    assert trend['start'] == min(days)
+    start = date.fromisoformat(trend['start']).toordinal()
+    for i, (count, mood, average) in enumerate(zip(trend['entries'], trend['mood'], trend['moving_average'])):
+        day = date.fromordinal(start + i).isoformat()
+        assert count == len(days.get(day, []))
+        assert mood == mean(days.get(day, []))
+        recent = [m for d in range(start + i - 2, start + i + 1) for m in days.get(date.fromordinal(d).isoformat(), [])]
+        assert average == mean(recent)
+
+
+def test_refresh_only_reads_new_entries(agent):
+    engine = trends.TrendEngine()
+    with agent.pool.reader() as conn:
+        engine.refresh(conn)
+    agent.save_entry({
+        'date': END.isoformat(), 'original_entry': 'x', 'summary': 'x',
+        'emotions': 'hopeful, calm', 'reflection': 'x',
+    })
+    with agent.pool.reader() as conn:
+        assert engine.refresh(conn) == 1
+        fresh = trends.TrendEngine()
+        fresh.refresh(conn)
+    assert engine.analyze() == fresh.analyze()
+    assert engine.analyze()['emotions']['hopeful'] == 1
+
+
+def test_a_million_entries_analyze_in_well_under_a_second():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''
+        CREATE TABLE entries (
+            id INTEGER PRIMARY KEY, date TEXT, emotions TEXT, created_at TEXT, mood_score REAL, arousal REAL
+        )
+    ''')
+    conn.execute('''
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 1000000)
+        INSERT INTO entries (id, date, emotions, created_at, mood_score, arousal)
+        SELECT i, date('2015-01-01', '+' || (i / 300) || ' days'),
+               CASE i % 5 WHEN 0 THEN 'happy, calm' WHEN 1 THEN 'sad' WHEN 2 THEN 'tired, stressed, anxious'
+                          WHEN 3 THEN 'grateful' ELSE '' END,
+               datetime('2015-01-01', '+' || (i * 37 % 86400) || ' seconds'),
+               CASE WHEN i % 5 = 4 THEN NULL ELSE (i % 7) / 3.0 - 1 END, (i % 11) / 10.0
+        FROM n
+    ''')
+    engine = trends.TrendEngine()
+    assert engine.refresh(conn) == 1000000
+
+    start = time.perf_counter()
+    result = engine.analyze()
+    elapsed = time.perf_counter() - start
+    assert result['total_entries'] == 1000000
+    assert result['co_occurrence']['matrix'][0][0] == result['emotions'][result['co_occurrence']['emotions'][0]]
+    assert elapsed < 0.5, f"analyze took {elapsed:.3f}s"
+
+
+def test_trends_endpoint(agent, api, api_server, monkeypatch):
+    get = lambda params: api('GET', "/api/journal/trends", params=params)
+    ok = get({'from': '2024-01-01', 'window': 14})
+    backwards = get({'from': '2024-02-01', 'to': '2024-01-01'})
+    monkeypatch.setattr(api_server, 'trends', None)
+    missing_numpy = get({})
+    body = ok.json()['trends']
+    assert body['from'] == '2024-01-01' and body['mood_trend']['window_days'] == 14
+    assert body['total_entries'] == len(entry_rows(agent, '2024-01-01'))
+    assert backwards.status_code == 400
+    assert missing_numpy.status_code == 503
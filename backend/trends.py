@@ -0,0 +1,178 @@
+"""
+Vectorized mood trends and emotion patterns (needs numpy)
+
+TrendEngine holds a journal as compact columns, one value per entry: its day
+number, the hour it was written, its mood_score and arousal (NaN when
+unscored) and the id of its emotions string.
+Even a large journal uses only a few thousand distinct emotion strings, so
+each is parsed once into a row of a small 0/1 matrix (combinations x
+emotions). Every statistic is then a bincount over the entry columns
+followed by a product with that matrix, so there is no per-entry Python
+work and counts stay exact. Entries are never edited or deleted, so
+refresh() only reads the ones added since its last call.
+"""
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+
+from rollups import parse_emotions
+
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+EPOCH = date(1970, 1, 1)
+
+
+def day_number(day):
+    """Days since 1970-01-01"""
+    return (day - EPOCH).days
+
+
+def _means(sums, counts):
+    # Rounded averages as a list, None where there is nothing to average
+    means = np.round(np.divide(sums, counts, out=np.zeros(len(counts)), where=counts > 0), 3)
+    return [mean if count else None for mean, count in zip(means.tolist(), counts.tolist())]
+
+
+def _trailing_sums(values, window):
+    # Sum of each value and the window - 1 before it
+    cumulative = np.concatenate(([0], np.cumsum(values)))
+    end = np.arange(1, len(values) + 1)
+    return cumulative[end] - cumulative[np.maximum(end - window, 0)]
+
+
+class TrendEngine:
+    """A journal's entries as NumPy columns, loaded incrementally"""
+
+    def __init__(self):
+        self.last_id = 0
+        self.days = np.empty(0, np.int32)
+        self.hours = np.empty(0, np.int8)
+        self.combos = np.empty(0, np.int32)
+        self.moods = np.empty(0, np.float64)
+        self.arousal = np.empty(0, np.float64)
+        self.emotions = []           # emotion id -> name
+        self._emotion_ids = {}
+        self._combo_ids = {}         # stored emotions string -> combination id
+        self._combo_emotions = []    # combination id -> its emotion ids
+        self._lock = threading.Lock()
+
+    def refresh(self, conn, chunk_size=100_000):
+        """Load entries added since the last refresh; returns how many were added"""
+        with self._lock:
+            cursor = conn.execute('''
+                SELECT id, CAST(strftime('%s', date) AS INTEGER) / 86400,
+                       COALESCE(CAST(strftime('%H', created_at) AS INTEGER), 0), emotions,
+                       mood_score, arousal
+                FROM entries
+                WHERE id > ? AND strftime('%s', date) IS NOT NULL
+                ORDER BY id
+            ''', (self.last_id,))
+            added = 0
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return added
+                ids, days, hours, emotions, moods, arousal = zip(*rows)
+                for emotions_str in set(emotions).difference(self._combo_ids):
+                    self._add_combo(emotions_str)
+                self.days = np.concatenate((self.days, np.array(days, np.int32)))
+                self.hours = np.concatenate((self.hours, np.array(hours, np.int8)))
+                combos = np.fromiter(map(self._combo_ids.__getitem__, emotions), np.int32, len(rows))
+                self.combos = np.concatenate((self.combos, combos))
+                self.moods = np.concatenate((self.moods, np.array(moods, np.float64)))
+                self.arousal = np.concatenate((self.arousal, np.array(arousal, np.float64)))
+                self.last_id = ids[-1]
+                added += len(rows)
+
+    def _add_combo(self, emotions_str):
+        ids = []
+        for emotion in dict.fromkeys(parse_emotions(emotions_str)):
+            if emotion not in self._emotion_ids:
+                self._emotion_ids[emotion] = len(self.emotions)
+                self.emotions.append(emotion)
+            ids.append(self._emotion_ids[emotion])
+        self._combo_ids[emotions_str] = len(self._combo_emotions)
+        self._combo_emotions.append(ids)
+
+    def _columns(self):
+        # Snapshot of the columns and the combination matrix; refresh()
+        # replaces the arrays rather than growing them in place
+        with self._lock:
+            matrix = np.zeros((len(self._combo_emotions), len(self.emotions)), np.int64)
+            for combo, ids in enumerate(self._combo_emotions):
+                matrix[combo, ids] = 1
+            return self.days, self.hours, self.combos, self.moods, self.arousal, matrix, list(self.emotions)
+
+    def analyze(self, date_from=None, date_to=None, window=7):
+        """Mood trend, co-occurrence, day-of-week and time-of-day patterns
+
+        Covers entries dated in [date_from, date_to] (either may be None).
+        mood_score and arousal are averaged over the scored entries per
+        bucket, and mood also over a trailing window of `window` calendar
+        days; hours are those of created_at, which is UTC for entries saved
+        through the API.
+        """
+        days, hours, combos, moods, arousal, matrix, emotions = self._columns()
+        if date_from is not None or date_to is not None:
+            keep = np.ones(len(days), bool)
+            if date_from is not None:
+                keep &= days >= day_number(date_from)
+            if date_to is not None:
+                keep &= days <= day_number(date_to)
+            days, hours, combos = days[keep], hours[keep], combos[keep]
+            moods, arousal = moods[keep], arousal[keep]
+        scored = ~np.isnan(moods)
+        moods = np.where(scored, moods, 0.0)
+        arousal = np.where(scored, arousal, 0.0)
+
+        combo_count = len(matrix)
+        per_combo = np.bincount(combos, minlength=combo_count)
+        emotion_counts = per_combo @ matrix
+        # Most frequent first; emotions absent from the window are left out
+        order = [e for e in np.lexsort((np.array(emotions), -emotion_counts)).tolist() if emotion_counts[e]]
+        names = [emotions[e] for e in order]
+
+        def by_bucket(buckets, size):
+            counts = np.bincount(buckets * combo_count + combos, minlength=size * combo_count)
+            counts = counts.reshape(size, combo_count)
+            by_emotion = (counts @ matrix)[:, order].T.tolist()
+            with_scores = np.bincount(buckets, weights=scored, minlength=size)
+            return {
+                'entries': counts.sum(axis=1).tolist(),
+                'mood': _means(np.bincount(buckets, weights=moods, minlength=size), with_scores),
+                'arousal': _means(np.bincount(buckets, weights=arousal, minlength=size), with_scores),
+                'emotions': dict(zip(names, by_emotion)),
+            }
+
+        result = {
+            'total_entries': len(days),
+            'emotions': dict(zip(names, emotion_counts[order].tolist())),
+            # One value per calendar day from start (the first entry's date)
+            'mood_trend': {
+                'window_days': window, 'start': None, 'entries': [], 'mood': [], 'arousal': [], 'moving_average': [],
+            },
+            'co_occurrence': {
+                'emotions': names,
+                'matrix': (matrix.T @ (matrix * per_combo[:, None]))[np.ix_(order, order)].tolist(),
+            },
+            'day_of_week': {'days': list(WEEKDAYS), **by_bucket((days + 3) % 7, 7)},  # 1970-01-01 was a Thursday
+            'time_of_day': {'hours': list(range(24)), **by_bucket(hours.astype(np.int64), 24)},
+        }
+        if not len(days):
+            return result
+
+        first = int(days.min())
+        span = int(days.max()) - first + 1
+        day_index = days - first
+        entries = np.bincount(day_index, minlength=span)
+        with_scores = np.bincount(day_index, weights=scored, minlength=span)
+        mood_sums = np.bincount(day_index, weights=moods, minlength=span)
+        result['mood_trend'].update(
+            start=(EPOCH + timedelta(days=first)).isoformat(),
+            entries=entries.tolist(),
+            mood=_means(mood_sums, with_scores),
+            arousal=_means(np.bincount(day_index, weights=arousal, minlength=span), with_scores),
+            moving_average=_means(_trailing_sums(mood_sums, window), _trailing_sums(with_scores, window)),
+        )
+        return result
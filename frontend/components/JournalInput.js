@@ -76,19 +76,69 @@ export default function JournalInput({ onEntryProcessed }) {
     try {
       // Try direct connection to backend first, then fallback to proxy
       const backendUrl = process.env.NODE_ENV === 'development'
-        ? 'http://localhost:8000/api/journal/process'
-        : '/api/journal/process'
+        ? 'http://localhost:8000/api/journal/process/stream'
+        : '/api/journal/process/stream'
 
-      const response = await axios.post(backendUrl, {
-        entry_text: entryText
-      })
+      // Reflection style chosen in Settings
+      const savedSettings = JSON.parse(localStorage.getItem('journalSettings') || '{}')
 
-      if (response.data.success) {
-        setResult(response.data.data)
+      const finishEntry = (entry) => {
+        setResult(entry)
         setEntryText('') // Clear the input
         onEntryProcessed() // Notify parent component
-      } else {
-        setError(response.data.error || 'Failed to process entry')
+      }
+
+      const response = await fetch(backendUrl, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          entry_text: entryText,
+          style: savedSettings.reflectionStyle
+        })
+      })
+      if (response.status === 404) {
+        // Deployments without the streaming endpoint (serverless) use the plain one
+        const fallback = await axios.post(backendUrl.replace(/\/stream$/, ''), {
+          entry_text: entryText,
+          style: savedSettings.reflectionStyle
+        })
+        if (fallback.data.success) {
+          finishEntry(fallback.data.data)
+        } else {
+          setError(fallback.data.error || 'Failed to process entry')
+        }
+        return
+      }
+      if (!response.ok || !response.body) {
+        throw new Error(`Server responded with ${response.status}`)
+      }
+
+      // Server-Sent Events: show each analysis stage as soon as it arrives
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+      let partial = { original_entry: entryText }
+      while (true) {
+        const { done, value } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+        let boundary
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          const message = buffer.slice(0, boundary)
+          buffer = buffer.slice(boundary + 2)
+          const event = (message.match(/^event: (.*)$/m) || [])[1]
+          const data = JSON.parse((message.match(/^data: (.*)$/m) || [])[1] || '{}')
+
+          if (event === 'error') {
+            setResult(null)
+            setError(data.error || 'Failed to process entry')
+          } else if (event === 'saved') {
+            finishEntry(data)
+          } else {
+            partial = { ...partial, ...data }
+            setResult(partial)
+          }
+        }
       }
     } catch (err) {
       setError('Failed to connect to the server. Make sure the backend is running.')
@@ -352,7 +402,7 @@ export default function JournalInput({ onEntryProcessed }) {
                 borderRadius: '12px',
                 border: '1px solid var(--border-accent)'
               }}>
-                {result.summary}
+                {result.summary || '…'}
               </p>
             </motion.div>
 
@@ -366,7 +416,7 @@ export default function JournalInput({ onEntryProcessed }) {
                 😊 Emotions Detected
               </h3>
               <div style={{ display: 'flex', flexWrap: 'wrap', gap: '8px' }}>
-                {result.emotions.split(',').map((emotion, index) => (
+                {(result.emotions || '').split(',').filter(emotion => emotion.trim()).map((emotion, index) => (
                   <motion.span
                     key={index}
                     className="emotion-tag"
@@ -391,12 +441,13 @@ export default function JournalInput({ onEntryProcessed }) {
                 💡 Positive Reflection
               </h3>
               <div className="reflection-box">
-                {result.reflection}
+                {result.reflection || '…'}
               </div>
             </motion.div>
 
             <motion.button
               onClick={handleNewEntry}
+              disabled={isProcessing}
               className="btn"
               style={{ width: '100%' }}
               initial={{ opacity: 0, y: 20 }}